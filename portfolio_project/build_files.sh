@@ -3,5 +3,18 @@
 # Install dependencies
 pip install -r requirements.txt
 
-# Collect static files
+# Shared cache table (content versions, cached pages, contact limits)
+python3.9 manage.py createcachetable
+
+# Compile every template once: the build fails on template errors
+python3.9 manage.py warmup
+
+# Self-hosted Bootstrap, icons and fonts, reduced to what the site uses
+python3.9 manage.py build_vendor_assets
+
+# Collect static files: minified bundles, hashed names, .gz/.br copies
 python3.9 manage.py collectstatic --noinput --clear
+
+# Export public pages (and hashed static files) to static_export/.
+# Only /contact/, /admin/ and the dynamic queries reach Django.
+python3.9 manage.py export_static --output static_export
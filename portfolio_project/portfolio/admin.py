@@ -1,17 +1,28 @@
-from django.contrib import admin
+from django.contrib import admin, messages
+from django.contrib.admin.options import IncorrectLookupParameters
+from django.contrib.admin.views.main import ChangeList
+from django.db.models import Count
 from django.utils.html import format_html
-from .models import ColorPalette, Project, Skill, Experience, ContactMessage, SiteSettings
+from django.utils import timezone
+from .models import ColorPalette, Project, Skill, Experience, ContactMessage, EmailNotification, SiteSettings, Technology
+from .inbox import (
+    KEYSET_ORDERING, EstimatedCountPaginator, InvalidCursor, keyset_page,
+    matching_message_ids,
+)
+from .search import ranked_project_ids
 
 
 @admin.register(ColorPalette)
 class ColorPaletteAdmin(admin.ModelAdmin):
     """
     Admin per la gestione delle palette colori.
+    La palette attiva si cambia con l'azione "Attiva", non modificando le righe.
     """
     list_display = ['name', 'color_preview', 'is_active', 'created_at']
     list_filter = ['is_active']
     search_fields = ['name']
-    list_editable = ['is_active']
+    readonly_fields = ['is_active']
+    actions = ['activate']
     
     fieldsets = (
         ('Informazioni', {
@@ -48,6 +59,15 @@ class ColorPaletteAdmin(admin.ModelAdmin):
             obj.background_color
         )
     color_preview.short_description = 'Anteprima'
+    
+    @admin.action(description="Attiva la palette selezionata")
+    def activate(self, request, queryset):
+        palettes = list(queryset[:2])
+        if len(palettes) != 1:
+            self.message_user(request, "Selezionare una sola palette da attivare.", messages.WARNING)
+            return
+        palettes[0].activate()
+        self.message_user(request, f"Palette attiva: {palettes[0].name}.")
 
 
 @admin.register(Project)
@@ -62,6 +82,16 @@ class ProjectAdmin(admin.ModelAdmin):
     prepopulated_fields = {'slug': ('title',)}
     date_hierarchy = 'created_at'
     
+    def get_search_results(self, request, queryset, search_term):
+        """
+        Usa l'indice full-text invece delle scansioni LIKE, dentro i filtri
+        già applicati dall'admin e senza il limite della ricerca pubblica.
+        """
+        if not search_term.strip():
+            return queryset, False
+        ids = [pk for pk, rank in ranked_project_ids(search_term, limit=None, queryset=queryset)]
+        return queryset.filter(pk__in=ids), False
+    
     fieldsets = (
         ('Informazioni Principali', {
             'fields': ('title', 'slug', 'short_description', 'description')
@@ -81,6 +111,31 @@ class ProjectAdmin(admin.ModelAdmin):
     )
 
 
+@admin.register(Technology)
+class TechnologyAdmin(admin.ModelAdmin):
+    """
+    Admin per consultare l'indice delle tecnologie.
+    Le tecnologie vengono create automaticamente dai progetti.
+    """
+    list_display = ['name', 'slug', 'project_count']
+    search_fields = ['name', 'slug']
+    readonly_fields = ['slug']
+    
+    def get_queryset(self, request):
+        return super().get_queryset(request).annotate(
+            project_count=Count('project_links')
+        )
+    
+    def project_count(self, obj):
+        """Numero di progetti che usano la tecnologia."""
+        return obj.project_count
+    project_count.short_description = 'Progetti'
+    project_count.admin_order_field = 'project_count'
+    
+    def has_add_permission(self, request):
+        return False
+
+
 @admin.register(Skill)
 class SkillAdmin(admin.ModelAdmin):
     """
@@ -130,17 +185,70 @@ class ExperienceAdmin(admin.ModelAdmin):
     )
 
 
+class InboxChangeList(ChangeList):
+    """
+    Lista dei messaggi con paginazione a cursore (parametro ``cursor``)
+    quando è ordinata per data, come di default. Con un altro ordinamento
+    usa le pagine numerate, sempre senza ``COUNT(*)`` completo.
+    """
+    CURSOR_VAR = 'cursor'
+
+    def __init__(self, request, *args, **kwargs):
+        self.cursor = request.GET.get(self.CURSOR_VAR, '')
+        super().__init__(request, *args, **kwargs)
+
+    def get_filters_params(self, params=None):
+        lookup_params = super().get_filters_params(params)
+        lookup_params.pop(self.CURSOR_VAR, None)
+        return lookup_params
+
+    def get_query_string(self, new_params=None, remove=None):
+        # Filtri, ricerca e ordinamento ripartono dalla prima pagina
+        if not new_params or self.CURSOR_VAR not in new_params:
+            remove = [*(remove or []), self.CURSOR_VAR]
+        return super().get_query_string(new_params, remove)
+
+    def get_results(self, request):
+        self.keyset = (
+            tuple(self.queryset.query.order_by) == KEYSET_ORDERING and not self.show_all
+        )
+        if not self.keyset:
+            return super().get_results(request)
+
+        try:
+            page, next_cursor, previous_cursor = keyset_page(
+                self.queryset, self.cursor, self.list_per_page
+            )
+        except InvalidCursor:
+            raise IncorrectLookupParameters
+        self.paginator = self.model_admin.get_paginator(request, self.queryset, self.list_per_page)
+        self.result_count = self.paginator.count
+        self.result_list = page
+        self.show_full_result_count = False
+        self.show_admin_actions = True
+        self.full_result_count = None
+        self.can_show_all = False
+        self.multi_page = bool(next_cursor or previous_cursor)
+        self.next_url = next_cursor and self.get_query_string({self.CURSOR_VAR: next_cursor})
+        self.previous_url = previous_cursor and self.get_query_string({self.CURSOR_VAR: previous_cursor})
+
+
 @admin.register(ContactMessage)
 class ContactMessageAdmin(admin.ModelAdmin):
     """
     Admin per la visualizzazione dei messaggi di contatto.
+    Pensato per tabelle molto grandi: conteggi stimati, ricerca full-text,
+    filtri serviti dagli indici e paginazione a cursore (vedi inbox.py).
     """
     list_display = ['subject', 'name', 'email', 'created_at', 'is_read']
     list_filter = ['is_read', 'created_at']
     search_fields = ['name', 'email', 'subject', 'message']
+    search_help_text = 'Cerca in mittente, oggetto e testo (i 1000 messaggi più recenti).'
     readonly_fields = ['name', 'email', 'subject', 'message', 'created_at']
     list_editable = ['is_read']
-    date_hierarchy = 'created_at'
+    paginator = EstimatedCountPaginator
+    show_full_result_count = False
+    list_per_page = 50
     
     fieldsets = (
         ('Mittente', {
@@ -154,11 +262,47 @@ class ContactMessageAdmin(admin.ModelAdmin):
         }),
     )
     
+    def get_changelist(self, request, **kwargs):
+        return InboxChangeList
+    
+    def get_search_results(self, request, queryset, search_term):
+        """Usa l'indice full-text invece delle scansioni LIKE."""
+        if not search_term.strip():
+            return queryset, False
+        return queryset.filter(pk__in=matching_message_ids(search_term)), False
+    
     def has_add_permission(self, request):
         """Disabilita l'aggiunta manuale di messaggi."""
         return False
 
 
+@admin.register(EmailNotification)
+class EmailNotificationAdmin(admin.ModelAdmin):
+    """
+    Admin per la coda delle notifiche email.
+    """
+    list_display = ['subject', 'recipient', 'status', 'attempts', 'next_attempt_at', 'sent_at']
+    list_filter = ['status']
+    search_fields = ['recipient', 'subject']
+    readonly_fields = [
+        'contact_message', 'recipient', 'reply_to', 'subject', 'body',
+        'status', 'attempts', 'next_attempt_at', 'last_error', 'created_at', 'sent_at',
+    ]
+    actions = ['requeue']
+    
+    def has_add_permission(self, request):
+        return False
+    
+    @admin.action(description="Rimetti in coda le notifiche selezionate")
+    def requeue(self, request, queryset):
+        count = queryset.exclude(status=EmailNotification.STATUS_SENT).update(
+            status=EmailNotification.STATUS_PENDING,
+            attempts=0,
+            next_attempt_at=timezone.now(),
+        )
+        self.message_user(request, f"{count} notifiche rimesse in coda.")
+
+
 @admin.register(SiteSettings)
 class SiteSettingsAdmin(admin.ModelAdmin):
     """
@@ -178,9 +322,6 @@ class SiteSettingsAdmin(admin.ModelAdmin):
             'fields': ('social_links',),
             'description': 'Inserire i link social in formato JSON: {"github": "url", "linkedin": "url"}'
         }),
-        ('Tema', {
-            'fields': ('current_palette',)
-        }),
     )
     
     def has_add_permission(self, request):
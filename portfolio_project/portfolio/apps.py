@@ -5,3 +5,12 @@ class PortfolioConfig(AppConfig):
     default_auto_field = 'django.db.models.BigAutoField'
     name = 'portfolio'
     verbose_name = 'Portfolio'
+
+    def ready(self):
+        # Registra i receiver che invalidano le cache e i controlli di sistema
+        from . import checks, signals  # noqa: F401
+
+        # Conteggio e durata delle query per l'header Server-Timing
+        from django.db.backends.signals import connection_created
+        from .timing import install_query_wrapper
+        connection_created.connect(install_query_wrapper, dispatch_uid='portfolio_server_timing')
@@ -0,0 +1,242 @@
+"""
+Archiviazione dei vecchi messaggi di contatto.
+
+I messaggi letti più vecchi della soglia di conservazione vengono scritti
+in file NDJSON compressi, uno per mese (``AAAA/AAAA-MM.ndjson.gz``), e poi
+eliminati dal database. La lettura avviene a blocchi ordinati per data,
+senza caricare l'intero queryset.
+
+Ogni blocco viene aggiunto al file del mese come membro gzip separato (un
+file gzip con più membri è ancora un gzip valido). Accanto al file, un
+indice JSON registra per ogni membro posizione, lunghezza e intervallo di
+date: chi legge un intervallo decomprime solo i membri che lo toccano.
+
+Ordine delle scritture: membro aggiunto al file, indice aggiornato, righe
+eliminate. Se il processo si interrompe dopo la scrittura del file ma prima
+dell'indice, la coda non indicizzata viene scartata alla scrittura
+successiva; se si interrompe prima dell'eliminazione, gli stessi messaggi
+vengono archiviati di nuovo e il lettore scarta i duplicati per id.
+"""
+import gzip
+import json
+import os
+from datetime import timedelta, timezone as dt_timezone
+from pathlib import Path
+
+from django.conf import settings
+from django.db import transaction
+from django.db.models import Q
+from django.utils import timezone
+from django.utils.dateparse import parse_datetime
+
+from . import inbox
+from .backup import preserve_timestamps
+from .models import ContactMessage
+from .search import tokenize
+
+
+DEFAULT_RETENTION_DAYS = 365
+DEFAULT_BATCH_SIZE = 1000
+
+FIELDS = ('id', 'name', 'email', 'subject', 'message', 'is_read', 'created_at')
+
+
+def archive_root():
+    return Path(getattr(settings, 'MESSAGE_ARCHIVE_ROOT', Path(settings.BASE_DIR) / 'archive'))
+
+
+def default_cutoff(now=None):
+    days = getattr(settings, 'MESSAGE_RETENTION_DAYS', DEFAULT_RETENTION_DAYS)
+    return (now or timezone.now()) - timedelta(days=days)
+
+
+def partition_name(created_at):
+    """Percorso relativo del file del mese (UTC), es. ``2024/2024-03``."""
+    created_at = created_at.astimezone(dt_timezone.utc)
+    return f'{created_at:%Y}/{created_at:%Y-%m}'
+
+
+class Partition:
+    """File compresso di un mese e il suo indice dei membri."""
+
+    def __init__(self, root, name):
+        self.data_path = Path(root) / f'{name}.ndjson.gz'
+        self.index_path = Path(root) / f'{name}.index.json'
+
+    def load_index(self):
+        try:
+            with open(self.index_path, encoding='utf-8') as handle:
+                return json.load(handle)
+        except FileNotFoundError:
+            return {'size': 0, 'members': []}
+
+    def append(self, rows):
+        """Aggiunge un membro gzip con le righe indicate e aggiorna l'indice."""
+        index = self.load_index()
+        payload = gzip.compress(
+            ''.join(json.dumps(row, ensure_ascii=False) + '\n' for row in rows).encode('utf-8')
+        )
+        self.data_path.parent.mkdir(parents=True, exist_ok=True)
+        with open(self.data_path, 'ab') as handle:
+            # Scarta un eventuale membro scritto ma mai indicizzato
+            handle.truncate(index['size'])
+            handle.seek(index['size'])
+            handle.write(payload)
+            handle.flush()
+            os.fsync(handle.fileno())
+        index['members'].append({
+            'offset': index['size'],
+            'length': len(payload),
+            'first': rows[0]['created_at'],
+            'last': rows[-1]['created_at'],
+            'count': len(rows),
+        })
+        index['size'] += len(payload)
+        temporary = self.index_path.with_suffix('.tmp')
+        with open(temporary, 'w', encoding='utf-8') as handle:
+            json.dump(index, handle)
+        os.replace(temporary, self.index_path)
+
+    def read(self, start=None, end=None):
+        """Righe dei membri che toccano l'intervallo ``[start, end)``."""
+        members = self.load_index()['members']
+        if not members:
+            return
+        with open(self.data_path, 'rb') as handle:
+            for member in members:
+                if start and parse_datetime(member['last']) < start:
+                    continue
+                if end and parse_datetime(member['first']) >= end:
+                    continue
+                handle.seek(member['offset'])
+                for line in gzip.decompress(handle.read(member['length'])).splitlines():
+                    yield json.loads(line)
+
+
+def _serialize(message):
+    row = {field: message[field] for field in FIELDS}
+    row['created_at'] = message['created_at'].isoformat()
+    return row
+
+
+def archivable_messages(cutoff):
+    """Messaggi letti creati prima di ``cutoff``, nell'ordine di archiviazione."""
+    return (
+        ContactMessage.objects.filter(is_read=True, created_at__lt=cutoff)
+        .order_by('created_at', 'pk')
+    )
+
+
+def archive_messages(cutoff=None, batch_size=DEFAULT_BATCH_SIZE, root=None, dry_run=False):
+    """
+    Archivia ed elimina i messaggi letti creati prima di ``cutoff``, a
+    blocchi di ``batch_size`` nell'ordine ``(created_at, id)``. Restituisce
+    il numero di messaggi archiviati.
+    """
+    cutoff = cutoff or default_cutoff()
+    root = root or archive_root()
+    queryset = archivable_messages(cutoff)
+    archived = 0
+    last = None
+    while True:
+        batch = queryset
+        if last is not None:
+            # Con dry_run le righe restano: si prosegue dopo l'ultima vista
+            batch = batch.filter(
+                Q(created_at__gt=last[0]) | Q(created_at=last[0], pk__gt=last[1])
+            )
+        rows = list(batch.values(*FIELDS)[:batch_size])
+        if not rows:
+            return archived
+        last = (rows[-1]['created_at'], rows[-1]['id'])
+        archived += len(rows)
+        if dry_run:
+            continue
+
+        partitions = {}
+        for row in rows:
+            partitions.setdefault(partition_name(row['created_at']), []).append(_serialize(row))
+        for name, partition_rows in partitions.items():
+            Partition(root, name).append(partition_rows)
+
+        with transaction.atomic():
+            ids = [row['id'] for row in rows]
+            # Le eliminazioni passano dai segnali che aggiornano l'indice di ricerca
+            ContactMessage.objects.filter(pk__in=ids).delete()
+
+
+def _partition_names(root, start=None, end=None):
+    """Mesi archiviati che possono contenere messaggi dell'intervallo."""
+    names = sorted(
+        str(path.relative_to(root)).removesuffix('.index.json')
+        for path in Path(root).glob('*/*.index.json')
+    )
+    first = partition_name(start) if start else None
+    last = partition_name(end - timedelta(microseconds=1)) if end else None
+    return [
+        name for name in names
+        if (first is None or name >= first) and (last is None or name <= last)
+    ]
+
+
+def read_archive(start=None, end=None, root=None):
+    """
+    Messaggi archiviati con ``start <= created_at < end``, in ordine di
+    data. Vengono decompressi solo i membri che toccano l'intervallo.
+    """
+    root = root or archive_root()
+    seen = set()
+    for name in _partition_names(root, start, end):
+        for row in Partition(root, name).read(start, end):
+            created_at = parse_datetime(row['created_at'])
+            if (start and created_at < start) or (end and created_at >= end):
+                continue
+            if row['id'] in seen:
+                continue
+            seen.add(row['id'])
+            row['created_at'] = created_at
+            yield row
+
+
+def search_archive(query, start=None, end=None, root=None):
+    """Messaggi archiviati che contengono tutte le parole cercate."""
+    tokens = [token.lower() for token in tokenize(query)]
+    for row in read_archive(start, end, root):
+        text = ' '.join(str(row[field]) for field in ('name', 'email', 'subject', 'message')).lower()
+        if all(token in text for token in tokens):
+            yield row
+
+
+def restore_messages(rows, batch_size=DEFAULT_BATCH_SIZE):
+    """
+    Reinserisce nel database i messaggi archiviati indicati, con il loro id
+    originale; quelli già presenti vengono saltati. Restituisce il numero
+    di messaggi ripristinati.
+    """
+    restored = 0
+    batch = []
+
+    def flush():
+        existing = set(
+            ContactMessage.objects.filter(pk__in=[row['id'] for row in batch])
+            .values_list('pk', flat=True)
+        )
+        messages = [
+            ContactMessage(**{field: row[field] for field in FIELDS})
+            for row in batch if row['id'] not in existing
+        ]
+        with transaction.atomic(), preserve_timestamps(ContactMessage):
+            ContactMessage.objects.bulk_create(messages)
+            # bulk_create non invia post_save: l'indice si aggiorna qui
+            for message in messages:
+                inbox.index_message(message)
+        return len(messages)
+
+    for row in rows:
+        batch.append(row)
+        if len(batch) >= batch_size:
+            restored += flush()
+            batch = []
+    if batch:
+        restored += flush()
+    return restored
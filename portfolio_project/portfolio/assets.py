@@ -0,0 +1,244 @@
+"""
+Pipeline dei file statici, eseguita da ``collectstatic``.
+
+Lo storage ``PipelineStaticFilesStorage`` estende quello di WhiteNoise
+(nomi con l'hash del contenuto in ``staticfiles.json`` e copie ``.gz`` e,
+se è installato ``brotli``, ``.br``). Prima dell'hash concatena i sorgenti
+di ogni bundle di ``STATIC_BUNDLES`` e li minifica. Alla fine registra nel
+log ``portfolio.assets`` i byte risparmiati per ogni bundle.
+
+I template includono i bundle con ``{% bundle %}`` (vedi
+``templatetags/bundles.py``): in sviluppo, o se ``collectstatic`` non è
+stato eseguito, vengono inclusi i singoli sorgenti.
+"""
+import logging
+import os
+import re
+
+from django.conf import settings
+from django.contrib.staticfiles.storage import staticfiles_storage
+from django.core.files.base import ContentFile
+from whitenoise.storage import CompressedManifestStaticFilesStorage
+
+
+logger = logging.getLogger(__name__)
+
+# Bundle generati -> sorgenti (percorsi statici), nell'ordine di inclusione
+DEFAULT_BUNDLES = {
+    'css/site.css': ['css/theme.css'],
+    'js/site.js': ['js/script.js'],
+}
+
+CSS_COMMENT_RE = re.compile(r'''("(?:\\.|[^"\\])*"|'(?:\\.|[^'\\])*')|/\*.*?\*/''', re.S)
+CSS_STRING_RE = re.compile(r'''("(?:\\.|[^"\\])*"|'(?:\\.|[^'\\])*')''', re.S)
+CSS_PUNCTUATION_RE = re.compile(r'\s*([{};,>])\s*')
+
+# Dopo questi caratteri (o a inizio file) una "/" apre un'espressione regolare
+JS_REGEX_PREFIX = set('(,=:[!&|?{};+-*%<>~^')
+JS_REGEX_KEYWORDS = ('return', 'typeof', 'case', 'do', 'else', 'in', 'of', 'void', 'delete', 'throw')
+
+
+def get_bundles():
+    return getattr(settings, 'STATIC_BUNDLES', DEFAULT_BUNDLES)
+
+
+def bundles_enabled():
+    """
+    I bundle si usano solo senza DEBUG e dopo ``collectstatic`` con questo
+    storage (il manifest contiene i loro nomi con l'hash).
+    """
+    return not settings.DEBUG and bool(getattr(staticfiles_storage, 'hashed_files', None))
+
+
+def minify_css(text):
+    """Rimuove commenti e spazi superflui; le stringhe restano intatte."""
+    text = CSS_COMMENT_RE.sub(lambda match: match.group(1) or '', text)
+    parts = CSS_STRING_RE.split(text)
+    for index in range(0, len(parts), 2):
+        # Gli spazi ai bordi restano: separano i valori dalle stringhe vicine
+        code = re.sub(r'\s+', ' ', parts[index])
+        code = CSS_PUNCTUATION_RE.sub(r'\1', code)
+        code = re.sub(r':\s+', ':', code)
+        parts[index] = code.replace(';}', '}')
+    return ''.join(parts).strip()
+
+
+def _skip_string(text, start):
+    """Indice successivo alla stringa (o template literal) che inizia in ``start``."""
+    quote = text[start]
+    index = start + 1
+    while index < len(text):
+        char = text[index]
+        if char == '\\':
+            index += 2
+            continue
+        if char == quote:
+            return index + 1
+        if char == '\n' and quote != '`':
+            break
+        index += 1
+    raise ValueError(f'Stringa non chiusa alla posizione {start}')
+
+
+def _skip_regex(text, start):
+    index = start + 1
+    in_class = False
+    while index < len(text):
+        char = text[index]
+        if char == '\\':
+            index += 2
+            continue
+        if char == '\n':
+            break
+        if char == '[':
+            in_class = True
+        elif char == ']':
+            in_class = False
+        elif char == '/' and not in_class:
+            return index + 1
+        index += 1
+    raise ValueError(f'Espressione regolare non chiusa alla posizione {start}')
+
+
+def _regex_allowed(tail):
+    before = tail.rstrip()
+    if not before or before[-1] in JS_REGEX_PREFIX:
+        return True
+    word = re.search(r'[\w$]+$', before)
+    return bool(word) and word.group() in JS_REGEX_KEYWORDS
+
+
+def minify_js(text):
+    """
+    Minificazione prudente: rimuove commenti, indentazione e righe vuote ma
+    conserva gli a capo, così l'inserimento automatico dei punti e virgola
+    non cambia il significato del codice.
+    """
+    output = []
+    # Ultimi caratteri significativi, per distinguere divisione e regex
+    tail = ''
+
+    def emit(chunk):
+        nonlocal tail
+        output.append(chunk)
+        tail = (tail + (' ' if chunk.isspace() else chunk))[-32:]
+
+    index = 0
+    while index < len(text):
+        char = text[index]
+        following = text[index + 1:index + 2]
+        if char in '\'"`':
+            end = _skip_string(text, index)
+            emit(text[index:end])
+            index = end
+        elif char == '/' and following == '/':
+            end = text.find('\n', index)
+            index = len(text) if end == -1 else end
+        elif char == '/' and following == '*':
+            end = text.find('*/', index + 2)
+            if end == -1:
+                raise ValueError(f'Commento non chiuso alla posizione {index}')
+            # Un commento che contiene un a capo può terminare un'istruzione
+            emit('\n' if '\n' in text[index:end] else ' ')
+            index = end + 2
+        elif char == '/' and _regex_allowed(tail):
+            end = _skip_regex(text, index)
+            emit(text[index:end])
+            index = end
+        else:
+            emit(char)
+            index += 1
+
+    lines = (' '.join(line.split()) for line in ''.join(output).splitlines())
+    return '\n'.join(line for line in lines if line)
+
+
+MINIFIERS = {'.css': minify_css, '.js': minify_js}
+
+
+def build_bundle(name, sources, read):
+    """Concatena e minifica i sorgenti; ``read(path)`` restituisce il testo."""
+    minify = MINIFIERS[os.path.splitext(name)[1]]
+    # Il ';' tra i file JS separa l'ultima istruzione di un sorgente dalla
+    # prima del successivo
+    separator = '\n' if name.endswith('.css') else ';\n'
+    return separator.join(minify(read(source)) for source in sources) + '\n'
+
+
+def asset_report(storage, bundles=None):
+    """
+    Byte per bundle: sorgenti, minificato e copie compresse (``None`` se
+    la copia non esiste). Usa i file già scritti da ``collectstatic``.
+    """
+    from django.contrib.staticfiles import finders
+
+    rows = []
+    for name, sources in (bundles or get_bundles()).items():
+        hashed = storage.stored_name(name)
+        path = storage.path(hashed)
+        row = {
+            'name': name,
+            'file': hashed,
+            'source': sum(os.path.getsize(finders.find(source)) for source in sources),
+            'minified': os.path.getsize(path),
+        }
+        for extension in ('gz', 'br'):
+            compressed = f'{path}.{extension}'
+            row[extension] = os.path.getsize(compressed) if os.path.exists(compressed) else None
+        rows.append(row)
+    return rows
+
+
+def log_report(rows):
+    for row in rows:
+        compressed = ', '.join(
+            f'{extension} {row[extension]} B' for extension in ('gz', 'br') if row[extension] is not None
+        )
+        saved = 1 - (min(value for value in (row['minified'], row['gz'], row['br']) if value) / row['source'])
+        logger.info(
+            'Bundle %s: sorgenti %d B, minificato %d B, %s (-%.0f%%) -> %s',
+            row['name'], row['source'], row['minified'], compressed or 'non compresso',
+            saved * 100, row['file'],
+        )
+
+
+class PipelineStaticFilesStorage(CompressedManifestStaticFilesStorage):
+    """Storage di WhiteNoise che genera prima i bundle minificati."""
+
+    def stored_name(self, name):
+        # Senza collectstatic (es. la funzione serverless, che non contiene
+        # STATIC_ROOT) si usano i nomi originali, esportati insieme a quelli
+        # con l'hash
+        if not self.hashed_files:
+            return name
+        return super().stored_name(name)
+
+    def post_process(self, paths, dry_run=False, **options):
+        if dry_run:
+            yield from super().post_process(paths, dry_run, **options)
+            return
+
+        bundles = get_bundles()
+        for name, sources in bundles.items():
+            missing = [source for source in sources if source not in paths]
+            if missing:
+                yield name, None, ValueError(f"Bundle {name}: sorgenti non trovati: {', '.join(missing)}")
+                continue
+
+            def read(source):
+                storage, path = paths[source]
+                with storage.open(path) as handle:
+                    return handle.read().decode('utf-8')
+
+            try:
+                content = build_bundle(name, sources, read)
+            except ValueError as error:
+                yield name, None, ValueError(f'Bundle {name}: {error}')
+                continue
+            if self.exists(name):
+                self.delete(name)
+            self._save(name, ContentFile(content.encode('utf-8')))
+            paths[name] = (self, name)
+
+        yield from super().post_process(paths, dry_run, **options)
+        log_report(asset_report(self, bundles))
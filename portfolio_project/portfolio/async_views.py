@@ -0,0 +1,229 @@
+"""
+Versioni asincrone delle view pubbliche, usate quando l'app è servita via
+ASGI (``ASYNC_VIEWS``, attivo di default in ``asgi.py``).
+
+Le query usano l'ORM asincrono e i risultati vengono materializzati prima
+del rendering, così i template non eseguono query dal ciclo di eventi.
+Lo snapshot di impostazioni e palette viene letto prima di renderizzare e
+salvato sulla richiesta, dove lo trova il context processor.
+
+Le letture dalla cache avvengono in un thread (``sync_to_async``): il
+backend predefinito è una tabella del database, che non si può
+interrogare dal ciclo di eventi.
+"""
+from asgiref.sync import sync_to_async
+from django.conf import settings as django_settings
+from django.contrib import messages
+from django.core.paginator import Paginator
+from django.http import HttpResponse, JsonResponse
+from django.shortcuts import aget_object_or_404, redirect, render
+
+from .cache import version_name
+from .catalog import aget_skill_catalog, aget_technology_cloud
+from .forms import ContactForm
+from .http import api_cache_control, versioned_etag
+from .models import ColorPalette, Experience, Project, RelatedProject, Skill
+from .page_cache import cache_public_page
+from .pagination import CursorPaginator, cached_count
+from .search import ranked_project_ids, search_projects
+from .snapshots import aget_site_snapshot
+from .throttling import check_contact_rate, is_duplicate_message
+from .views import (
+    PROJECTS_PER_PAGE, _filter_projects, _palette_data, _project_data,
+    _save_contact_message, featured_projects, related_links,
+)
+
+
+@cache_public_page(Project, Skill)
+async def index(request):
+    """
+    Home page del portfolio.
+    Mostra progetti in evidenza e skill principali.
+    """
+    await aget_site_snapshot(request)
+    context = {
+        'featured_projects': [project async for project in featured_projects()],
+        'skill_catalog': await aget_skill_catalog(),
+    }
+    return render(request, 'home.html', context)
+
+
+async def _offset_page(projects, number):
+    """Come ``Paginator.get_page``, con conteggio e righe lette in modo asincrono."""
+    paginator = Paginator(projects, PROJECTS_PER_PAGE)
+    paginator.count = await projects.acount()
+    page = paginator.get_page(number)
+    page.object_list = [project async for project in page.object_list]
+    return page
+
+
+@cache_public_page(Project)
+async def projects_list(request):
+    """
+    Lista di tutti i progetti con filtri per categoria e tecnologia.
+    """
+    await aget_site_snapshot(request)
+    projects, category, technology_cloud, current_technology = _filter_projects(
+        request, technology_cloud=await aget_technology_cloud()
+    )
+
+    search_query = request.GET.get('q', '').strip()
+    if search_query:
+        projects = await sync_to_async(search_projects)(projects, search_query)
+
+    pagination_mode = getattr(django_settings, 'PROJECTS_PAGINATION', 'offset')
+    if pagination_mode == 'cursor' and not search_query:
+        paginator = CursorPaginator(projects, PROJECTS_PER_PAGE)
+        projects = await sync_to_async(paginator.get_page)(request.GET.get('cursor'))
+    else:
+        pagination_mode = 'offset'
+        projects = await _offset_page(projects, request.GET.get('page'))
+
+    context = {
+        'projects': projects,
+        'pagination_mode': pagination_mode,
+        'categories': Project.CATEGORY_CHOICES,
+        'current_category': category or 'all',
+        'search_query': search_query,
+        'technology_cloud': technology_cloud,
+        'current_technology': current_technology,
+    }
+    return render(request, 'projects.html', context)
+
+
+@cache_public_page(Project, RelatedProject)
+async def project_detail(request, slug):
+    """
+    Dettagli di un singolo progetto.
+    """
+    await aget_site_snapshot(request)
+    project = await aget_object_or_404(Project, slug=slug)
+    context = {
+        'project': project,
+        'related_projects': [link.related async for link in related_links(project.pk)],
+    }
+    return render(request, 'project_detail.html', context)
+
+
+@cache_public_page(Skill, Experience)
+async def about(request):
+    """
+    Pagina Chi Sono con bio, esperienze e skill.
+    """
+    await aget_site_snapshot(request)
+    context = {
+        'experiences': [experience async for experience in Experience.objects.all()],
+        'skill_catalog': await aget_skill_catalog(),
+    }
+    return render(request, 'about.html', context)
+
+
+async def contact(request):
+    """
+    Form di contatto. Il salvataggio (transazione con la notifica in coda)
+    avviene in un thread; nessun invio di email durante la richiesta.
+    """
+    await aget_site_snapshot(request)
+    if request.method == 'POST':
+        form = ContactForm(request.POST)
+
+        retry_after = await sync_to_async(check_contact_rate)(request)
+        if retry_after:
+            messages.error(request, 'Troppi messaggi inviati. Riprova tra qualche minuto.')
+            response = render(request, 'contact.html', {'form': form}, status=429)
+            response['Retry-After'] = str(retry_after)
+            return response
+
+        if form.is_valid():
+            if not await sync_to_async(is_duplicate_message)(form.cleaned_data):
+                await sync_to_async(_save_contact_message)(
+                    form, request.site_snapshot.settings.email
+                )
+            messages.success(request, 'Messaggio inviato con successo!')
+            return redirect('contact_success')
+    else:
+        form = ContactForm()
+
+    return render(request, 'contact.html', {'form': form})
+
+
+@api_cache_control('api_palette')
+@versioned_etag(ColorPalette)
+async def get_active_palette(request):
+    """
+    API endpoint per ottenere la palette colori attiva.
+    La palette viene dallo snapshot del sito, senza query.
+    """
+    snapshot = await aget_site_snapshot()
+    return JsonResponse(_palette_data(snapshot.palette))
+
+
+@api_cache_control('api_skills')
+@versioned_etag(Skill)
+async def get_skills_api(request):
+    """
+    API endpoint per ottenere tutte le skill in formato JSON.
+    """
+    catalog = await aget_skill_catalog()
+    return HttpResponse(catalog.api_json, content_type='application/json')
+
+
+@api_cache_control('api_projects')
+@versioned_etag(Project)
+async def get_projects_api(request):
+    """
+    API endpoint per l'elenco dei progetti, paginato a cursore.
+    """
+    projects, category, technology_cloud, current_technology = _filter_projects(
+        request, technology_cloud=await aget_technology_cloud()
+    )
+    try:
+        limit = min(max(int(request.GET.get('limit', PROJECTS_PER_PAGE)), 1), 50)
+    except ValueError:
+        limit = PROJECTS_PER_PAGE
+
+    count = None
+    if request.GET.get('count') in ('1', 'true'):
+        count = lambda: cached_count(projects, [version_name(Project)])
+
+    paginator = CursorPaginator(projects, limit, count=count)
+    page = await sync_to_async(paginator.get_page)(request.GET.get('cursor'))
+
+    def page_url(cursor):
+        if cursor is None:
+            return None
+        query = request.GET.copy()
+        query['cursor'] = cursor
+        return f'{request.path}?{query.urlencode()}'
+
+    data = {
+        'results': [_project_data(project) for project in page],
+        'next': page_url(page.next_cursor),
+        'previous': page_url(page.previous_cursor),
+    }
+    if page.count is not None:
+        data['count'] = page.count
+    return JsonResponse(data)
+
+
+@api_cache_control('api_project_search')
+@versioned_etag(Project)
+async def search_projects_api(request):
+    """
+    API endpoint per la ricerca full-text dei progetti.
+    """
+    query = request.GET.get('q', '').strip()
+    try:
+        limit = min(max(int(request.GET.get('limit', 20)), 1), 50)
+    except ValueError:
+        limit = 20
+
+    ranked = await sync_to_async(ranked_project_ids)(query, limit=limit)
+    projects = await Project.objects.with_technologies().ain_bulk([pk for pk, rank in ranked])
+
+    results = [
+        {**_project_data(projects[pk]), 'rank': rank}
+        for pk, rank in ranked
+        if pk in projects
+    ]
+    return JsonResponse({'query': query, 'results': results})
@@ -0,0 +1,301 @@
+"""
+Backup e ripristino dei dati del portfolio.
+
+Il backup è un file NDJSON (formato ``jsonl`` di Django, un oggetto per
+riga), compresso con gzip se il nome termina in ``.gz``. Le righe vengono
+lette dal database a blocchi e scritte man mano, nell'ordine delle
+dipendenze tra i modelli.
+
+Il ripristino legge il file riga per riga e inserisce gli oggetti con
+``bulk_create`` a blocchi, sostituendo quelli con lo stesso id come
+``loaddata``. ``save()`` e i segnali non vengono eseguiti per ogni riga:
+il loro effetto viene applicato una volta alla fine (una sola palette
+attiva, slug, CSS delle palette, indice delle tecnologie, progetti
+correlati, indici di ricerca, sequenze e versioni della cache).
+
+Si possono ripristinare anche i vecchi file di ``dumpdata`` come
+``data_backup.json``: quel formato è un'unica lista JSON e viene letto
+per intero. Nei file creati prima della palette attiva unica, il campo
+``current_palette`` delle impostazioni sceglie la palette attiva, come
+nella migrazione 0010.
+"""
+import datetime
+import gzip
+import io
+import json
+import time
+from collections import Counter, defaultdict
+from contextlib import contextmanager
+from dataclasses import dataclass, field
+
+from django.core import serializers
+from django.core.serializers.base import DeserializationError
+from django.core.management.color import no_style
+from django.core.serializers.json import DjangoJSONEncoder
+from django.db import connection, transaction
+from django.utils.text import slugify
+
+from . import inbox, related, search
+from .cache import bump_version, version_name
+from .models import (
+    ColorPalette, ContactMessage, EmailNotification, Experience, Project,
+    ProjectTechnology, RelatedProject, SiteSettings, Skill, Technology,
+)
+from .technologies import parse_technologies, technology_slug
+
+
+DEFAULT_BATCH_SIZE = 1000
+
+# Modelli salvati, nell'ordine delle dipendenze
+BACKUP_MODELS = (
+    ColorPalette, Project, Skill, Experience, SiteSettings,
+    ContactMessage, EmailNotification,
+)
+# Dati ricavati dagli altri: non salvati e ricostruiti dopo il ripristino
+DERIVED_MODELS = (Technology, ProjectTechnology, RelatedProject)
+
+
+@dataclass
+class Report:
+    """Righe per modello, byte letti o scritti e durata dell'operazione."""
+    counts: Counter = field(default_factory=Counter)
+    skipped: Counter = field(default_factory=Counter)
+    bytes: int = 0
+    seconds: float = 0.0
+
+    @property
+    def total(self):
+        return sum(self.counts.values())
+
+    @property
+    def rows_per_second(self):
+        return self.total / self.seconds if self.seconds else 0.0
+
+
+class _CountingFile:
+    """File binario che conta i byte che lo attraversano."""
+
+    def __init__(self, raw):
+        self.raw = raw
+        self.bytes = 0
+
+    def write(self, data):
+        self.bytes += len(data)
+        return self.raw.write(data)
+
+    def read(self, size=-1):
+        data = self.raw.read(size)
+        self.bytes += len(data)
+        return data
+
+    read1 = read
+
+    def __getattr__(self, name):
+        return getattr(self.raw, name)
+
+
+@contextmanager
+def _open(path, mode):
+    """Apre il file in testo UTF-8, con gzip se il nome termina in ``.gz``."""
+    with open(path, mode + 'b') as raw:
+        counted = _CountingFile(raw)
+        if str(path).endswith('.gz'):
+            handle = gzip.open(counted, mode + 't', encoding='utf-8')
+        else:
+            handle = io.TextIOWrapper(counted, encoding='utf-8')
+        with handle:
+            yield handle, counted
+
+
+class _Encoder(DjangoJSONEncoder):
+    """
+    Come ``DjangoJSONEncoder``, ma conserva i microsecondi: le date troncate
+    ai millisecondi cambierebbero l'ordine dei messaggi con pari data.
+    """
+
+    def default(self, o):
+        if isinstance(o, (datetime.datetime, datetime.time)):
+            value = o.isoformat()
+            return value[:-6] + 'Z' if value.endswith('+00:00') else value
+        return super().default(o)
+
+
+@contextmanager
+def preserve_timestamps(*models):
+    """
+    Disattiva ``auto_now`` e ``auto_now_add`` dei modelli indicati, così
+    ``bulk_create`` conserva le date originali invece di usare l'ora attuale.
+    """
+    fields = [
+        field for model in models for field in model._meta.concrete_fields
+        if getattr(field, 'auto_now', False) or getattr(field, 'auto_now_add', False)
+    ]
+    saved = [(field, field.auto_now, field.auto_now_add) for field in fields]
+    for field in fields:
+        field.auto_now = field.auto_now_add = False
+    try:
+        yield
+    finally:
+        for field, auto_now, auto_now_add in saved:
+            field.auto_now, field.auto_now_add = auto_now, auto_now_add
+
+
+# --------------------------------------------------------------------------
+# Backup
+# --------------------------------------------------------------------------
+
+def backup(path, batch_size=DEFAULT_BATCH_SIZE):
+    """Scrive il backup in ``path`` leggendo ogni tabella a blocchi."""
+    report = Report()
+    started = time.perf_counter()
+    with _open(path, 'w') as (handle, counted):
+        for model in BACKUP_MODELS:
+            rows = model._base_manager.order_by('pk').iterator(chunk_size=batch_size)
+            counter = _counted(rows, report.counts, model)
+            serializers.serialize('jsonl', counter, stream=handle, cls=_Encoder)
+    report.bytes = counted.bytes
+    report.seconds = time.perf_counter() - started
+    return report
+
+
+def _counted(rows, counts, model):
+    for row in rows:
+        counts[model._meta.label] += 1
+        yield row
+
+
+# --------------------------------------------------------------------------
+# Ripristino
+# --------------------------------------------------------------------------
+
+def _records(handle, path):
+    """Oggetti del file come dizionari, nel formato di ``dumpdata``."""
+    # I backup sono NDJSON; i file .json di dumpdata sono un'unica lista
+    name = str(path).removesuffix('.gz')
+    try:
+        if name.endswith('.json'):
+            yield from json.load(handle)
+            return
+        for line in handle:
+            if line.strip():
+                yield json.loads(line)
+    except ValueError as error:
+        raise DeserializationError(error) from error
+
+
+def _prepare(obj):
+    """Applica a un oggetto quello che farebbe il suo ``save()``."""
+    if isinstance(obj, ColorPalette):
+        obj.compile_stylesheet()
+    elif isinstance(obj, Project):
+        if not obj.slug:
+            obj.slug = slugify(obj.title)
+    elif isinstance(obj, SiteSettings):
+        obj.pk = 1
+
+
+def _insert(model, objects):
+    """Inserisce un blocco sostituendo le righe con lo stesso id."""
+    options = {}
+    if connection.features.supports_update_conflicts_with_target:
+        options = {
+            'update_conflicts': True,
+            'unique_fields': [model._meta.pk.name],
+            'update_fields': [
+                field.name for field in model._meta.concrete_fields if not field.primary_key
+            ],
+        }
+    model._base_manager.bulk_create(objects, **options)
+
+
+def rebuild_technologies(batch_size=DEFAULT_BATCH_SIZE):
+    """Ricostruisce l'indice delle tecnologie di tutti i progetti."""
+    names = {}
+    projects = []
+    for pk, value in Project.objects.order_by().values_list('pk', 'technologies').iterator(chunk_size=batch_size):
+        slugs = []
+        for name in parse_technologies(value):
+            slug = technology_slug(name)
+            names.setdefault(slug, name)
+            slugs.append(slug)
+        projects.append((pk, slugs))
+
+    Technology.objects.bulk_create(
+        [Technology(name=name, slug=slug) for slug, name in names.items()],
+        ignore_conflicts=True, batch_size=batch_size,
+    )
+    technology_ids = dict(Technology.objects.values_list('slug', 'pk'))
+    ProjectTechnology.objects.all().delete()
+    ProjectTechnology.objects.bulk_create([
+        ProjectTechnology(project_id=pk, technology_id=technology_ids[slug], position=position)
+        for pk, slugs in projects
+        for position, slug in enumerate(slugs)
+    ], batch_size=batch_size)
+
+
+def restore(path, batch_size=DEFAULT_BATCH_SIZE):
+    """
+    Ripristina il backup in ``path`` in un'unica transazione. Gli oggetti
+    dei modelli ricavati vengono ignorati e ricostruiti alla fine.
+    """
+    report = Report()
+    started = time.perf_counter()
+    pending = defaultdict(list)
+    active_palette = legacy_palette = None
+
+    def flush(model):
+        if pending[model]:
+            _insert(model, pending[model])
+            report.counts[model._meta.label] += len(pending[model])
+            pending[model] = []
+
+    def records(handle):
+        nonlocal legacy_palette
+        for record in _records(handle, path):
+            if record.get('model') == 'portfolio.sitesettings':
+                legacy_palette = record.get('fields', {}).get('current_palette')
+            yield record
+
+    with transaction.atomic(), preserve_timestamps(*BACKUP_MODELS):
+        with _open(path, 'r') as (handle, counted):
+            objects = serializers.deserialize('python', records(handle), ignorenonexistent=True)
+            for deserialized in objects:
+                obj = deserialized.object
+                model = type(obj)
+                if model not in BACKUP_MODELS:
+                    report.skipped[model._meta.label] += 1
+                    continue
+                _prepare(obj)
+                if isinstance(obj, ColorPalette) and obj.is_active:
+                    # Come con save(): resta attiva l'ultima palette attiva,
+                    # attivata alla fine per rispettare l'indice univoco
+                    active_palette = obj.pk
+                    obj.is_active = False
+                pending[model].append(obj)
+                # I vincoli delle chiavi esterne sono verificati al commit:
+                # un blocco può precedere gli oggetti a cui fa riferimento
+                if len(pending[model]) >= batch_size:
+                    flush(model)
+        for model in BACKUP_MODELS:
+            flush(model)
+        report.bytes = counted.bytes
+
+        # Il campo current_palette dei vecchi file aveva la precedenza
+        if legacy_palette is not None and ColorPalette.objects.filter(pk=legacy_palette).exists():
+            active_palette = legacy_palette
+        if active_palette is not None:
+            ColorPalette(pk=active_palette).activate()
+        rebuild_technologies(batch_size)
+        related.rebuild_all(Project, ProjectTechnology, RelatedProject)
+        search.rebuild_index()
+        inbox.rebuild_index()
+        # Gli id sono quelli del backup: i prossimi inserimenti partono da lì
+        with connection.cursor() as cursor:
+            for sql in connection.ops.sequence_reset_sql(no_style(), BACKUP_MODELS + DERIVED_MODELS):
+                cursor.execute(sql)
+
+        names = [version_name(model) for model in BACKUP_MODELS + DERIVED_MODELS]
+        transaction.on_commit(lambda: bump_version(*names))
+
+    report.seconds = time.perf_counter() - started
+    return report
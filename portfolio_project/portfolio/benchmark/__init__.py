@@ -0,0 +1,11 @@
+"""
+Benchmark HTTP delle route pubbliche.
+
+- ``seed``: dati di prova deterministici (stesso seme, stessi dati);
+- ``routes``: un URL per ogni route di ``portfolio/urls.py``;
+- ``runner``: esecuzione in-process (client di test) o via HTTP verso un
+  server locale, con throughput, latenze, query SQL e byte per route;
+- ``report``: salvataggio in JSON e confronto tra due esecuzioni.
+
+Si usa con ``python manage.py benchmark`` e ``python manage.py benchmark_compare``.
+"""
@@ -0,0 +1,121 @@
+"""
+Misura dell'avvio a freddo.
+
+Ogni misura avviene in un processo Python nuovo, come un'istanza
+serverless appena creata: import di ``portfolio_project.wsgi``, warm-up
+(facoltativo) e prima richiesta WSGI. Un'esecuzione aggiuntiva con
+``python -X importtime`` ripartisce il tempo di import per pacchetto.
+"""
+import json
+import os
+import re
+import statistics
+import subprocess
+import sys
+import time
+from collections import Counter
+
+from django.conf import settings
+
+
+# Eseguito nel processo figlio: stampa le misure come JSON sull'ultima riga
+PROBE = r'''
+import json, sys, time
+from wsgiref.util import setup_testing_defaults
+
+started = time.perf_counter()
+from portfolio_project.wsgi import application
+imported = time.perf_counter()
+
+steps = {}
+if sys.argv[2] == '1':
+    from portfolio.warmup import warm_up
+    steps = warm_up(raise_errors=True)
+warmed = time.perf_counter()
+
+path, _, query = sys.argv[1].partition('?')
+environ = {'REQUEST_METHOD': 'GET', 'PATH_INFO': path, 'QUERY_STRING': query, 'HTTP_HOST': 'localhost'}
+setup_testing_defaults(environ)
+status = []
+body = b''.join(application(environ, lambda value, headers, exc_info=None: status.append(value)))
+finished = time.perf_counter()
+
+print(json.dumps({
+    'import_ms': (imported - started) * 1000,
+    'warmup_ms': (warmed - imported) * 1000,
+    'warmup_steps': steps,
+    'first_request_ms': (finished - warmed) * 1000,
+    'status': int(status[0].split()[0]),
+    'bytes': len(body),
+}))
+'''
+
+IMPORTTIME_RE = re.compile(r'^import time:\s+(\d+) \|\s+(\d+) \|\s*(\S+)')
+
+
+def _run(path, warmup, env, importtime=False):
+    command = [sys.executable]
+    if importtime:
+        command += ['-X', 'importtime']
+    command += ['-c', PROBE, path, '1' if warmup else '0']
+    child_env = {
+        **os.environ,
+        'DJANGO_SETTINGS_MODULE': os.environ.get('DJANGO_SETTINGS_MODULE', 'portfolio_project.settings'),
+        # Il warm-up viene misurato a parte, non dentro l'import
+        'WARMUP_ON_START': 'False',
+        **env,
+    }
+    result = subprocess.run(
+        command, cwd=settings.BASE_DIR, env=child_env,
+        capture_output=True, text=True, check=False,
+    )
+    lines = result.stdout.strip().splitlines()
+    if result.returncode or not lines:
+        raise RuntimeError(result.stderr.strip().splitlines()[-1] if result.stderr.strip() else 'processo terminato senza output')
+    return json.loads(lines[-1]), result.stderr
+
+
+def import_breakdown(stderr):
+    """Microsecondi di import (tempo proprio) per pacchetto di primo livello."""
+    packages = Counter()
+    for line in stderr.splitlines():
+        match = IMPORTTIME_RE.match(line)
+        if match:
+            packages[match.group(3).split('.')[0]] += int(match.group(1))
+    return packages
+
+
+def profile(path='/', runs=5, warmup=True, env=None):
+    """
+    Esegue ``runs`` avvii a freddo e restituisce le mediane dei tempi, più
+    il tempo di import per pacchetto (in millisecondi) dall'esecuzione con
+    ``-X importtime``.
+    """
+    env = env or {}
+    samples = [_run(path, warmup, env)[0] for _ in range(runs)]
+    _, stderr = _run(path, warmup, env, importtime=True)
+    packages = import_breakdown(stderr)
+
+    report = {
+        'timestamp': time.strftime('%Y-%m-%dT%H:%M:%S%z'),
+        'path': path,
+        'runs': runs,
+        'warmup': warmup,
+        'env': env,
+        'status': samples[-1]['status'],
+    }
+    for metric in ('import_ms', 'warmup_ms', 'first_request_ms'):
+        report[metric] = statistics.median(sample[metric] for sample in samples)
+    report['total_ms'] = report['import_ms'] + report['warmup_ms'] + report['first_request_ms']
+    report['warmup_steps'] = {
+        name: statistics.median(sample['warmup_steps'].get(name, 0) for sample in samples)
+        for name in samples[-1]['warmup_steps']
+    }
+    report['packages_ms'] = {name: us / 1000 for name, us in packages.most_common()}
+    return report
+
+
+def append_history(path, report):
+    """Aggiunge il report come riga JSON, per seguire i tempi nel tempo."""
+    with open(path, 'a', encoding='utf-8') as handle:
+        handle.write(json.dumps(report) + '\n')
@@ -0,0 +1,91 @@
+"""
+Benchmark della casella messaggi dell'admin con molte righe.
+"""
+import random
+import time
+from datetime import timedelta
+from urllib.parse import urlencode
+
+from django.contrib.auth import get_user_model
+from django.db import connection, transaction
+from django.db.models import Max, Min
+from django.test import Client
+from django.urls import reverse
+
+from .. import inbox
+from ..models import ContactMessage
+from .runner import summarize
+from .seed import REFERENCE_DATE, WORDS
+
+
+BATCH_SIZE = 10000
+
+
+def seed_messages(count, seed=42):
+    """
+    Inserisce ``count`` messaggi, uno al minuto fino a ``REFERENCE_DATE``,
+    con inserimenti a blocchi; l'indice full-text viene ricostruito alla fine.
+    """
+    rng = random.Random(seed)
+    table = ContactMessage._meta.db_table
+    columns = ('name', 'email', 'subject', 'message', 'created_at', 'is_read')
+    sql = (
+        f"INSERT INTO {table} ({', '.join(columns)}) "
+        f"VALUES ({', '.join(['%s'] * len(columns))})"
+    )
+    start = REFERENCE_DATE - timedelta(minutes=count)
+    with transaction.atomic(), connection.cursor() as cursor:
+        for offset in range(0, count, BATCH_SIZE):
+            rows = []
+            for index in range(offset, min(offset + BATCH_SIZE, count)):
+                words = rng.sample(WORDS, 6)
+                rows.append((
+                    f'Mittente {index % 5000}',
+                    f'utente{index % 5000}@example.com',
+                    ' '.join(words[:3]).capitalize(),
+                    ' '.join(rng.choice(WORDS) for _ in range(40)),
+                    start + timedelta(minutes=index),
+                    # Gli ultimi 500 sono da leggere, dei precedenti uno su venti
+                    index < count - 500 and rng.random() < 0.95,
+                ))
+            cursor.executemany(sql, rows)
+        inbox.rebuild_index()
+    if connection.vendor == 'sqlite':
+        with connection.cursor() as cursor:
+            cursor.execute('ANALYZE')
+
+
+def inbox_urls():
+    """Varianti della lista messaggi da misurare."""
+    url = reverse('admin:portfolio_contactmessage_changelist')
+    bounds = ContactMessage.objects.aggregate(low=Min('pk'), high=Max('pk'))
+    middle = (bounds['low'] + bounds['high']) // 2
+    since = urlencode({'created_at__gte': (REFERENCE_DATE - timedelta(days=7)).isoformat()})
+    return [
+        ('lista', url),
+        ('pagina profonda', f'{url}?cursor=o{middle}'),
+        ('non letti', f'{url}?is_read__exact=0'),
+        ('ultimi 7 giorni', f'{url}?{since}'),
+        ('ricerca', f'{url}?q=magazzino'),
+        ('ricerca rara', f'{url}?q=utente4242'),
+    ]
+
+
+def run_inbox(requests=20):
+    """Richieste sequenziali di un superutente a ogni variante della lista."""
+    user = get_user_model().objects.create_superuser('benchmark', 'benchmark@example.com', 'benchmark')
+    client = Client()
+    client.force_login(user)
+    results = {}
+    for label, url in inbox_urls():
+        client.get(url)
+        samples = []
+        start = time.perf_counter()
+        for _ in range(requests):
+            begin = time.perf_counter()
+            response = client.get(url)
+            samples.append((time.perf_counter() - begin, response.status_code, len(response.content), None))
+        stats = summarize(samples, time.perf_counter() - start)
+        stats['url'] = url
+        results[label] = stats
+    return results
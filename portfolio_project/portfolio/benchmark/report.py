@@ -0,0 +1,57 @@
+"""
+Salvataggio dei risultati in JSON e confronto tra due esecuzioni.
+"""
+import json
+import platform
+from datetime import datetime, timezone
+
+import django
+
+
+REPORT_VERSION = 1
+
+
+def build_report(results, **meta):
+    return {
+        'version': REPORT_VERSION,
+        'created_at': datetime.now(timezone.utc).isoformat(),
+        'python': platform.python_version(),
+        'django': django.get_version(),
+        'meta': meta,
+        'routes': results,
+    }
+
+
+def write_report(path, report):
+    with open(path, 'w', encoding='utf-8') as handle:
+        json.dump(report, handle, indent=2, sort_keys=True)
+
+
+def load_report(path):
+    with open(path, encoding='utf-8') as handle:
+        return json.load(handle)
+
+
+def compare(baseline, current, threshold=10.0):
+    """
+    Confronta due report route per route. Restituisce una lista di righe
+    ``(route, metrica, prima, dopo, variazione %, regressione)``.
+
+    È una regressione un calo del throughput o un aumento della p99 oltre
+    ``threshold`` per cento, oppure qualsiasi aumento delle query SQL.
+    """
+    rows = []
+    for label, after in current['routes'].items():
+        before = baseline['routes'].get(label)
+        if before is None:
+            continue
+        for metric, higher_is_better in (('throughput', True), ('p99_ms', False)):
+            old, new = before[metric], after[metric]
+            change = (new - old) / old * 100 if old else 0.0
+            worse = -change if higher_is_better else change
+            rows.append((label, metric, old, new, change, worse > threshold))
+        if before.get('queries') is not None and after.get('queries') is not None:
+            old, new = before['queries'], after['queries']
+            change = (new - old) / old * 100 if old else (100.0 if new else 0.0)
+            rows.append((label, 'queries', old, new, change, new > old))
+    return rows
@@ -0,0 +1,79 @@
+"""
+URL da misurare: almeno uno per ogni route di ``portfolio/urls.py``.
+"""
+from django.urls import reverse
+
+from ..models import Project, Technology
+from ..snapshots import get_site_snapshot
+
+
+def _project_slug():
+    return Project.objects.order_by('pk').values_list('slug', flat=True).first()
+
+
+def _technology_slug():
+    return (
+        Technology.objects.filter(project_links__isnull=False)
+        .order_by('pk').values_list('slug', flat=True).first()
+    )
+
+
+def _palette_digest():
+    palette = get_site_snapshot().palette
+    return palette.stylesheet_hash if palette else None
+
+
+# Per ogni nome di route, le varianti da misurare come (etichetta, funzione
+# che restituisce l'URL o None se mancano i dati necessari)
+ROUTE_VARIANTS = {
+    'home': [('home', lambda: reverse('home'))],
+    'projects': [
+        ('projects', lambda: reverse('projects')),
+        ('projects?category', lambda: reverse('projects') + '?category=web'),
+        ('projects?page', lambda: reverse('projects') + '?page=2'),
+        ('projects?tech', lambda: (
+            reverse('projects') + f'?tech={_technology_slug()}' if _technology_slug() else None
+        )),
+        ('projects?q', lambda: reverse('projects') + '?q=progetto'),
+    ],
+    'project_detail': [('project_detail', lambda: (
+        reverse('project_detail', args=[_project_slug()]) if _project_slug() else None
+    ))],
+    'about': [('about', lambda: reverse('about'))],
+    'contact': [('contact', lambda: reverse('contact'))],
+    'contact_success': [('contact_success', lambda: reverse('contact_success'))],
+    'palette_stylesheet': [('palette_stylesheet', lambda: (
+        reverse('palette_stylesheet', args=[_palette_digest()]) if _palette_digest() else None
+    ))],
+    'api_palette': [('api_palette', lambda: reverse('api_palette'))],
+    'api_skills': [('api_skills', lambda: reverse('api_skills'))],
+    'api_projects': [
+        ('api_projects', lambda: reverse('api_projects')),
+        ('api_projects?count', lambda: reverse('api_projects') + '?count=1'),
+    ],
+    'api_project_search': [('api_project_search', lambda: reverse('api_project_search') + '?q=progetto')],
+}
+
+
+def benchmark_routes(only=None):
+    """
+    Restituisce le coppie ``(etichetta, url)`` da misurare. Solleva
+    ``LookupError`` se una route di ``portfolio/urls.py`` non ha varianti
+    definite, così le nuove route non restano escluse per dimenticanza.
+    """
+    from .. import urls
+
+    names = [pattern.name for pattern in urls.urlpatterns if pattern.name]
+    missing = [name for name in names if name not in ROUTE_VARIANTS]
+    if missing:
+        raise LookupError(f'Route senza benchmark: {", ".join(missing)}')
+
+    routes = []
+    for name in names:
+        for label, build in ROUTE_VARIANTS[name]:
+            if only and not any(label.startswith(prefix) for prefix in only):
+                continue
+            url = build()
+            if url:
+                routes.append((label, url))
+    return routes
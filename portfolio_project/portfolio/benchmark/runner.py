@@ -0,0 +1,148 @@
+"""
+Esecuzione dei benchmark, in-process o via HTTP.
+
+Ogni route riceve una richiesta di riscaldamento e poi ``requests``
+richieste distribuite su ``concurrency`` thread. Per ogni richiesta si
+registrano latenza, stato, byte della risposta e (solo in-process) numero
+di query SQL; via HTTP il numero di query viene letto dall'header
+``Server-Timing`` quando il server lo espone (``SERVER_TIMING``).
+"""
+import os
+import re
+import socket
+import statistics
+import subprocess
+import sys
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor
+from contextlib import contextmanager
+
+import requests as http
+from django.db import connection, connections
+from django.test import Client
+from django.test.utils import CaptureQueriesContext
+
+
+SQL_TIMING_RE = re.compile(r'(?:^|,)\s*sql;[^,]*desc="(\d+) query"')
+
+def percentile(values, fraction):
+    """Percentile con interpolazione lineare su valori già ordinati."""
+    if not values:
+        return 0.0
+    position = (len(values) - 1) * fraction
+    lower = int(position)
+    upper = min(lower + 1, len(values) - 1)
+    return values[lower] + (values[upper] - values[lower]) * (position - lower)
+
+
+def summarize(samples, elapsed):
+    """
+    Statistiche di una serie di campioni ``(latenza, stato, byte, query)``.
+    Le latenze sono in millisecondi.
+    """
+    latencies = sorted(sample[0] for sample in samples)
+    queries = [sample[3] for sample in samples if sample[3] is not None]
+    return {
+        'requests': len(samples),
+        'errors': sum(1 for sample in samples if sample[1] >= 400),
+        'elapsed': elapsed,
+        'throughput': len(samples) / elapsed if elapsed else 0.0,
+        'p50_ms': percentile(latencies, 0.50) * 1000,
+        'p95_ms': percentile(latencies, 0.95) * 1000,
+        'p99_ms': percentile(latencies, 0.99) * 1000,
+        'queries': statistics.median(queries) if queries else None,
+        'bytes': statistics.median(sample[2] for sample in samples) if samples else 0,
+    }
+
+
+class InProcessTarget:
+    """Richieste con il client di test di Django, un client per thread."""
+    mode = 'inprocess'
+
+    def __init__(self):
+        self._local = threading.local()
+
+    def get(self, url):
+        client = getattr(self._local, 'client', None)
+        if client is None:
+            client = self._local.client = Client()
+        with CaptureQueriesContext(connection) as queries:
+            start = time.perf_counter()
+            response = client.get(url)
+            latency = time.perf_counter() - start
+        return latency, response.status_code, len(response.content), len(queries)
+
+    def close(self):
+        connections.close_all()
+
+
+class HttpTarget:
+    """Richieste HTTP verso un server già avviato (es. runserver, gunicorn, uvicorn)."""
+    mode = 'http'
+
+    def __init__(self, base_url):
+        self.base_url = base_url.rstrip('/')
+        self._local = threading.local()
+
+    def get(self, url):
+        session = getattr(self._local, 'session', None)
+        if session is None:
+            session = self._local.session = http.Session()
+        start = time.perf_counter()
+        response = session.get(self.base_url + url, allow_redirects=False, timeout=30)
+        content = response.content
+        latency = time.perf_counter() - start
+        match = SQL_TIMING_RE.search(response.headers.get('Server-Timing', ''))
+        queries = int(match.group(1)) if match else None
+        return latency, response.status_code, len(content), queries
+
+    def close(self):
+        pass
+
+
+def run(target, routes, requests=100, concurrency=8):
+    """Misura ogni route in sequenza. Restituisce ``{etichetta: statistiche}``."""
+    results = {}
+    with ThreadPoolExecutor(max_workers=concurrency) as executor:
+        for label, url in routes:
+            target.get(url)
+            start = time.perf_counter()
+            samples = list(executor.map(target.get, [url] * requests))
+            stats = summarize(samples, time.perf_counter() - start)
+            stats['url'] = url
+            results[label] = stats
+    target.close()
+    return results
+
+
+@contextmanager
+def local_server(database_url, env=None, port=None, timeout=30):
+    """
+    Avvia ``runserver`` su una porta libera con il database indicato e
+    restituisce l'URL base; alla fine ferma il processo.
+    """
+    if port is None:
+        with socket.socket() as probe:
+            probe.bind(('127.0.0.1', 0))
+            port = probe.getsockname()[1]
+    env = {**os.environ, **(env or {}), 'DATABASE_URL': database_url}
+    process = subprocess.Popen(
+        [sys.executable, '-m', 'django', 'runserver', '--noreload', f'127.0.0.1:{port}'],
+        env=env, stdout=subprocess.DEVNULL, stderr=subprocess.DEVNULL,
+    )
+    base_url = f'http://127.0.0.1:{port}'
+    try:
+        deadline = time.monotonic() + timeout
+        while True:
+            try:
+                http.get(base_url + '/api/palette/', timeout=1)
+                break
+            except http.ConnectionError:
+                if process.poll() is not None or time.monotonic() > deadline:
+                    raise RuntimeError('Il server di benchmark non si è avviato.')
+                time.sleep(0.2)
+        yield base_url
+    finally:
+        process.terminate()
+        process.wait(timeout=10)
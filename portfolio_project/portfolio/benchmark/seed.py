@@ -0,0 +1,93 @@
+"""
+Dati di prova deterministici per i benchmark.
+"""
+import random
+from datetime import date, datetime, timedelta, timezone
+
+from django.db import transaction
+
+from .. import related
+from ..models import (
+    ColorPalette, Experience, Project, ProjectTechnology, RelatedProject,
+    SiteSettings, Skill,
+)
+
+
+TECHNOLOGIES = (
+    'Python', 'Django', 'Flask', 'FastAPI', 'PostgreSQL', 'SQLite', 'Redis',
+    'React', 'Vue', 'TypeScript', 'JavaScript', 'Node.js', 'Docker',
+    'Kubernetes', 'Flutter', 'Kotlin', 'Swift', 'Tailwind', 'Bootstrap', 'C#',
+)
+
+WORDS = (
+    'portale', 'gestionale', 'dashboard', 'app', 'piattaforma', 'servizio',
+    'analisi', 'prenotazioni', 'magazzino', 'catalogo', 'chat', 'mappa',
+    'pagamenti', 'notifiche', 'report', 'editor', 'sincronizzazione',
+)
+
+# Data di riferimento fissa, così anche le date dei progetti sono ripetibili
+REFERENCE_DATE = datetime(2025, 1, 1, tzinfo=timezone.utc)
+
+
+def _sentence(rng, words):
+    return ' '.join(rng.choice(WORDS) for _ in range(words)).capitalize() + '.'
+
+
+@transaction.atomic
+def seed(projects=60, seed=42):
+    """
+    Popola un database vuoto con impostazioni, palette, skill, esperienze
+    e ``projects`` progetti. Con lo stesso ``seed`` i dati sono identici.
+    """
+    rng = random.Random(seed)
+
+    SiteSettings.objects.update_or_create(pk=1, defaults={
+        'site_title': 'Portfolio Benchmark',
+        'author_name': 'Benchmark',
+        'author_bio': _sentence(rng, 30),
+        'email': 'benchmark@example.com',
+        'social_links': {'github': 'https://github.com/example'},
+    })
+    ColorPalette.objects.create(name='Benchmark', is_active=True)
+
+    for index in range(24):
+        category = Skill.CATEGORY_CHOICES[index % len(Skill.CATEGORY_CHOICES)][0]
+        Skill.objects.create(
+            name=TECHNOLOGIES[index % len(TECHNOLOGIES)] + (f' {index}' if index >= len(TECHNOLOGIES) else ''),
+            category=category,
+            proficiency=rng.randint(1, 5),
+            order=index,
+        )
+
+    for index in range(6):
+        start = date(2015 + index, 1 + index, 1)
+        Experience.objects.create(
+            title=f'Sviluppatore {index + 1}',
+            company=f'Azienda {index + 1}',
+            location='Milano',
+            description=_sentence(rng, 40),
+            start_date=start,
+            end_date=None if index == 5 else start + timedelta(days=400),
+            is_current=index == 5,
+            order=index,
+        )
+
+    categories = [value for value, _ in Project.CATEGORY_CHOICES]
+    for index in range(projects):
+        project = Project.objects.create(
+            title=f'Progetto {index + 1} {rng.choice(WORDS)}',
+            short_description=_sentence(rng, 12),
+            description='\n\n'.join(_sentence(rng, 60) for _ in range(4)),
+            technologies=', '.join(rng.sample(TECHNOLOGIES, rng.randint(2, 6))),
+            category=rng.choice(categories),
+            featured=index % 7 == 0,
+            order=rng.randint(0, 3),
+        )
+        # Date distribuite nel tempo, sempre le stesse a parità di seme
+        Project.objects.filter(pk=project.pk).update(
+            created_at=REFERENCE_DATE - timedelta(days=rng.randint(0, 1500))
+        )
+
+    # I correlati dipendono dalle date appena impostate
+    related.rebuild_all(Project, ProjectTechnology, RelatedProject)
+    return projects
@@ -0,0 +1,150 @@
+"""
+Versioni dei contenuti e cache in memoria di processo.
+
+Ogni gruppo di contenuti (tipicamente un modello) ha una versione salvata
+nel backend di cache condiviso tra i worker. Quando i dati cambiano la
+versione viene sostituita con un nuovo token: gli snapshot tenuti nella
+memoria del processo confrontano la versione ad ogni richiesta e si
+ricostruiscono quando non corrisponde più, e comunque dopo
+``SNAPSHOT_MAX_AGE`` secondi.
+
+Le versioni sono condivise solo se lo è il backend (database o Redis, vedi
+``CACHES`` in settings): con la cache locale di processo ogni worker vede
+solo le modifiche salvate da lui stesso.
+"""
+import threading
+import time
+import uuid
+
+from asgiref.sync import sync_to_async
+from django.conf import settings
+from django.core.cache import cache, caches
+from django.core.cache.backends.dummy import DummyCache
+from django.core.cache.backends.locmem import LocMemCache
+
+
+VERSION_KEY_PREFIX = 'portfolio:version:'
+SNAPSHOT_KEY_PREFIX = 'portfolio:snapshot:'
+DEFAULT_SNAPSHOT_MAX_AGE = 5 * 60
+
+_local_snapshots = {}
+_local_lock = threading.Lock()
+
+
+def is_shared_cache(alias='default'):
+    """Vero se il backend di cache è condiviso tra processi e istanze."""
+    return not isinstance(caches[alias], (LocMemCache, DummyCache))
+
+
+def version_name(model):
+    """Nome della versione associata a un modello (es. 'portfolio.project')."""
+    return model._meta.label_lower
+
+
+def version_key(name):
+    """Chiave di cache in cui è salvata la versione indicata."""
+    return f'{VERSION_KEY_PREFIX}{name}'
+
+
+def _new_token():
+    return uuid.uuid4().hex
+
+
+def get_versions(*names):
+    """
+    Restituisce una tupla con le versioni correnti, nello stesso ordine dei
+    nomi richiesti. Costa una sola lettura dalla cache.
+    """
+    keys = [version_key(name) for name in names]
+    found = cache.get_many(keys)
+    versions = []
+    for key in keys:
+        token = found.get(key)
+        if token is None:
+            # Versione mai pubblicata o espulsa dalla cache: ne pubblica una
+            # nuova, così nessuno snapshot precedente può più essere valido.
+            cache.add(key, _new_token(), None)
+            token = cache.get(key)
+        versions.append(token)
+    return tuple(versions)
+
+
+async def aget_versions(*names):
+    """
+    Variante di ``get_versions`` per il codice asincrono: la cache su
+    database non può essere letta dal ciclo di eventi.
+    """
+    return await sync_to_async(get_versions)(*names)
+
+
+def get_version(name):
+    """Restituisce la versione corrente di un singolo nome."""
+    return get_versions(name)[0]
+
+
+def bump_version(*names):
+    """Invalida tutti i dati che dipendono dalle versioni indicate."""
+    cache.set_many({version_key(name): _new_token() for name in names}, None)
+
+
+def _local_snapshot(key, versions):
+    """
+    Snapshot in memoria per ``versions``, se non è più vecchio di
+    ``SNAPSHOT_MAX_AGE``: un'invalidazione persa non dura per sempre.
+    """
+    entry = _local_snapshots.get(key)
+    if entry is None or entry[0] != versions or entry[2] <= time.monotonic():
+        return None
+    return entry[1]
+
+
+def get_snapshot(key, dependencies, builder, shared=False):
+    """
+    Restituisce l'oggetto costruito da ``builder`` tenendolo in memoria di
+    processo finché le versioni in ``dependencies`` non cambiano.
+
+    Con ``shared=True`` l'oggetto viene salvato anche nel backend di cache,
+    così gli altri worker lo riusano invece di ricostruirlo (deve quindi
+    essere serializzabile con pickle).
+
+    L'oggetto restituito è condiviso tra le richieste: ``builder`` deve
+    produrre valori immutabili.
+    """
+    versions = get_versions(*dependencies)
+    value = _local_snapshot(key, versions)
+    if value is not None:
+        return value
+
+    value = None
+    if shared:
+        shared_entry = cache.get(f'{SNAPSHOT_KEY_PREFIX}{key}')
+        if shared_entry is not None and shared_entry[0] == versions:
+            value = shared_entry[1]
+    if value is None:
+        value = builder()
+        if shared:
+            cache.set(f'{SNAPSHOT_KEY_PREFIX}{key}', (versions, value), None)
+
+    max_age = getattr(settings, 'SNAPSHOT_MAX_AGE', DEFAULT_SNAPSHOT_MAX_AGE)
+    with _local_lock:
+        _local_snapshots[key] = (versions, value, time.monotonic() + max_age)
+    return value
+
+
+async def aget_snapshot(key, dependencies, builder, shared=False):
+    """
+    Variante di ``get_snapshot`` per le view asincrone: se lo snapshot in
+    memoria è aggiornato viene restituito subito, altrimenti la
+    ricostruzione (che esegue query) avviene in un thread.
+    """
+    versions = await aget_versions(*dependencies)
+    value = _local_snapshot(key, versions)
+    if value is not None:
+        return value
+    return await sync_to_async(get_snapshot)(key, dependencies, builder, shared)
+
+
+def clear_snapshots():
+    """Svuota la memoria di processo (utile dopo import massivi o nei test)."""
+    with _local_lock:
+        _local_snapshots.clear()
@@ -0,0 +1,208 @@
+"""
+Cataloghi precalcolati: skill raggruppate per categoria e nuvola delle
+tecnologie dei progetti.
+
+Vengono costruiti con una sola query e riusati finché i modelli da cui
+dipendono non vengono modificati.
+"""
+import json
+from dataclasses import dataclass
+from typing import Tuple
+
+from django.core.serializers.json import DjangoJSONEncoder
+from django.db.models import Count
+
+from .cache import aget_snapshot, get_snapshot, version_name
+from .models import Project, Skill, Technology
+
+
+# Icona mostrata accanto al titolo di ogni categoria
+CATEGORY_ICONS = {
+    'backend': 'fas fa-server',
+    'frontend': 'fas fa-palette',
+    'mobile': 'fas fa-mobile-alt',
+    'devops': 'fas fa-cloud',
+    'tools': 'fas fa-tools',
+    'database': 'fas fa-database',
+}
+DEFAULT_CATEGORY_ICON = 'fas fa-code'
+
+
+@dataclass(frozen=True)
+class SkillEntry:
+    """Skill con i campi di visualizzazione già calcolati."""
+    name: str
+    category: str
+    category_display: str
+    proficiency: int
+    level: int
+    icon: str
+
+
+@dataclass(frozen=True)
+class SkillGroup:
+    category: str
+    label: str
+    icon: str
+    skills: Tuple[SkillEntry, ...]
+
+
+@dataclass(frozen=True)
+class SkillCatalog:
+    """
+    Skill raggruppate per categoria nell'ordine di visualizzazione.
+    Nei template ``skill_catalog.backend`` restituisce il gruppo Backend.
+    """
+    groups: Tuple[SkillGroup, ...]
+    api_json: str
+
+    def __iter__(self):
+        return iter(self.groups)
+
+    def __len__(self):
+        return sum(len(group.skills) for group in self.groups)
+
+    def __getitem__(self, category):
+        for group in self.groups:
+            if group.category == category:
+                return group
+        raise KeyError(category)
+
+    @property
+    def skills(self):
+        return tuple(skill for group in self.groups for skill in group.skills)
+
+
+def build_skill_catalog():
+    """Legge tutte le skill con una query e le raggruppa."""
+    labels = dict(Skill.CATEGORY_CHOICES)
+    grouped = {}
+    for skill in Skill.objects.all():
+        grouped.setdefault(skill.category, []).append(SkillEntry(
+            name=skill.name,
+            category=skill.category,
+            category_display=labels.get(skill.category, skill.category),
+            proficiency=skill.proficiency,
+            level=skill.level,
+            icon=skill.icon,
+        ))
+
+    groups = tuple(
+        SkillGroup(
+            category=category,
+            label=labels.get(category, category),
+            icon=CATEGORY_ICONS.get(category, DEFAULT_CATEGORY_ICON),
+            skills=tuple(skills),
+        )
+        for category, skills in grouped.items()
+    )
+    api_data = {'skills': [
+        {
+            'name': skill.name,
+            'category': skill.category,
+            'category_display': skill.category_display,
+            'proficiency': skill.proficiency,
+            'icon': skill.icon,
+        }
+        for group in groups
+        for skill in group.skills
+    ]}
+    return SkillCatalog(
+        groups=groups,
+        api_json=json.dumps(api_data, cls=DjangoJSONEncoder),
+    )
+
+
+def get_skill_catalog():
+    """Restituisce il catalogo corrente, ricostruito solo se le skill cambiano."""
+    return get_snapshot(
+        'skill-catalog',
+        (version_name(Skill),),
+        build_skill_catalog,
+        shared=True,
+    )
+
+
+async def aget_skill_catalog():
+    return await aget_snapshot(
+        'skill-catalog',
+        (version_name(Skill),),
+        build_skill_catalog,
+        shared=True,
+    )
+
+
+# Numero di dimensioni diverse usate nella nuvola delle tecnologie
+CLOUD_WEIGHTS = 5
+
+
+@dataclass(frozen=True)
+class TechnologyCount:
+    pk: int
+    name: str
+    slug: str
+    count: int
+    weight: int
+
+
+@dataclass(frozen=True)
+class TechnologyCloud:
+    """Tecnologie usate nei progetti, dalla più frequente."""
+    technologies: Tuple[TechnologyCount, ...]
+
+    def __iter__(self):
+        return iter(self.technologies)
+
+    def __len__(self):
+        return len(self.technologies)
+
+    def get(self, slug):
+        for technology in self.technologies:
+            if technology.slug == slug:
+                return technology
+        return None
+
+
+def technology_counts():
+    """Tecnologie usate da almeno un progetto, dalla più frequente."""
+    return (
+        Technology.objects
+        .annotate(project_count=Count('project_links'))
+        .filter(project_count__gt=0)
+        .order_by('-project_count', 'name')
+    )
+
+
+def build_technology_cloud():
+    """Conta i progetti di ogni tecnologia con una query aggregata."""
+    rows = list(technology_counts().values_list('pk', 'name', 'slug', 'project_count'))
+    highest = rows[0][3] if rows else 1
+    return TechnologyCloud(technologies=tuple(
+        TechnologyCount(
+            pk=pk,
+            name=name,
+            slug=slug,
+            count=count,
+            weight=1 + (count - 1) * (CLOUD_WEIGHTS - 1) // max(highest - 1, 1),
+        )
+        for pk, name, slug, count in rows
+    ))
+
+
+def get_technology_cloud():
+    """Restituisce la nuvola corrente, ricostruita solo se i progetti cambiano."""
+    return get_snapshot(
+        'technology-cloud',
+        (version_name(Project),),
+        build_technology_cloud,
+        shared=True,
+    )
+
+
+async def aget_technology_cloud():
+    return await aget_snapshot(
+        'technology-cloud',
+        (version_name(Project),),
+        build_technology_cloud,
+        shared=True,
+    )
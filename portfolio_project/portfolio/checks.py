@@ -0,0 +1,21 @@
+"""Controlli di sistema della configurazione del portfolio."""
+from django.conf import settings
+from django.core.checks import Tags, Warning, register
+
+from .cache import is_shared_cache
+
+
+@register(Tags.caches)
+def check_shared_cache(app_configs, **kwargs):
+    """
+    Senza DEBUG la cache deve essere condivisa: con quella locale di
+    processo le modifiche non invalidano gli altri worker o istanze.
+    """
+    if settings.DEBUG or is_shared_cache():
+        return []
+    return [Warning(
+        'La cache predefinita non è condivisa tra i processi: con più worker '
+        'o istanze serverless le modifiche restano invisibili agli altri.',
+        hint='Usare la cache su database (default) o Redis (REDIS_URL) invece di CACHE_BACKEND=locmem.',
+        id='portfolio.W001',
+    )]
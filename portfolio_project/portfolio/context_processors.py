@@ -1,22 +1,27 @@
-from .models import SiteSettings, ColorPalette
+from .snapshots import get_site_snapshot
+from .timing import timed
+
+
+# Voci della navbar: le altre pagine non evidenziano nessuna voce
+NAVIGATION = ('home', 'about', 'projects', 'contact')
 
 
 def site_settings(request):
     """
     Context processor per rendere disponibili le impostazioni del sito
     in tutti i template.
+    Legge uno snapshot immutabile tenuto in memoria: nessuna query finché
+    impostazioni e palette non vengono modificate. Lo snapshot identifica
+    anche la versione dei frammenti in cache di ``base.html``.
     """
-    settings = SiteSettings.get_settings()
-    
-    # Ottieni la palette attiva
-    palette = None
-    if settings.current_palette:
-        palette = settings.current_palette
-    else:
-        # Cerca una palette attiva
-        palette = ColorPalette.objects.filter(is_active=True).first()
-    
+    # Le view asincrone leggono lo snapshot prima del rendering
+    with timed('context'):
+        snapshot = getattr(request, 'site_snapshot', None) or get_site_snapshot()
+
+    url_name = getattr(request.resolver_match, 'url_name', None)
     return {
-        'site_settings': settings,
-        'active_palette': palette,
+        'site_snapshot': snapshot,
+        'site_settings': snapshot.settings,
+        'active_palette': snapshot.palette,
+        'active_nav': url_name if url_name in NAVIGATION else '',
     }
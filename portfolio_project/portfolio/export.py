@@ -0,0 +1,168 @@
+"""
+Esportazione statica delle pagine pubbliche.
+
+Le pagine vengono renderizzate con il client di test di Django (quindi con
+middleware, context processor e template reali) e scritte in una cartella
+servita come file statici. Per ogni file viene salvato l'hash del
+contenuto in ``.export-manifest.json``: alla riesecuzione vengono riscritti
+solo i file cambiati ed eliminati quelli delle pagine che non esistono più.
+Questo vale per le esportazioni ripetute nella stessa cartella (in locale):
+il build di Vercel parte da una cartella vuota e scrive ogni volta tutto.
+
+Le varianti della lista progetti con ``category`` e ``page`` vengono
+salvate in ``projects/_query/<parametri>/index.html``; le regole di
+``vercel.json`` le associano all'URL con i parametri GET corrispondenti e
+inoltrano a Django le combinazioni non esportate (es. una pagina oltre
+l'ultima, per cui la view mostra l'ultima pagina).
+"""
+import hashlib
+import json
+import math
+import os
+from dataclasses import dataclass
+from pathlib import Path
+from typing import Tuple
+
+from django.conf import settings
+from django.db.models import Count
+from django.test import Client
+from django.urls import reverse
+
+from .models import Project
+from .snapshots import get_site_snapshot
+
+
+MANIFEST_NAME = '.export-manifest.json'
+QUERY_DIR = '_query'
+# Parametri GET esportati, nell'ordine usato per il nome della cartella
+QUERY_PARAMS = ('category', 'page')
+# URL che non esiste, usato per generare la pagina 404
+NOT_FOUND_PATH = '/__static-export-404__/'
+
+
+@dataclass(frozen=True)
+class ExportedPage:
+    """Un URL da esportare e il file in cui salvarlo."""
+    path: str
+    params: Tuple[Tuple[str, str], ...]
+    filename: str
+    status: int = 200
+
+
+def output_filename(path, params=(), index='index.html'):
+    """
+    Nome del file (relativo alla cartella di output) per un URL, ad esempio
+    ``/projects/?category=web&page=2`` -> ``projects/_query/category-web.page-2/index.html``.
+    """
+    parts = [part for part in path.strip('/').split('/') if part]
+    if params:
+        values = dict(params)
+        parts += [QUERY_DIR, '.'.join(
+            f'{name}-{values[name]}' for name in QUERY_PARAMS if name in values
+        )]
+    return '/'.join(parts + [index])
+
+
+def _page(path, params=(), index='index.html', status=200):
+    params = tuple(params)
+    return ExportedPage(path, params, output_filename(path, params, index), status)
+
+
+def public_pages():
+    """Tutte le pagine pubbliche da esportare."""
+    from .views import PROJECTS_PER_PAGE
+
+    pages = [
+        _page(reverse('home')),
+        _page(reverse('about')),
+        _page(reverse('api_palette'), index='index.json'),
+        _page(reverse('api_skills'), index='index.json'),
+        _page(reverse('api_projects'), index='index.json'),
+    ]
+
+    palette = get_site_snapshot().palette
+    if palette:
+        url = palette.stylesheet_url
+        pages.append(ExportedPage(url, (), url.lstrip('/')))
+
+    # Lista progetti: tutte le categorie (anche "all") e tutte le pagine
+    projects_url = reverse('projects')
+    cursor_mode = getattr(settings, 'PROJECTS_PAGINATION', 'offset') == 'cursor'
+    counts = dict(
+        Project.objects.order_by().values_list('category')
+        .annotate(total=Count('pk'))
+    )
+    categories = [(None, sum(counts.values())), ('all', sum(counts.values()))]
+    categories += [(value, counts.get(value, 0)) for value, _ in Project.CATEGORY_CHOICES]
+    for category, total in categories:
+        base = (('category', category),) if category else ()
+        pages.append(_page(projects_url, base))
+        if cursor_mode:
+            continue
+        for number in range(1, max(math.ceil(total / PROJECTS_PER_PAGE), 1) + 1):
+            pages.append(_page(projects_url, base + (('page', str(number)),)))
+
+    for slug in Project.objects.order_by('pk').values_list('slug', flat=True):
+        pages.append(_page(reverse('project_detail', args=[slug])))
+
+    pages.append(ExportedPage(NOT_FOUND_PATH, (), '404.html', status=404))
+    return pages
+
+
+def content_hash(content):
+    return hashlib.sha256(content).hexdigest()
+
+
+def load_manifest(output):
+    try:
+        with open(Path(output) / MANIFEST_NAME, encoding='utf-8') as handle:
+            return json.load(handle)
+    except (OSError, ValueError):
+        return {}
+
+
+def _write(path, content):
+    """Scrive il file in modo atomico."""
+    path.parent.mkdir(parents=True, exist_ok=True)
+    temporary = path.with_name(path.name + '.tmp')
+    temporary.write_bytes(content)
+    os.replace(temporary, path)
+
+
+def export_pages(output, pages, host='localhost', secure=True):
+    """
+    Renderizza ``pages`` in ``output``. Restituisce un dizionario con le
+    liste dei file ``written``, ``unchanged`` e ``removed``.
+    Solleva ``RuntimeError`` se una pagina risponde con uno stato inatteso.
+    """
+    output = Path(output)
+    previous = load_manifest(output)
+    manifest = {}
+    result = {'written': [], 'unchanged': [], 'removed': []}
+
+    client = Client(HTTP_HOST=host)
+    for page in pages:
+        response = client.get(page.path, dict(page.params), secure=secure)
+        if response.status_code != page.status:
+            raise RuntimeError(
+                f'{page.path} {dict(page.params)}: risposta {response.status_code}, '
+                f'attesa {page.status}'
+            )
+        digest = content_hash(response.content)
+        manifest[page.filename] = digest
+        target = output / page.filename
+        if previous.get(page.filename) == digest and target.exists():
+            result['unchanged'].append(page.filename)
+            continue
+        _write(target, response.content)
+        result['written'].append(page.filename)
+
+    for filename in sorted(set(previous) - set(manifest)):
+        try:
+            (output / filename).unlink()
+        except FileNotFoundError:
+            pass
+        result['removed'].append(filename)
+
+    _write(output / MANIFEST_NAME, json.dumps(manifest, indent=2, sort_keys=True).encode('utf-8'))
+    return result
@@ -54,3 +54,4 @@ class ContactForm(forms.ModelForm):
                 "Il messaggio deve contenere almeno 10 caratteri."
             )
         return message
+
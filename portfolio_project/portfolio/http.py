@@ -0,0 +1,68 @@
+"""
+Decoratori HTTP per le API: ETag basati sulle versioni dei contenuti e
+header Cache-Control configurabili da settings.
+"""
+from functools import wraps
+
+from asgiref.sync import iscoroutinefunction
+
+from django.conf import settings
+from django.utils.cache import patch_cache_control
+from django.views.decorators.http import condition
+
+from .cache import aget_versions, get_versions, version_name
+
+
+def versioned_etag(*models):
+    """
+    Gestisce If-None-Match usando come ETag la versione dei modelli indicati.
+    La richiesta condizionale riceve un 304 senza eseguire la view, quindi
+    senza query ai modelli. Per le view asincrone la versione viene letta
+    prima, fuori dal ciclo di eventi.
+    """
+    names = tuple(version_name(model) for model in models)
+
+    def etag_func(request, *args, **kwargs):
+        etag = getattr(request, '_versioned_etag', None)
+        return etag if etag is not None else '-'.join(get_versions(*names))
+
+    def decorator(view_func):
+        conditional = condition(etag_func=etag_func)(view_func)
+        if not iscoroutinefunction(view_func):
+            return conditional
+
+        @wraps(view_func)
+        async def wrapper(request, *args, **kwargs):
+            request._versioned_etag = '-'.join(await aget_versions(*names))
+            return await conditional(request, *args, **kwargs)
+
+        return wrapper
+
+    return decorator
+
+
+def api_cache_control(name):
+    """
+    Applica gli header Cache-Control definiti in
+    ``settings.API_CACHE_CONTROL[name]`` (anche alle risposte 304).
+    Funziona sia con view sincrone sia con view asincrone.
+    """
+    def apply(response):
+        options = getattr(settings, 'API_CACHE_CONTROL', {}).get(name)
+        if options:
+            patch_cache_control(response, **options)
+        return response
+
+    def decorator(view_func):
+        if iscoroutinefunction(view_func):
+            @wraps(view_func)
+            async def wrapper(request, *args, **kwargs):
+                return apply(await view_func(request, *args, **kwargs))
+        else:
+            @wraps(view_func)
+            def wrapper(request, *args, **kwargs):
+                return apply(view_func(request, *args, **kwargs))
+
+        return wrapper
+
+    return decorator
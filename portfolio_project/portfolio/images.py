@@ -0,0 +1,226 @@
+"""
+Varianti ridimensionate delle immagini caricate.
+
+Per ogni immagine vengono generate più larghezze in WebP e JPEG, salvate
+con lo storage del campo (``STORAGES["default"]``: file system o
+Cloudinary). I nomi dei file vengono registrati sul modello nel campo
+``<campo>_variants`` e usati dal tag ``{% responsive_image %}`` per
+``srcset``, ``sizes`` e dimensioni intrinseche.
+"""
+import io
+import posixpath
+from dataclasses import dataclass
+from typing import Optional, Tuple
+
+from django.conf import settings
+from django.core.files.base import ContentFile
+from django.db import transaction
+
+
+DEFAULT_WIDTHS = (320, 640, 960, 1280)
+DEFAULT_QUALITY = 80
+
+# (chiave, formato Pillow, tipo MIME) nell'ordine in cui vanno proposti
+FORMATS = (
+    ('webp', 'WEBP', 'image/webp'),
+    ('jpeg', 'JPEG', 'image/jpeg'),
+)
+FALLBACK_FORMAT = 'jpeg'
+
+VARIANTS_DIR = 'variants'
+
+
+def variant_widths():
+    return tuple(sorted(getattr(settings, 'IMAGE_VARIANT_WIDTHS', DEFAULT_WIDTHS)))
+
+
+def variants_field(field_name):
+    """Nome del campo che contiene le varianti di ``field_name``."""
+    return f'{field_name}_variants'
+
+
+# --------------------------------------------------------------------------
+# Generazione
+# --------------------------------------------------------------------------
+
+# Pillow viene importato solo quando si generano varianti: le richieste
+# che leggono le varianti già salvate non ne hanno bisogno
+def _open(field_file):
+    from PIL import Image, ImageOps
+
+    with field_file.open('rb') as handle:
+        image = Image.open(handle)
+        image.load()
+    return ImageOps.exif_transpose(image)
+
+
+def _flatten(image):
+    """Converte in RGB per il JPEG, con le parti trasparenti su bianco."""
+    from PIL import Image
+
+    if image.mode in ('RGBA', 'LA') or 'transparency' in image.info:
+        rgba = image.convert('RGBA')
+        background = Image.new('RGB', rgba.size, (255, 255, 255))
+        background.paste(rgba, mask=rgba.getchannel('A'))
+        return background
+    return image.convert('RGB')
+
+
+def _encode(image, pillow_format, quality):
+    buffer = io.BytesIO()
+    if pillow_format == 'JPEG':
+        image.save(buffer, 'JPEG', quality=quality, optimize=True, progressive=True)
+    else:
+        image.save(buffer, pillow_format, quality=quality)
+    return buffer.getvalue()
+
+
+def generate_variants(field_file):
+    """
+    Crea le varianti di un'immagine e restituisce il dizionario da salvare
+    sul modello. Se il file non è leggibile le varianti restano vuote, così
+    il salvataggio del modello non fallisce e il template usa l'originale.
+    """
+    from PIL import Image
+
+    data = {'source': field_file.name, 'width': None, 'height': None, 'formats': {}}
+    try:
+        image = _open(field_file)
+    except (OSError, ValueError, Image.DecompressionBombError):
+        return data
+
+    width, height = image.size
+    data['width'], data['height'] = width, height
+
+    widths = variant_widths()
+    targets = sorted({w for w in widths if w < width} | {min(width, widths[-1])})
+    sources = {
+        'webp': image if image.mode in ('RGB', 'RGBA') else image.convert('RGBA'),
+        'jpeg': _flatten(image),
+    }
+    quality = getattr(settings, 'IMAGE_VARIANT_QUALITY', DEFAULT_QUALITY)
+    directory, filename = posixpath.split(field_file.name)
+    stem = posixpath.splitext(filename)[0]
+
+    for key, pillow_format, _ in FORMATS:
+        source = sources[key]
+        variants = []
+        for target in targets:
+            resized = source if target == width else source.resize(
+                (target, max(1, round(height * target / width))),
+                Image.Resampling.LANCZOS,
+            )
+            name = posixpath.join(directory, VARIANTS_DIR, f'{stem}-{target}w.{key}')
+            name = field_file.storage.save(
+                name, ContentFile(_encode(resized, pillow_format, quality))
+            )
+            variants.append([target, name])
+        data['formats'][key] = variants
+    return data
+
+
+def delete_variants(data, storage):
+    """Elimina i file delle varianti indicate (l'originale non viene toccato)."""
+    for variants in (data or {}).get('formats', {}).values():
+        for _, name in variants:
+            try:
+                storage.delete(name)
+            except OSError:
+                pass
+
+
+def stored_variants(instance, field_name):
+    """
+    Varianti di ``field_name`` registrate nel database, non quelle in
+    memoria: l'istanza può essere stata creata senza caricarle (es. dal
+    form dell'admin). Va letta prima di ``save()``, che le sovrascrive.
+    """
+    if instance.pk is None:
+        return {}
+    attname = variants_field(field_name)
+    manager = type(instance)._default_manager
+    return manager.filter(pk=instance.pk).values_list(attname, flat=True).first() or {}
+
+
+def refresh_variants(instance, field_name, force=False, previous=None):
+    """
+    Rigenera le varianti di ``instance.<field_name>`` se l'immagine è
+    cambiata (o sempre con ``force``) e le salva senza passare da ``save()``.
+    ``previous`` sono le varianti salvate prima della modifica (di default
+    quelle nel database); i loro file vengono eliminati dopo il commit.
+    Restituisce ``True`` se le varianti sono state aggiornate.
+    """
+    field_file = getattr(instance, field_name)
+    attname = variants_field(field_name)
+    current = stored_variants(instance, field_name) if previous is None else previous
+    name = field_file.name or ''
+    if not force and current.get('source', '') == name:
+        if getattr(instance, attname) != current:
+            setattr(instance, attname, current)
+            type(instance)._default_manager.filter(pk=instance.pk).update(**{attname: current})
+        return False
+
+    # Un'immagine rimossa lascia le varianti vuote ed elimina le vecchie
+    data = generate_variants(field_file) if name else {}
+    setattr(instance, attname, data)
+    type(instance)._default_manager.filter(pk=instance.pk).update(**{attname: data})
+    if current:
+        # I vecchi file servono finché la transazione non è confermata
+        transaction.on_commit(lambda: delete_variants(current, field_file.storage))
+    return True
+
+
+# --------------------------------------------------------------------------
+# Descrizione per i template
+# --------------------------------------------------------------------------
+
+@dataclass(frozen=True)
+class ResponsiveImage:
+    """Immagine caricata con URL, dimensioni e ``srcset`` già risolti."""
+    name: str
+    url: str
+    width: Optional[int]
+    height: Optional[int]
+    # Coppie (tipo MIME, srcset) per gli elementi <source>
+    sources: Tuple[Tuple[str, str], ...]
+    srcset: str
+    src: str
+
+    def __str__(self):
+        return self.url
+
+
+def describe(field_file, data=None):
+    """
+    Crea la ``ResponsiveImage`` di un campo immagine. Varianti assenti o
+    relative a un file precedente vengono ignorate.
+    """
+    if not field_file:
+        return None
+    url = field_file.url
+    data = data or {}
+    if data.get('source') != field_file.name:
+        data = {}
+
+    storage = field_file.storage
+    srcsets = {}
+    src = url
+    for key, _, _ in FORMATS:
+        variants = data.get('formats', {}).get(key) or []
+        srcsets[key] = ', '.join(f'{storage.url(name)} {width}w' for width, name in variants)
+        if key == FALLBACK_FORMAT and variants:
+            src = storage.url(variants[-1][1])
+
+    return ResponsiveImage(
+        name=field_file.name,
+        url=url,
+        width=data.get('width'),
+        height=data.get('height'),
+        sources=tuple(
+            (mime, srcsets[key])
+            for key, _, mime in FORMATS
+            if key != FALLBACK_FORMAT and srcsets[key]
+        ),
+        srcset=srcsets[FALLBACK_FORMAT],
+        src=src,
+    )
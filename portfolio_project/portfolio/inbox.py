@@ -0,0 +1,235 @@
+"""
+Strumenti per la casella dei messaggi di contatto con molte righe.
+
+- Conteggi stimati: senza filtri il numero di messaggi viene dalle
+  statistiche del database (``pg_class.reltuples`` su PostgreSQL, estremi
+  della chiave primaria su SQLite); con i filtri il conteggio si ferma a
+  ``COUNT_LIMIT``.
+- Ricerca full-text su mittente, oggetto e testo: tabella FTS5 a contenuto
+  esterno su SQLite, indice GIN su PostgreSQL.
+- Paginazione a cursore (keyset) sull'ordinamento ``(-created_at, -id)``,
+  servita dagli indici dei messaggi: il costo non cresce con la pagina.
+"""
+from django.core.paginator import Paginator
+from django.db import connection
+from django.db.models import Max, Min, Q
+from django.utils.functional import cached_property
+
+from .models import ContactMessage
+from .search import search_backend, tokenize
+
+
+MESSAGE_FTS_TABLE = 'portfolio_contactmessage_fts'
+MESSAGE_FTS_COLUMNS = ('name', 'email', 'subject', 'message')
+
+# Deve coincidere con l'espressione dell'indice GIN creato dalla migrazione 0009
+MESSAGE_PG_VECTOR = (
+    "to_tsvector('simple', coalesce(name, '') || ' ' || coalesce(email, '') || ' ' || "
+    "coalesce(subject, '') || ' ' || coalesce(message, ''))"
+)
+
+# Oltre questo numero di risultati i conteggi con filtri non proseguono
+COUNT_LIMIT = 1000
+# Messaggi restituiti da una ricerca, dal più recente
+SEARCH_LIMIT = 1000
+
+KEYSET_ORDERING = ('-created_at', '-pk')
+
+
+# --------------------------------------------------------------------------
+# Indice full-text
+# --------------------------------------------------------------------------
+
+def _fts_values(message):
+    return [message.pk] + [getattr(message, column) or '' for column in MESSAGE_FTS_COLUMNS]
+
+
+def index_message(message):
+    """
+    Aggiunge un nuovo messaggio all'indice FTS5. I campi indicizzati non
+    cambiano dopo l'invio (in admin sono in sola lettura).
+    """
+    if search_backend() != 'sqlite':
+        return
+    with connection.cursor() as cursor:
+        cursor.execute(
+            f"INSERT INTO {MESSAGE_FTS_TABLE}(rowid, {', '.join(MESSAGE_FTS_COLUMNS)}) "
+            f"VALUES (%s, {', '.join(['%s'] * len(MESSAGE_FTS_COLUMNS))})",
+            _fts_values(message),
+        )
+
+
+def unindex_message(message):
+    """Rimuove un messaggio: con il contenuto esterno servono i valori indicizzati."""
+    if search_backend() != 'sqlite':
+        return
+    with connection.cursor() as cursor:
+        cursor.execute(
+            f"INSERT INTO {MESSAGE_FTS_TABLE}({MESSAGE_FTS_TABLE}, rowid, {', '.join(MESSAGE_FTS_COLUMNS)}) "
+            f"VALUES ('delete', %s, {', '.join(['%s'] * len(MESSAGE_FTS_COLUMNS))})",
+            _fts_values(message),
+        )
+
+
+def rebuild_index():
+    """Ricostruisce l'indice FTS5 dalla tabella dei messaggi."""
+    if search_backend() != 'sqlite':
+        return
+    with connection.cursor() as cursor:
+        cursor.execute(f"INSERT INTO {MESSAGE_FTS_TABLE}({MESSAGE_FTS_TABLE}) VALUES ('rebuild')")
+
+
+def matching_message_ids(query, limit=SEARCH_LIMIT):
+    """Id dei messaggi che corrispondono alla ricerca, dal più recente."""
+    tokens = tokenize(query)
+    if not tokens:
+        return []
+
+    backend = search_backend()
+    if backend == 'sqlite':
+        sql = (
+            f"SELECT rowid FROM {MESSAGE_FTS_TABLE} WHERE {MESSAGE_FTS_TABLE} MATCH %s "
+            f"ORDER BY rowid DESC LIMIT %s"
+        )
+        # Le ricerche per prefisso leggono tutte le occorrenze prima di
+        # ordinarle: si prova prima con le parole intere, che FTS5 scorre
+        # dalla più recente fermandosi al limite
+        with connection.cursor() as cursor:
+            cursor.execute(sql, [' '.join(f'"{token}"' for token in tokens), limit])
+            ids = [row[0] for row in cursor.fetchall()]
+        if len(ids) >= limit:
+            return ids
+        params = [' '.join(f'"{token}"*' for token in tokens), limit]
+    elif backend == 'postgresql':
+        sql = (
+            f"SELECT id FROM portfolio_contactmessage "
+            f"WHERE {MESSAGE_PG_VECTOR} @@ to_tsquery('simple', %s) "
+            f"ORDER BY id DESC LIMIT %s"
+        )
+        params = [' & '.join(f'{token}:*' for token in tokens), limit]
+    else:
+        condition = Q()
+        for token in tokens:
+            condition &= Q(subject__icontains=token) | Q(message__icontains=token)
+        return list(
+            ContactMessage.objects.filter(condition)
+            .order_by('-pk').values_list('pk', flat=True)[:limit]
+        )
+
+    with connection.cursor() as cursor:
+        cursor.execute(sql, params)
+        return [row[0] for row in cursor.fetchall()]
+
+
+# --------------------------------------------------------------------------
+# Conteggi
+# --------------------------------------------------------------------------
+
+def estimated_table_count(model):
+    """
+    Numero approssimato di righe della tabella, senza ``COUNT(*)``.
+    Su SQLite si usano gli estremi della chiave primaria, letti dall'indice:
+    è esatto finché non si eliminano righe in mezzo alla tabella.
+    """
+    table = model._meta.db_table
+    if connection.vendor == 'postgresql':
+        with connection.cursor() as cursor:
+            cursor.execute("SELECT reltuples::bigint FROM pg_class WHERE oid = %s::regclass", [table])
+            row = cursor.fetchone()
+        # -1 se la tabella non è mai stata analizzata
+        if row and row[0] >= 0:
+            return row[0]
+        return model._default_manager.count()
+    # Due query separate: SQLite ottimizza MIN e MAX solo se da soli
+    manager = model._default_manager.order_by()
+    low = manager.aggregate(value=Min('pk'))['value']
+    if low is None:
+        return 0
+    return manager.aggregate(value=Max('pk'))['value'] - low + 1
+
+
+class EstimatedCountPaginator(Paginator):
+    """
+    Paginator che non esegue ``COUNT(*)`` sull'intera tabella: il totale è
+    stimato senza filtri e limitato a ``COUNT_LIMIT`` con i filtri.
+    ``is_estimate`` indica se il numero mostrato non è esatto.
+    """
+    is_estimate = False
+
+    @cached_property
+    def count(self):
+        queryset = self.object_list
+        if not queryset.query.where:
+            self.is_estimate = True
+            return estimated_table_count(queryset.model)
+        count = queryset.order_by()[:COUNT_LIMIT + 1].count()
+        self.is_estimate = count > COUNT_LIMIT
+        return min(count, COUNT_LIMIT)
+
+
+# --------------------------------------------------------------------------
+# Paginazione a cursore
+# --------------------------------------------------------------------------
+
+class InvalidCursor(ValueError):
+    pass
+
+
+# Il primo termine limita l'intervallo sull'indice di created_at, il
+# secondo scarta i pari merito già visti: niente OR sull'intero indice
+def _older_than(created_at, pk):
+    return Q(created_at__lte=created_at) & (Q(created_at__lt=created_at) | Q(pk__lt=pk))
+
+
+def _at_or_older_than(created_at, pk):
+    return Q(created_at__lte=created_at) & (Q(created_at__lt=created_at) | Q(pk__lte=pk))
+
+
+def _newer_than(created_at, pk):
+    return Q(created_at__gte=created_at) & (Q(created_at__gt=created_at) | Q(pk__gt=pk))
+
+
+def keyset_page(queryset, cursor, per_page):
+    """
+    Pagina di ``queryset`` (ordinato per ``KEYSET_ORDERING``) a partire dal
+    cursore: ``o<id>`` per i messaggi più vecchi di ``id``, ``n<id>`` per
+    quelli più recenti. Restituisce ``(queryset della pagina, cursore
+    successivo, cursore precedente)``; i cursori sono None ai bordi.
+    """
+    if cursor:
+        direction, pk = cursor[:1], cursor[1:]
+        if direction not in ('o', 'n') or not pk.isdigit():
+            raise InvalidCursor(cursor)
+        created_at = ContactMessage.objects.filter(pk=pk).values_list('created_at', flat=True).first()
+        if created_at is None:
+            raise InvalidCursor(cursor)
+        pk = int(pk)
+        if direction == 'o':
+            page = queryset.filter(_older_than(created_at, pk))[:per_page]
+        else:
+            # La pagina più recente prima del cursore parte dal suo elemento
+            # più nuovo, trovato scorrendo all'indietro
+            start = (
+                queryset.filter(_newer_than(created_at, pk))
+                .order_by('created_at', 'pk')
+                .values_list('created_at', 'pk')[per_page - 1:per_page]
+            )
+            start = next(iter(start), None)
+            if start is None:
+                page = queryset[:per_page]
+            else:
+                page = queryset.filter(_at_or_older_than(*start))[:per_page]
+    else:
+        page = queryset[:per_page]
+
+    rows = list(page)
+    if not rows:
+        return page, None, None
+    first, last = rows[0], rows[-1]
+    has_next = queryset.filter(_older_than(last.created_at, last.pk)).exists()
+    has_previous = bool(cursor) and queryset.filter(_newer_than(first.created_at, first.pk)).exists()
+    return (
+        page,
+        f'o{last.pk}' if has_next else None,
+        f'n{first.pk}' if has_previous else None,
+    )
@@ -0,0 +1,47 @@
+from datetime import datetime, time, timedelta
+
+from django.core.management.base import BaseCommand, CommandError
+from django.utils import timezone
+from django.utils.dateparse import parse_date
+
+from portfolio.archive import DEFAULT_BATCH_SIZE, archive_messages, archive_root, default_cutoff
+
+
+class Command(BaseCommand):
+    help = (
+        'Sposta i messaggi di contatto letti più vecchi della soglia di '
+        'conservazione in archivi NDJSON compressi, uno per mese.'
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument('--days', type=int, default=None,
+                            help='Archivia i messaggi più vecchi di N giorni (default MESSAGE_RETENTION_DAYS).')
+        parser.add_argument('--before', default=None,
+                            help='Archivia i messaggi creati prima di questa data (AAAA-MM-GG).')
+        parser.add_argument('--batch-size', type=int, default=DEFAULT_BATCH_SIZE,
+                            help=f'Messaggi letti ed eliminati per ogni transazione (default {DEFAULT_BATCH_SIZE}).')
+        parser.add_argument('--dry-run', action='store_true',
+                            help='Conta i messaggi da archiviare senza scrivere né eliminare nulla.')
+
+    def handle(self, *args, **options):
+        if options['before']:
+            day = parse_date(options['before'])
+            if day is None:
+                raise CommandError(f"Data non valida: {options['before']}")
+            cutoff = timezone.make_aware(datetime.combine(day, time.min))
+        elif options['days'] is not None:
+            cutoff = timezone.now() - timedelta(days=options['days'])
+        else:
+            cutoff = default_cutoff()
+
+        count = archive_messages(
+            cutoff=cutoff,
+            batch_size=options['batch_size'],
+            dry_run=options['dry_run'],
+        )
+        if options['dry_run']:
+            self.stdout.write(f'Messaggi da archiviare (prima del {cutoff:%Y-%m-%d}): {count}')
+        else:
+            self.stdout.write(self.style.SUCCESS(
+                f'Messaggi archiviati in {archive_root()}: {count}'
+            ))
@@ -0,0 +1,54 @@
+from datetime import datetime, time, timedelta
+
+from django.core.management.base import BaseCommand, CommandError
+from django.utils import timezone
+from django.utils.dateparse import parse_date
+
+from portfolio.archive import read_archive, restore_messages, search_archive
+
+
+def _day_start(value):
+    day = parse_date(value)
+    if day is None:
+        raise CommandError(f'Data non valida: {value}')
+    return timezone.make_aware(datetime.combine(day, time.min))
+
+
+class Command(BaseCommand):
+    help = (
+        'Cerca o ripristina i messaggi di contatto archiviati in un '
+        'intervallo di date, leggendo solo i blocchi che lo riguardano.'
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument('--from', dest='start', default=None,
+                            help='Primo giorno incluso (AAAA-MM-GG).')
+        parser.add_argument('--to', dest='end', default=None,
+                            help='Ultimo giorno incluso (AAAA-MM-GG).')
+        parser.add_argument('--search', default='',
+                            help='Solo i messaggi che contengono tutte queste parole.')
+        parser.add_argument('--restore', action='store_true',
+                            help='Reinserisce nel database i messaggi trovati.')
+
+    def handle(self, *args, **options):
+        start = options['start'] and _day_start(options['start'])
+        end = options['end'] and _day_start(options['end']) + timedelta(days=1)
+
+        if options['search']:
+            rows = search_archive(options['search'], start, end)
+        else:
+            rows = read_archive(start, end)
+
+        if options['restore']:
+            restored = restore_messages(rows)
+            self.stdout.write(self.style.SUCCESS(f'Messaggi ripristinati: {restored}'))
+            return
+
+        count = 0
+        for row in rows:
+            count += 1
+            self.stdout.write(
+                f"{timezone.localtime(row['created_at']):%Y-%m-%d %H:%M}  #{row['id']}  "
+                f"{row['name']} <{row['email']}>  {row['subject']}"
+            )
+        self.stdout.write(f'Messaggi trovati: {count}')
@@ -0,0 +1,34 @@
+from django.core.management.base import BaseCommand, CommandError
+from django.db import connection
+
+from portfolio.query_audit import audit
+
+
+class Command(BaseCommand):
+    help = (
+        'Esegue EXPLAIN sulle query più frequenti delle view e segnala '
+        'letture complete delle tabelle e ordinamenti temporanei.'
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument('--verbose-plans', action='store_true',
+                            help='Stampa il piano completo di ogni query.')
+
+    def handle(self, *args, **options):
+        results = audit()
+        failures = 0
+        for query, plan, problems in results:
+            if problems:
+                failures += 1
+                self.stdout.write(self.style.ERROR(f'✗ {query.name}'))
+                for problem, line in problems:
+                    self.stdout.write(f'    {problem}: {line}')
+            else:
+                self.stdout.write(self.style.SUCCESS(f'✓ {query.name}'))
+            if options['verbose_plans']:
+                for line in plan:
+                    self.stdout.write(f'    | {line}')
+
+        if failures:
+            raise CommandError(f'{failures} query con piani da correggere ({connection.vendor}).')
+        self.stdout.write(f'Nessun problema nei piani di {len(results)} query ({connection.vendor}).')
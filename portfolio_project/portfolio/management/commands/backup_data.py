@@ -0,0 +1,25 @@
+from django.core.management.base import BaseCommand
+
+from portfolio.backup import DEFAULT_BATCH_SIZE, backup
+
+
+class Command(BaseCommand):
+    help = (
+        'Salva i dati del portfolio in un file NDJSON (compresso con gzip se '
+        'termina in .gz), leggendo le tabelle a blocchi.'
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument('path', help='File di destinazione, es. backup.ndjson.gz')
+        parser.add_argument('--batch-size', type=int, default=DEFAULT_BATCH_SIZE,
+                            help=f'Righe lette per ogni query (default {DEFAULT_BATCH_SIZE}).')
+
+    def handle(self, *args, **options):
+        report = backup(options['path'], batch_size=options['batch_size'])
+        for label, count in report.counts.items():
+            self.stdout.write(f'  {label}: {count}')
+        self.stdout.write(self.style.SUCCESS(
+            f"Backup salvato in {options['path']}: {report.total} righe, "
+            f'{report.bytes / 1024:.1f} KiB in {report.seconds:.2f}s '
+            f'({report.rows_per_second:.0f} righe/s)'
+        ))
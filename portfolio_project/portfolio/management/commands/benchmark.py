@@ -0,0 +1,154 @@
+import json
+import os
+import subprocess
+import sys
+import tempfile
+from pathlib import Path
+
+from django.conf import settings
+from django.core.cache import cache
+from django.core.management import call_command
+from django.core.management.base import BaseCommand, CommandError
+from django.test.utils import override_settings, setup_databases, teardown_databases
+
+from portfolio.benchmark.report import build_report, compare, load_report, write_report
+from portfolio.benchmark.routes import benchmark_routes
+from portfolio.benchmark.runner import HttpTarget, InProcessTarget, local_server, run
+from portfolio.benchmark.seed import seed
+
+
+class Command(BaseCommand):
+    help = (
+        'Misura throughput, latenza p50/p95/p99, query SQL e byte di ogni '
+        'route pubblica su dati di prova generati, in-process o via HTTP.'
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument('--mode', choices=('inprocess', 'http'), default='inprocess',
+                            help='inprocess: client di test su un database di test; '
+                                 'http: richieste reali a un server (default inprocess).')
+        parser.add_argument('--url',
+                            help='Modalità http: URL base di un server già avviato sui dati locali.')
+        parser.add_argument('--serve', action='store_true',
+                            help='Modalità http: avvia runserver su un database temporaneo con i dati di prova.')
+        parser.add_argument('--requests', type=int, default=200,
+                            help='Richieste per ogni route (default 200).')
+        parser.add_argument('--concurrency', type=int, default=8,
+                            help='Richieste contemporanee (default 8).')
+        parser.add_argument('--projects', type=int, default=60,
+                            help='Progetti generati nei dati di prova (default 60).')
+        parser.add_argument('--seed', type=int, default=42,
+                            help='Seme dei dati di prova (default 42).')
+        parser.add_argument('--route', action='append', dest='routes',
+                            help='Misura solo le route con questo prefisso, ripetibile.')
+        parser.add_argument('--page-cache', action='store_true',
+                            help='Lascia attiva la cache delle pagine (di default è disattivata).')
+        parser.add_argument('--output',
+                            help='File JSON in cui salvare i risultati.')
+        parser.add_argument('--baseline',
+                            help='Report JSON di riferimento: esce con errore se una route peggiora.')
+        parser.add_argument('--threshold', type=float, default=10.0,
+                            help='Peggioramento tollerato in percentuale (default 10).')
+        parser.add_argument('--seed-only', action='store_true',
+                            help='Uso interno: migra e popola il database configurato, poi stampa le route.')
+
+    def handle(self, *args, **options):
+        if options['seed_only']:
+            return self._seed_only(options)
+
+        if options['mode'] == 'inprocess':
+            results = self._run_inprocess(options)
+        elif options['serve']:
+            results = self._run_served(options)
+        elif options['url']:
+            target = HttpTarget(options['url'])
+            results = run(target, benchmark_routes(options['routes']),
+                          options['requests'], options['concurrency'])
+        else:
+            raise CommandError('La modalità http richiede --url oppure --serve.')
+
+        report = build_report(
+            results,
+            mode=options['mode'],
+            requests=options['requests'],
+            concurrency=options['concurrency'],
+            projects=options['projects'],
+            seed=options['seed'],
+            page_cache=options['page_cache'],
+            async_views=settings.ASYNC_VIEWS,
+        )
+        self._print(results)
+        if options['output']:
+            write_report(options['output'], report)
+            self.stdout.write(f'Risultati salvati in {options["output"]}')
+
+        if options['baseline']:
+            regressions = [
+                row for row in compare(load_report(options['baseline']), report, options['threshold'])
+                if row[-1]
+            ]
+            for label, metric, old, new, change, _ in regressions:
+                self.stderr.write(f'REGRESSIONE {label} {metric}: {old:.2f} -> {new:.2f} ({change:+.1f}%)')
+            if regressions:
+                sys.exit(1)
+
+    def _seed_only(self, options):
+        # Protezione: popola solo il database temporaneo creato da --serve
+        if os.environ.get('BENCHMARK_SEEDING') != '1':
+            raise CommandError('--seed-only è riservato all\'uso interno di --serve.')
+        call_command('migrate', verbosity=0, interactive=False)
+        seed(options['projects'], options['seed'])
+        cache.clear()
+        self.stdout.write(json.dumps(benchmark_routes(options['routes'])))
+
+    def _run_inprocess(self, options):
+        with override_settings(PAGE_CACHE_ENABLED=options['page_cache']):
+            old_config = setup_databases(verbosity=0, interactive=False)
+            try:
+                seed(options['projects'], options['seed'])
+                cache.clear()
+                return run(InProcessTarget(), benchmark_routes(options['routes']),
+                           options['requests'], options['concurrency'])
+            finally:
+                cache.clear()
+                teardown_databases(old_config, verbosity=0)
+
+    def _run_served(self, options):
+        with tempfile.TemporaryDirectory() as directory:
+            database_url = f'sqlite:///{Path(directory) / "benchmark.sqlite3"}'
+            env = {
+                'DJANGO_SETTINGS_MODULE': os.environ.get('DJANGO_SETTINGS_MODULE', 'portfolio_project.settings'),
+                'PYTHONPATH': str(settings.BASE_DIR),
+                'PAGE_CACHE_ENABLED': str(options['page_cache']),
+                'DEBUG': 'False',
+                # Il numero di query arriva nell'header Server-Timing
+                'SERVER_TIMING': 'True',
+            }
+            command = [
+                sys.executable, '-m', 'django', 'benchmark', '--seed-only',
+                '--projects', str(options['projects']), '--seed', str(options['seed']),
+            ]
+            command += [f'--route={route}' for route in options['routes'] or ()]
+            process = subprocess.run(
+                command, capture_output=True, text=True,
+                env={**os.environ, **env, 'DATABASE_URL': database_url, 'BENCHMARK_SEEDING': '1'},
+            )
+            if process.returncode:
+                raise CommandError(process.stderr.strip())
+            routes = [tuple(route) for route in json.loads(process.stdout.strip().splitlines()[-1])]
+
+            with local_server(database_url, env) as base_url:
+                return run(HttpTarget(base_url), routes, options['requests'], options['concurrency'])
+
+    def _print(self, results):
+        self.stdout.write(
+            f'{"route":<22} {"req/s":>8} {"p50 ms":>8} {"p95 ms":>8} {"p99 ms":>8} '
+            f'{"query":>6} {"byte":>8} {"errori":>6}'
+        )
+        for label, stats in results.items():
+            queries = '-' if stats['queries'] is None else f'{stats["queries"]:g}'
+            self.stdout.write(
+                f'{label:<22} {stats["throughput"]:>8.1f} {stats["p50_ms"]:>8.2f} '
+                f'{stats["p95_ms"]:>8.2f} {stats["p99_ms"]:>8.2f} {queries:>6} '
+                f'{stats["bytes"]:>8g} {stats["errors"]:>6}'
+            )
@@ -0,0 +1,31 @@
+import sys
+
+from django.core.management.base import BaseCommand
+
+from portfolio.benchmark.report import compare, load_report
+
+
+class Command(BaseCommand):
+    help = (
+        'Confronta due report di benchmark ed esce con codice 1 se una '
+        'route peggiora oltre la soglia.'
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument('baseline', help='Report JSON di riferimento.')
+        parser.add_argument('current', help='Report JSON da verificare.')
+        parser.add_argument('--threshold', type=float, default=10.0,
+                            help='Peggioramento tollerato in percentuale (default 10).')
+
+    def handle(self, *args, **options):
+        rows = compare(load_report(options['baseline']), load_report(options['current']),
+                       options['threshold'])
+        self.stdout.write(f'{"route":<22} {"metrica":<10} {"prima":>10} {"dopo":>10} {"var.":>8}')
+        for label, metric, old, new, change, regression in rows:
+            self.stdout.write(
+                f'{label:<22} {metric:<10} {old:>10.2f} {new:>10.2f} {change:>+7.1f}%'
+                + ('  REGRESSIONE' if regression else '')
+            )
+        if any(row[-1] for row in rows):
+            sys.exit(1)
+        self.stdout.write(self.style.SUCCESS('Nessuna regressione.'))
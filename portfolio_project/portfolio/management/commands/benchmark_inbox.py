@@ -0,0 +1,55 @@
+import sys
+import time
+
+from django.core.management.base import BaseCommand
+from django.test.utils import setup_databases, teardown_databases
+
+from portfolio.benchmark.inbox import run_inbox, seed_messages
+from portfolio.benchmark.report import build_report, write_report
+
+
+class Command(BaseCommand):
+    help = (
+        "Misura la lista messaggi dell'admin su un database di test con "
+        "molti messaggi ed esce con errore se supera il budget di latenza."
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument('--messages', type=int, default=1_000_000,
+                            help='Messaggi generati (default 1.000.000).')
+        parser.add_argument('--requests', type=int, default=20,
+                            help='Richieste per ogni variante della lista (default 20).')
+        parser.add_argument('--budget-ms', type=float, default=250.0,
+                            help='Latenza p99 massima in millisecondi (default 250).')
+        parser.add_argument('--output',
+                            help='File JSON in cui salvare i risultati.')
+
+    def handle(self, *args, **options):
+        old_config = setup_databases(verbosity=0, interactive=False)
+        try:
+            start = time.perf_counter()
+            seed_messages(options['messages'])
+            self.stdout.write(
+                f'{options["messages"]} messaggi generati in {time.perf_counter() - start:.1f}s'
+            )
+            results = run_inbox(options['requests'])
+        finally:
+            teardown_databases(old_config, verbosity=0)
+
+        over_budget = []
+        self.stdout.write(f'{"variante":<18} {"p50 ms":>8} {"p99 ms":>8} {"errori":>6}')
+        for label, stats in results.items():
+            self.stdout.write(
+                f'{label:<18} {stats["p50_ms"]:>8.2f} {stats["p99_ms"]:>8.2f} {stats["errors"]:>6}'
+            )
+            if stats['p99_ms'] > options['budget_ms'] or stats['errors']:
+                over_budget.append(label)
+
+        if options['output']:
+            write_report(options['output'], build_report(
+                results, messages=options['messages'], budget_ms=options['budget_ms'],
+            ))
+        if over_budget:
+            self.stderr.write(f'Oltre il budget di {options["budget_ms"]:g} ms: {", ".join(over_budget)}')
+            sys.exit(1)
+        self.stdout.write(self.style.SUCCESS(f'Tutte le varianti entro {options["budget_ms"]:g} ms.'))
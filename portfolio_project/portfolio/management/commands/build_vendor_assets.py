@@ -0,0 +1,33 @@
+from django.core.management.base import BaseCommand, CommandError
+
+from portfolio.vendor import build, vendor_root
+
+
+class Command(BaseCommand):
+    help = (
+        'Genera in static/vendor/ Bootstrap ridotto alle classi usate, le icone '
+        'Font Awesome usate da template e skill e i font WOFF2 ridotti.'
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument('--offline', action='store_true',
+                            help='Usa solo i file originali già scaricati (VENDOR_CACHE_ROOT).')
+        parser.add_argument('--refresh', action='store_true',
+                            help='Scarica di nuovo i file originali.')
+
+    def handle(self, *args, **options):
+        try:
+            manifest = build(offline=options['offline'], refresh=options['refresh'])
+        except RuntimeError as error:
+            raise CommandError(str(error))
+
+        source = output = 0
+        for name, sizes in sorted(manifest['files'].items()):
+            source += sizes['source']
+            output += sizes['output']
+            self.stdout.write(f"  {name:<32} {sizes['source']:>9} B -> {sizes['output']:>8} B")
+        self.stdout.write(f"Icone incluse ({len(manifest['icons'])}): {', '.join(manifest['icons'])}")
+        self.stdout.write(self.style.SUCCESS(
+            f'Asset generati in {vendor_root()}: {source} B -> {output} B '
+            f'(-{(1 - output / source) * 100:.0f}%).'
+        ))
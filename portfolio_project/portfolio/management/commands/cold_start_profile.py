@@ -0,0 +1,53 @@
+from django.core.management.base import BaseCommand, CommandError
+
+from portfolio.benchmark.coldstart import append_history, profile
+
+
+class Command(BaseCommand):
+    help = (
+        "Misura l'avvio a freddo in processi nuovi (import di wsgi.py, "
+        'warm-up, prima richiesta) e il tempo di import per pacchetto.'
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument('--path', default='/api/palette/',
+                            help='URL della prima richiesta (default /api/palette/).')
+        parser.add_argument('--runs', type=int, default=5,
+                            help='Avvii misurati, di cui si riporta la mediana (default 5).')
+        parser.add_argument('--no-warmup', action='store_true',
+                            help='Misura la prima richiesta senza warm-up.')
+        parser.add_argument('--env', action='append', default=[], metavar='NOME=VALORE',
+                            help='Variabile d\'ambiente per i processi misurati (es. SERVERLESS=True).')
+        parser.add_argument('--top', type=int, default=15,
+                            help='Pacchetti mostrati nel dettaglio degli import (default 15).')
+        parser.add_argument('--history', default=None,
+                            help='File JSONL a cui aggiungere il report, per seguire i tempi nel tempo.')
+
+    def handle(self, *args, **options):
+        env = {}
+        for item in options['env']:
+            name, separator, value = item.partition('=')
+            if not separator:
+                raise CommandError(f'Variabile non valida: {item} (usare NOME=VALORE)')
+            env[name] = value
+
+        try:
+            report = profile(options['path'], options['runs'], not options['no_warmup'], env)
+        except RuntimeError as error:
+            raise CommandError(f'Avvio non riuscito: {error}')
+
+        self.stdout.write(f"Avvio a freddo di {report['path']} (mediana di {report['runs']}, stato {report['status']})")
+        self.stdout.write(f"  import wsgi.py    {report['import_ms']:8.1f} ms")
+        self.stdout.write(f"  warm-up           {report['warmup_ms']:8.1f} ms")
+        for name, ms in report['warmup_steps'].items():
+            self.stdout.write(f'    {name:<15} {ms:8.1f} ms')
+        self.stdout.write(f"  prima richiesta   {report['first_request_ms']:8.1f} ms")
+        self.stdout.write(self.style.SUCCESS(f"  totale            {report['total_ms']:8.1f} ms"))
+
+        self.stdout.write('Import per pacchetto (-X importtime, tempo proprio):')
+        for name, ms in list(report['packages_ms'].items())[:options['top']]:
+            self.stdout.write(f'  {name:<28} {ms:8.1f} ms')
+
+        if options['history']:
+            append_history(options['history'], report)
+            self.stdout.write(f"Report aggiunto a {options['history']}")
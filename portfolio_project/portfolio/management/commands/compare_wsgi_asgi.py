@@ -0,0 +1,140 @@
+import asyncio
+import json
+import os
+import subprocess
+import sys
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor
+
+from django.conf import settings
+from django.core.management.base import BaseCommand, CommandError
+from django.db import connections
+from django.test import AsyncClient, Client
+from django.test.utils import override_settings
+
+from portfolio.benchmark.runner import percentile
+
+
+DEFAULT_PATHS = ('/', '/about/', '/projects/', '/api/projects/', '/api/skills/')
+
+
+def _summary(latencies, errors, elapsed):
+    latencies = sorted(latencies)
+    return {
+        'requests': len(latencies),
+        'errors': errors,
+        'elapsed': elapsed,
+        'throughput': len(latencies) / elapsed if elapsed else 0.0,
+        'p50_ms': percentile(latencies, 0.50) * 1000,
+        'p99_ms': percentile(latencies, 0.99) * 1000,
+    }
+
+
+def run_wsgi(paths, total, concurrency):
+    """Handler WSGI con view sincrone, richieste da un pool di thread."""
+    local = threading.local()
+
+    def request(path):
+        client = getattr(local, 'client', None)
+        if client is None:
+            client = local.client = Client()
+        start = time.perf_counter()
+        status = client.get(path).status_code
+        return time.perf_counter() - start, status >= 400
+
+    for path in paths:
+        request(path)
+
+    start = time.perf_counter()
+    with ThreadPoolExecutor(max_workers=concurrency) as executor:
+        results = list(executor.map(request, (paths[i % len(paths)] for i in range(total))))
+    elapsed = time.perf_counter() - start
+    connections.close_all()
+    return _summary([r[0] for r in results], sum(r[1] for r in results), elapsed)
+
+
+def run_asgi(paths, total, concurrency):
+    """Handler ASGI con view asincrone, richieste concorrenti sul ciclo di eventi."""
+    async def main():
+        client = AsyncClient()
+        semaphore = asyncio.Semaphore(concurrency)
+
+        async def request(path):
+            async with semaphore:
+                start = time.perf_counter()
+                status = (await client.get(path)).status_code
+                return time.perf_counter() - start, status >= 400
+
+        for path in paths:
+            await request(path)
+
+        start = time.perf_counter()
+        results = await asyncio.gather(*(request(paths[i % len(paths)]) for i in range(total)))
+        return results, time.perf_counter() - start
+
+    results, elapsed = asyncio.run(main())
+    return _summary([r[0] for r in results], sum(r[1] for r in results), elapsed)
+
+
+class Command(BaseCommand):
+    help = (
+        'Confronta throughput e latenza p99 tra WSGI (view sincrone) e '
+        'ASGI (view asincrone) con richieste concorrenti in-process.'
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument('--requests', type=int, default=500,
+                            help='Richieste totali per ogni stack (default 500).')
+        parser.add_argument('--concurrency', type=int, default=16,
+                            help='Richieste contemporanee (default 16).')
+        parser.add_argument('--path', action='append', dest='paths',
+                            help='URL da richiedere, ripetibile (default: pagine pubbliche e API).')
+        parser.add_argument('--page-cache', action='store_true',
+                            help='Lascia attiva la cache delle pagine (di default è disattivata).')
+        parser.add_argument('--worker', choices=('wsgi', 'asgi'),
+                            help='Uso interno: esegue un solo stack e stampa il risultato in JSON.')
+
+    def handle(self, *args, **options):
+        paths = options['paths'] or list(DEFAULT_PATHS)
+        if options['worker']:
+            runner = run_wsgi if options['worker'] == 'wsgi' else run_asgi
+            with override_settings(PAGE_CACHE_ENABLED=options['page_cache']):
+                result = runner(paths, options['requests'], options['concurrency'])
+            self.stdout.write(json.dumps(result))
+            return
+
+        # Ogni stack gira in un processo separato: ASYNC_VIEWS viene letto
+        # all'avvio e sceglie quali view registrare negli URL
+        results = {}
+        for stack, async_views in (('wsgi', 'False'), ('asgi', 'True')):
+            command = [
+                sys.executable, '-m', 'django', 'compare_wsgi_asgi',
+                '--worker', stack,
+                '--requests', str(options['requests']),
+                '--concurrency', str(options['concurrency']),
+            ]
+            command += [f'--path={path}' for path in paths]
+            if options['page_cache']:
+                command.append('--page-cache')
+            env = {
+                **os.environ,
+                'ASYNC_VIEWS': async_views,
+                'DJANGO_SETTINGS_MODULE': os.environ.get('DJANGO_SETTINGS_MODULE', 'portfolio_project.settings'),
+                'PYTHONPATH': str(settings.BASE_DIR),
+            }
+            process = subprocess.run(command, env=env, capture_output=True, text=True)
+            if process.returncode:
+                raise CommandError(f'{stack}: {process.stderr.strip()}')
+            results[stack] = json.loads(process.stdout.strip().splitlines()[-1])
+
+        self.stdout.write(
+            f'{options["requests"]} richieste, concorrenza {options["concurrency"]}, '
+            f'cache pagine {"attiva" if options["page_cache"] else "disattivata"}'
+        )
+        self.stdout.write(f'{"stack":<6} {"req/s":>9} {"p50 ms":>9} {"p99 ms":>9} {"errori":>7}')
+        for stack, result in results.items():
+            self.stdout.write(
+                f'{stack:<6} {result["throughput"]:>9.1f} {result["p50_ms"]:>9.2f} '
+                f'{result["p99_ms"]:>9.2f} {result["errors"]:>7}'
+            )
@@ -0,0 +1,56 @@
+from django.conf import settings
+from django.core.management import call_command
+from django.core.management.base import BaseCommand, CommandError
+from django.test.utils import override_settings
+
+from portfolio.export import export_pages, public_pages
+
+
+class Command(BaseCommand):
+    help = (
+        'Esporta le pagine pubbliche come file statici. '
+        'Alla riesecuzione riscrive solo le pagine cambiate.'
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            '--output',
+            default=str(getattr(settings, 'STATIC_EXPORT_ROOT', 'static_export')),
+            help='Cartella di destinazione (default STATIC_EXPORT_ROOT).',
+        )
+        parser.add_argument(
+            '--host',
+            default='localhost',
+            help='Host usato per renderizzare le pagine (per gli URL assoluti).',
+        )
+        parser.add_argument(
+            '--skip-static',
+            action='store_true',
+            help='Non raccoglie i file statici (devono essere già presenti in <output>/static).',
+        )
+
+    def handle(self, *args, **options):
+        output = options['output']
+        # I file statici passano dalla pipeline di STORAGES (bundle minificati,
+        # nomi con l'hash, copie compresse), come con collectstatic
+        overrides = override_settings(
+            DEBUG=False,
+            PAGE_CACHE_ENABLED=False,
+            STATIC_ROOT=f'{output}/static',
+        )
+        with overrides:
+            if not options['skip_static']:
+                call_command('collectstatic', interactive=False, verbosity=0)
+            try:
+                result = export_pages(output, public_pages(), host=options['host'])
+            except RuntimeError as error:
+                raise CommandError(str(error))
+
+        for filename in result['written']:
+            self.stdout.write(f'  scritto   {filename}')
+        for filename in result['removed']:
+            self.stdout.write(f'  rimosso   {filename}')
+        self.stdout.write(self.style.SUCCESS(
+            f"Pagine esportate in {output}: {len(result['written'])} scritte, "
+            f"{len(result['unchanged'])} invariate, {len(result['removed'])} rimosse."
+        ))
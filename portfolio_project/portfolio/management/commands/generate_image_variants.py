@@ -0,0 +1,34 @@
+from django.core.management.base import BaseCommand
+
+from portfolio.cache import bump_version, version_name
+from portfolio.images import refresh_variants
+from portfolio.models import Project, SiteSettings
+
+
+class Command(BaseCommand):
+    help = 'Genera le varianti responsive (WebP e JPEG) delle immagini già caricate.'
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            '--force',
+            action='store_true',
+            help='Rigenera anche le varianti già presenti.',
+        )
+
+    def handle(self, *args, **options):
+        force = options['force']
+        targets = (
+            (Project, 'image'),
+            (SiteSettings, 'author_image'),
+        )
+        for model, field_name in targets:
+            updated = 0
+            for instance in model.objects.exclude(**{field_name: ''}).iterator():
+                if refresh_variants(instance, field_name, force=force):
+                    updated += 1
+            if updated:
+                bump_version(version_name(model))
+            self.stdout.write(
+                f'{model._meta.verbose_name_plural}: {updated} immagini aggiornate'
+            )
+        self.stdout.write(self.style.SUCCESS('Varianti generate.'))
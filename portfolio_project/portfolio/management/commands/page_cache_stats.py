@@ -0,0 +1,46 @@
+from django.core.management.base import BaseCommand
+
+from portfolio import views  # noqa: F401  registra le view in cache
+from portfolio.page_cache import get_stats, reset_stats, stats_enabled
+
+
+class Command(BaseCommand):
+    help = 'Mostra hit e miss della cache delle pagine pubbliche.'
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            '--reset',
+            action='store_true',
+            help='Azzera i contatori dopo averli mostrati.',
+        )
+
+    def handle(self, *args, **options):
+        if not stats_enabled():
+            self.stderr.write(self.style.WARNING(
+                'Cache delle pagine disattivata (PAGE_CACHE_ENABLED=False o cache locale '
+                'di processo, CACHE_BACKEND=locmem): nessun contatore registrato.'
+            ))
+            return
+
+        stats = get_stats()
+        total_hits = total_misses = 0
+        for name in sorted(stats):
+            hits, misses = stats[name]['hit'], stats[name]['miss']
+            total_hits += hits
+            total_misses += misses
+            self.stdout.write(f'{name:<20} hit {hits:>8}  miss {misses:>8}  {_ratio(hits, misses)}')
+
+        self.stdout.write(self.style.SUCCESS(
+            f'{"totale":<20} hit {total_hits:>8}  miss {total_misses:>8}  {_ratio(total_hits, total_misses)}'
+        ))
+
+        if options['reset']:
+            reset_stats()
+            self.stdout.write('Contatori azzerati.')
+
+
+def _ratio(hits, misses):
+    total = hits + misses
+    if not total:
+        return '-'
+    return f'{hits / total:.1%}'
@@ -0,0 +1,16 @@
+from django.core.management.base import BaseCommand
+
+from portfolio import related
+from portfolio.cache import bump_version, version_name
+from portfolio.models import Project, ProjectTechnology, RelatedProject
+
+
+class Command(BaseCommand):
+    help = 'Ricalcola da zero i progetti correlati di tutti i progetti.'
+
+    def handle(self, *args, **options):
+        count = related.rebuild_all(Project, ProjectTechnology, RelatedProject)
+        bump_version(version_name(RelatedProject))
+        self.stdout.write(self.style.SUCCESS(
+            f'Progetti correlati ricalcolati per {count} progetti.'
+        ))
@@ -0,0 +1,20 @@
+from django.core.management.base import BaseCommand
+
+from portfolio import inbox, search
+
+
+class Command(BaseCommand):
+    help = "Ricostruisce gli indici di ricerca full-text di progetti e messaggi."
+
+    def handle(self, *args, **options):
+        backend = search.search_backend()
+        if backend != 'sqlite':
+            self.stdout.write(
+                "Nessuna ricostruzione necessaria: "
+                "l'indice è gestito dal database." if backend else
+                "Il database in uso non ha un indice full-text."
+            )
+            return
+        search.rebuild_index()
+        inbox.rebuild_index()
+        self.stdout.write(self.style.SUCCESS('Indici di ricerca ricostruiti.'))
@@ -0,0 +1,31 @@
+from django.core.management.base import BaseCommand, CommandError
+from django.core.serializers.base import DeserializationError
+
+from portfolio.backup import DEFAULT_BATCH_SIZE, restore
+
+
+class Command(BaseCommand):
+    help = (
+        'Ripristina un backup creato con backup_data (o un file di dumpdata '
+        'come data_backup.json) con inserimenti a blocchi.'
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument('path', help='File da ripristinare (.ndjson, .ndjson.gz o .json di dumpdata).')
+        parser.add_argument('--batch-size', type=int, default=DEFAULT_BATCH_SIZE,
+                            help=f'Oggetti inseriti per ogni query (default {DEFAULT_BATCH_SIZE}).')
+
+    def handle(self, *args, **options):
+        try:
+            report = restore(options['path'], batch_size=options['batch_size'])
+        except (OSError, DeserializationError) as error:
+            raise CommandError(f'Ripristino non riuscito: {error}')
+        for label, count in report.counts.items():
+            self.stdout.write(f'  {label}: {count}')
+        for label, count in report.skipped.items():
+            self.stdout.write(f'  {label}: {count} ignorati (ricostruiti dagli altri dati)')
+        self.stdout.write(self.style.SUCCESS(
+            f"Ripristinate {report.total} righe da {options['path']}: "
+            f'{report.bytes / 1024:.1f} KiB in {report.seconds:.2f}s '
+            f'({report.rows_per_second:.0f} righe/s)'
+        ))
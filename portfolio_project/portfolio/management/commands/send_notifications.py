@@ -0,0 +1,47 @@
+import time
+
+from django.core.management.base import BaseCommand
+
+from portfolio.outbox import drain
+
+
+class Command(BaseCommand):
+    help = 'Invia le notifiche email in coda (outbox dei messaggi di contatto).'
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            '--batch-size',
+            type=int,
+            default=None,
+            help='Notifiche inviate per ogni connessione (default OUTBOX_BATCH_SIZE).',
+        )
+        parser.add_argument(
+            '--digest',
+            action='store_true',
+            help='Unisce le notifiche dello stesso destinatario in una sola email.',
+        )
+        parser.add_argument(
+            '--loop',
+            action='store_true',
+            help='Resta in esecuzione controllando la coda ogni --interval secondi.',
+        )
+        parser.add_argument(
+            '--interval',
+            type=float,
+            default=30,
+            help='Secondi di attesa tra due controlli con --loop (default 30).',
+        )
+
+    def handle(self, *args, **options):
+        while True:
+            total_sent, total_failed = drain(
+                batch_size=options['batch_size'],
+                digest=options['digest'],
+            )
+            if total_sent or total_failed or not options['loop']:
+                self.stdout.write(self.style.SUCCESS(
+                    f'Notifiche inviate: {total_sent}, da ritentare o fallite: {total_failed}'
+                ))
+            if not options['loop']:
+                return
+            time.sleep(options['interval'])
@@ -0,0 +1,16 @@
+from django.core.management.base import BaseCommand
+
+from portfolio.warmup import warm_up
+
+
+class Command(BaseCommand):
+    help = (
+        'Esegue il warm-up (resolver degli URL, template pubblici, snapshot '
+        'del sito) ed esce con errore se un passo fallisce.'
+    )
+
+    def handle(self, *args, **options):
+        timings = warm_up(raise_errors=True)
+        for name, ms in timings.items():
+            self.stdout.write(f'  {name:<10} {ms:7.1f} ms')
+        self.stdout.write(self.style.SUCCESS('Warm-up completato.'))
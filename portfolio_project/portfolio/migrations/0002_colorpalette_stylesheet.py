@@ -0,0 +1,60 @@
+# Generated by Django 5.2.18 on 2026-10-18 04:50
+
+import hashlib
+
+from django.db import migrations, models
+
+
+# Copia fissa di portfolio/theme.py al momento della migrazione: le
+# modifiche successive al modulo non devono cambiare i dati già migrati
+STYLESHEET_TEMPLATE = """:root{{\
+--primary-color:{primary};\
+--primary-glow:{primary}66;\
+--secondary-color:{secondary};\
+--accent-color:{accent};\
+--gradient-primary:linear-gradient(135deg, {primary} 0%, {secondary} 100%);\
+--glow-primary:0 0 20px {primary}66, 0 0 40px {primary}33;\
+--glow-text:0 0 10px {primary}80;\
+}}
+"""
+
+
+def compile_palette_css(palette):
+    return STYLESHEET_TEMPLATE.format(
+        primary=palette.primary_color,
+        secondary=palette.secondary_color,
+        accent=palette.accent_color,
+    )
+
+
+def stylesheet_hash(css):
+    return hashlib.sha256(css.encode('utf-8')).hexdigest()[:16]
+
+
+def compile_stylesheets(apps, schema_editor):
+    ColorPalette = apps.get_model('portfolio', 'ColorPalette')
+    for palette in ColorPalette.objects.all():
+        palette.stylesheet = compile_palette_css(palette)
+        palette.stylesheet_hash = stylesheet_hash(palette.stylesheet)
+        palette.save(update_fields=['stylesheet', 'stylesheet_hash'])
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('portfolio', '0001_initial'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='colorpalette',
+            name='stylesheet',
+            field=models.TextField(blank=True, editable=False, verbose_name='Foglio di Stile Compilato'),
+        ),
+        migrations.AddField(
+            model_name='colorpalette',
+            name='stylesheet_hash',
+            field=models.CharField(blank=True, db_index=True, editable=False, max_length=16, verbose_name='Hash Foglio di Stile'),
+        ),
+        migrations.RunPython(compile_stylesheets, migrations.RunPython.noop),
+    ]
@@ -0,0 +1,52 @@
+from django.db import migrations
+
+
+# Copia fissa di portfolio/search.py al momento della migrazione: le
+# modifiche successive al modulo non devono cambiare lo schema già creato
+FTS_TABLE = 'portfolio_project_fts'
+FTS_COLUMNS = 'title, short_description, description, technologies'
+
+PG_INDEX = 'portfolio_project_search_idx'
+PG_VECTOR = (
+    "setweight(to_tsvector('simple', coalesce(title, '')), 'A') || "
+    "setweight(to_tsvector('simple', coalesce(technologies, '')), 'B') || "
+    "setweight(to_tsvector('simple', coalesce(short_description, '')), 'C') || "
+    "setweight(to_tsvector('simple', coalesce(description, '')), 'D')"
+)
+
+
+def create_search_index(apps, schema_editor):
+    table = apps.get_model('portfolio', 'Project')._meta.db_table
+    vendor = schema_editor.connection.vendor
+    if vendor == 'sqlite':
+        schema_editor.execute(
+            f"CREATE VIRTUAL TABLE IF NOT EXISTS {FTS_TABLE} USING fts5("
+            f"{FTS_COLUMNS}, tokenize = 'unicode61 remove_diacritics 2')"
+        )
+        schema_editor.execute(
+            f"INSERT INTO {FTS_TABLE}(rowid, {FTS_COLUMNS}) "
+            f"SELECT id, {FTS_COLUMNS} FROM {table}"
+        )
+    elif vendor == 'postgresql':
+        schema_editor.execute(
+            f"CREATE INDEX IF NOT EXISTS {PG_INDEX} ON {table} USING GIN (({PG_VECTOR}))"
+        )
+
+
+def drop_search_index(apps, schema_editor):
+    vendor = schema_editor.connection.vendor
+    if vendor == 'sqlite':
+        schema_editor.execute(f"DROP TABLE IF EXISTS {FTS_TABLE}")
+    elif vendor == 'postgresql':
+        schema_editor.execute(f"DROP INDEX IF EXISTS {PG_INDEX}")
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('portfolio', '0002_colorpalette_stylesheet'),
+    ]
+
+    operations = [
+        migrations.RunPython(create_search_index, drop_search_index),
+    ]
@@ -0,0 +1,98 @@
+# Generated by Django 5.2.18 on 2026-10-18 04:54
+
+import django.db.models.deletion
+from django.db import migrations, models
+from django.utils.text import slugify
+
+
+# Copia fissa di portfolio/technologies.py al momento della migrazione: le
+# modifiche successive al modulo non devono cambiare i dati già migrati
+SLUG_REPLACEMENTS = (
+    ('#', ' sharp'),
+    ('+', ' plus'),
+)
+
+
+def parse_technologies(value):
+    names = []
+    seen = set()
+    for name in (value or '').split(','):
+        name = name.strip()
+        slug = technology_slug(name)
+        if name and slug and slug not in seen:
+            seen.add(slug)
+            names.append(name)
+    return names
+
+
+def technology_slug(name):
+    for symbol, replacement in SLUG_REPLACEMENTS:
+        name = name.replace(symbol, replacement)
+    return slugify(name)[:100]
+
+
+def populate_technologies(apps, schema_editor):
+    Project = apps.get_model('portfolio', 'Project')
+    Technology = apps.get_model('portfolio', 'Technology')
+    ProjectTechnology = apps.get_model('portfolio', 'ProjectTechnology')
+
+    technologies = {}
+    links = []
+    for project in Project.objects.only('pk', 'technologies').iterator():
+        for position, name in enumerate(parse_technologies(project.technologies)):
+            slug = technology_slug(name)
+            if slug not in technologies:
+                technologies[slug] = Technology.objects.create(name=name, slug=slug)
+            links.append(ProjectTechnology(
+                project_id=project.pk,
+                technology=technologies[slug],
+                position=position,
+            ))
+    ProjectTechnology.objects.bulk_create(links, batch_size=500)
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('portfolio', '0003_project_search_index'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='Technology',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('name', models.CharField(max_length=100, verbose_name='Nome')),
+                ('slug', models.SlugField(max_length=100, unique=True)),
+            ],
+            options={
+                'verbose_name': 'Tecnologia',
+                'verbose_name_plural': 'Tecnologie',
+                'ordering': ['name'],
+            },
+        ),
+        migrations.CreateModel(
+            name='ProjectTechnology',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('position', models.PositiveSmallIntegerField(default=0)),
+                ('project', models.ForeignKey(on_delete=django.db.models.deletion.CASCADE, related_name='technology_links', to='portfolio.project')),
+                ('technology', models.ForeignKey(on_delete=django.db.models.deletion.CASCADE, related_name='project_links', to='portfolio.technology')),
+            ],
+            options={
+                'verbose_name': 'Tecnologia Progetto',
+                'verbose_name_plural': 'Tecnologie Progetto',
+                'ordering': ['position'],
+            },
+        ),
+        migrations.AddField(
+            model_name='project',
+            name='tech_tags',
+            field=models.ManyToManyField(blank=True, related_name='projects', through='portfolio.ProjectTechnology', to='portfolio.technology', verbose_name='Tecnologie (indice)'),
+        ),
+        migrations.AddConstraint(
+            model_name='projecttechnology',
+            constraint=models.UniqueConstraint(fields=('technology', 'project'), name='unique_project_technology'),
+        ),
+        migrations.RunPython(populate_technologies, migrations.RunPython.noop),
+    ]
@@ -0,0 +1,82 @@
+# Generated by Django 5.2.18 on 2026-10-18 04:57
+
+import math
+from collections import defaultdict
+
+import django.db.models.deletion
+from django.db import migrations, models
+from django.utils import timezone
+
+# Copia fissa del punteggio di portfolio/related.py al momento della
+# migrazione: le modifiche successive al modulo non la influenzano
+RELATED_PROJECTS_LIMIT = 6
+TECHNOLOGY_WEIGHT = 0.6
+CATEGORY_WEIGHT = 0.25
+RECENCY_WEIGHT = 0.15
+RECENCY_HALF_LIFE_DAYS = 365
+
+
+def build_related_projects(apps, schema_editor):
+    Project = apps.get_model('portfolio', 'Project')
+    ProjectTechnology = apps.get_model('portfolio', 'ProjectTechnology')
+    RelatedProject = apps.get_model('portfolio', 'RelatedProject')
+
+    technologies = defaultdict(set)
+    for project_id, technology_id in ProjectTechnology.objects.values_list('project_id', 'technology_id'):
+        technologies[project_id].add(technology_id)
+
+    now = timezone.now()
+    features = {}
+    for pk, category, created_at in Project.objects.values_list('pk', 'category', 'created_at'):
+        age_days = max((now - created_at).days, 0) if created_at else 0
+        features[pk] = (category, technologies[pk], math.pow(0.5, age_days / RECENCY_HALF_LIFE_DAYS))
+
+    def score(source, candidate):
+        union = source[1] | candidate[1]
+        overlap = len(source[1] & candidate[1]) / len(union) if union else 0.0
+        return (
+            TECHNOLOGY_WEIGHT * overlap
+            + CATEGORY_WEIGHT * (source[0] == candidate[0])
+            + RECENCY_WEIGHT * candidate[2]
+        )
+
+    links = []
+    for pk, source in features.items():
+        scored = [
+            (other_pk, score(source, other))
+            for other_pk, other in features.items()
+            if other_pk != pk
+        ]
+        scored.sort(key=lambda item: (-item[1], -item[0]))
+        links.extend(
+            RelatedProject(project_id=pk, related_id=related_pk, score=value)
+            for related_pk, value in scored[:RELATED_PROJECTS_LIMIT]
+        )
+    RelatedProject.objects.bulk_create(links, batch_size=500)
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('portfolio', '0004_technology_index'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='RelatedProject',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('score', models.FloatField(default=0)),
+                ('project', models.ForeignKey(on_delete=django.db.models.deletion.CASCADE, related_name='related_links', to='portfolio.project')),
+                ('related', models.ForeignKey(on_delete=django.db.models.deletion.CASCADE, related_name='+', to='portfolio.project')),
+            ],
+            options={
+                'verbose_name': 'Progetto Correlato',
+                'verbose_name_plural': 'Progetti Correlati',
+                'ordering': ['-score'],
+                'indexes': [models.Index(fields=['project', '-score'], name='related_project_score_idx')],
+                'constraints': [models.UniqueConstraint(fields=('project', 'related'), name='unique_related_project')],
+            },
+        ),
+        migrations.RunPython(build_related_projects, migrations.RunPython.noop),
+    ]
@@ -0,0 +1,23 @@
+# Generated by Django 5.2.18 on 2026-10-18 05:00
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('portfolio', '0005_related_projects'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='project',
+            name='image_variants',
+            field=models.JSONField(blank=True, default=dict, editable=False, verbose_name='Varianti Immagine'),
+        ),
+        migrations.AddField(
+            model_name='sitesettings',
+            name='author_image_variants',
+            field=models.JSONField(blank=True, default=dict, editable=False, verbose_name='Varianti Foto Profilo'),
+        ),
+    ]
@@ -0,0 +1,38 @@
+# Generated by Django 5.2.18 on 2026-10-18 05:01
+
+import django.db.models.deletion
+import django.utils.timezone
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('portfolio', '0006_image_variants'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='EmailNotification',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('recipient', models.EmailField(max_length=254, verbose_name='Destinatario')),
+                ('reply_to', models.EmailField(blank=True, max_length=254, verbose_name='Rispondi a')),
+                ('subject', models.CharField(max_length=255, verbose_name='Oggetto')),
+                ('body', models.TextField(verbose_name='Testo')),
+                ('status', models.CharField(choices=[('pending', 'In coda'), ('sent', 'Inviata'), ('failed', 'Fallita')], default='pending', max_length=10, verbose_name='Stato')),
+                ('attempts', models.PositiveSmallIntegerField(default=0, verbose_name='Tentativi')),
+                ('next_attempt_at', models.DateTimeField(default=django.utils.timezone.now, verbose_name='Prossimo Tentativo')),
+                ('last_error', models.TextField(blank=True, verbose_name='Ultimo Errore')),
+                ('created_at', models.DateTimeField(auto_now_add=True, verbose_name='Creata il')),
+                ('sent_at', models.DateTimeField(blank=True, null=True, verbose_name='Inviata il')),
+                ('contact_message', models.ForeignKey(blank=True, null=True, on_delete=django.db.models.deletion.SET_NULL, related_name='notifications', to='portfolio.contactmessage', verbose_name='Messaggio')),
+            ],
+            options={
+                'verbose_name': 'Notifica Email',
+                'verbose_name_plural': 'Notifiche Email',
+                'ordering': ['-created_at'],
+                'indexes': [models.Index(fields=['status', 'next_attempt_at'], name='notification_queue_idx')],
+            },
+        ),
+    ]
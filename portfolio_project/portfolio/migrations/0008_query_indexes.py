@@ -0,0 +1,45 @@
+# Generated by Django 5.2.18 on 2026-10-18 05:15
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('portfolio', '0007_email_outbox'),
+    ]
+
+    operations = [
+        migrations.AddIndex(
+            model_name='colorpalette',
+            index=models.Index(condition=models.Q(('is_active', True)), fields=['name'], name='palette_active_idx'),
+        ),
+        migrations.AddIndex(
+            model_name='contactmessage',
+            index=models.Index(fields=['-created_at'], name='message_created_idx'),
+        ),
+        migrations.AddIndex(
+            model_name='contactmessage',
+            index=models.Index(fields=['is_read', '-created_at'], name='message_unread_idx'),
+        ),
+        migrations.AddIndex(
+            model_name='experience',
+            index=models.Index(fields=['order', '-start_date'], name='experience_order_idx'),
+        ),
+        migrations.AddIndex(
+            model_name='project',
+            index=models.Index(fields=['order', '-created_at', '-id'], name='project_order_idx'),
+        ),
+        migrations.AddIndex(
+            model_name='project',
+            index=models.Index(fields=['featured', 'order', '-created_at'], name='project_featured_idx'),
+        ),
+        migrations.AddIndex(
+            model_name='project',
+            index=models.Index(fields=['category', 'order', '-created_at', '-id'], name='project_category_idx'),
+        ),
+        migrations.AddIndex(
+            model_name='skill',
+            index=models.Index(fields=['category', 'order', 'name'], name='skill_order_idx'),
+        ),
+    ]
@@ -0,0 +1,66 @@
+# Generated by Django 5.2.18 on 2026-10-18 05:17
+
+from django.db import migrations, models
+
+# Copia fissa di portfolio/inbox.py al momento della migrazione: le
+# modifiche successive al modulo non devono cambiare lo schema già creato
+MESSAGE_FTS_TABLE = 'portfolio_contactmessage_fts'
+MESSAGE_FTS_COLUMNS = 'name, email, subject, message'
+
+MESSAGE_PG_INDEX = 'portfolio_contactmessage_search_idx'
+MESSAGE_PG_VECTOR = (
+    "to_tsvector('simple', coalesce(name, '') || ' ' || coalesce(email, '') || ' ' || "
+    "coalesce(subject, '') || ' ' || coalesce(message, ''))"
+)
+
+
+def create_message_index(apps, schema_editor):
+    table = apps.get_model('portfolio', 'ContactMessage')._meta.db_table
+    vendor = schema_editor.connection.vendor
+    if vendor == 'sqlite':
+        # Contenuto esterno: il testo resta solo nella tabella dei messaggi
+        schema_editor.execute(
+            f"CREATE VIRTUAL TABLE IF NOT EXISTS {MESSAGE_FTS_TABLE} USING fts5("
+            f"{MESSAGE_FTS_COLUMNS}, content='{table}', content_rowid='id', "
+            f"tokenize = 'unicode61 remove_diacritics 2')"
+        )
+        schema_editor.execute(f"INSERT INTO {MESSAGE_FTS_TABLE}({MESSAGE_FTS_TABLE}) VALUES ('rebuild')")
+    elif vendor == 'postgresql':
+        schema_editor.execute(
+            f"CREATE INDEX IF NOT EXISTS {MESSAGE_PG_INDEX} ON {table} USING GIN (({MESSAGE_PG_VECTOR}))"
+        )
+
+
+def drop_message_index(apps, schema_editor):
+    vendor = schema_editor.connection.vendor
+    if vendor == 'sqlite':
+        schema_editor.execute(f"DROP TABLE IF EXISTS {MESSAGE_FTS_TABLE}")
+    elif vendor == 'postgresql':
+        schema_editor.execute(f"DROP INDEX IF EXISTS {MESSAGE_PG_INDEX}")
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('portfolio', '0008_query_indexes'),
+    ]
+
+    operations = [
+        migrations.RemoveIndex(
+            model_name='contactmessage',
+            name='message_created_idx',
+        ),
+        migrations.RemoveIndex(
+            model_name='contactmessage',
+            name='message_unread_idx',
+        ),
+        migrations.AddIndex(
+            model_name='contactmessage',
+            index=models.Index(fields=['-created_at', '-id'], name='message_created_idx'),
+        ),
+        migrations.AddIndex(
+            model_name='contactmessage',
+            index=models.Index(fields=['is_read', '-created_at', '-id'], name='message_unread_idx'),
+        ),
+        migrations.RunPython(create_message_index, drop_message_index),
+    ]
@@ -0,0 +1,52 @@
+# Generated by Django 5.2.18 on 2026-10-18 05:31
+
+from django.db import migrations, models
+
+
+def keep_one_active_palette(apps, schema_editor):
+    """
+    La palette scelta nelle impostazioni aveva la precedenza su ``is_active``:
+    diventa l'unica attiva prima di creare l'indice univoco.
+    """
+    ColorPalette = apps.get_model('portfolio', 'ColorPalette')
+    SiteSettings = apps.get_model('portfolio', 'SiteSettings')
+
+    current = SiteSettings.objects.filter(pk=1).values_list('current_palette_id', flat=True).first()
+    if current is None:
+        current = (
+            ColorPalette.objects.filter(is_active=True)
+            .order_by('name').values_list('pk', flat=True).first()
+        )
+    ColorPalette.objects.exclude(pk=current).filter(is_active=True).update(is_active=False)
+    if current is not None:
+        ColorPalette.objects.filter(pk=current).update(is_active=True)
+
+
+def restore_current_palette(apps, schema_editor):
+    ColorPalette = apps.get_model('portfolio', 'ColorPalette')
+    SiteSettings = apps.get_model('portfolio', 'SiteSettings')
+    active = ColorPalette.objects.filter(is_active=True).values_list('pk', flat=True).first()
+    SiteSettings.objects.filter(pk=1).update(current_palette_id=active)
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('portfolio', '0009_message_inbox'),
+    ]
+
+    operations = [
+        migrations.RunPython(keep_one_active_palette, restore_current_palette),
+        migrations.RemoveIndex(
+            model_name='colorpalette',
+            name='palette_active_idx',
+        ),
+        migrations.RemoveField(
+            model_name='sitesettings',
+            name='current_palette',
+        ),
+        migrations.AddConstraint(
+            model_name='colorpalette',
+            constraint=models.UniqueConstraint(condition=models.Q(('is_active', True)), fields=('is_active',), name='unique_active_palette'),
+        ),
+    ]
@@ -1,13 +1,21 @@
-from django.db import models
+from django.db import models, transaction
+from django.urls import reverse
+from django.utils import timezone
 from django.utils.text import slugify
 from django.core.validators import MinValueValidator, MaxValueValidator
 import json
 
+from .cache import bump_version, version_name
+from .images import refresh_variants, stored_variants
+from .technologies import parse_technologies, technology_slug
+from .theme import compile_palette_css, stylesheet_hash
+
 
 class ColorPalette(models.Model):
     """
     Modello per gestire le palette di colori del sito.
-    Una sola palette può essere attiva alla volta.
+    Una sola palette può essere attiva alla volta: lo garantisce un indice
+    univoco parziale, e il cambio di tema passa da ``activate()``.
     """
     name = models.CharField(max_length=100, verbose_name="Nome Palette")
     primary_color = models.CharField(
@@ -40,22 +48,106 @@ class ColorPalette(models.Model):
         default=False, 
         verbose_name="Palette Attiva"
     )
+    stylesheet = models.TextField(
+        blank=True,
+        editable=False,
+        verbose_name="Foglio di Stile Compilato"
+    )
+    stylesheet_hash = models.CharField(
+        max_length=16,
+        blank=True,
+        editable=False,
+        db_index=True,
+        verbose_name="Hash Foglio di Stile"
+    )
     created_at = models.DateTimeField(auto_now_add=True)
     
     class Meta:
         verbose_name = "Palette Colori"
         verbose_name_plural = "Palette Colori"
         ordering = ['-is_active', 'name']
+        constraints = [
+            # Indice univoco parziale: contiene solo la palette attiva
+            models.UniqueConstraint(
+                fields=['is_active'],
+                condition=models.Q(is_active=True),
+                name='unique_active_palette'
+            ),
+        ]
     
     def __str__(self):
         active = " (Attiva)" if self.is_active else ""
         return f"{self.name}{active}"
     
     def save(self, *args, **kwargs):
-        # Se questa palette è attiva, disattiva tutte le altre
-        if self.is_active:
-            ColorPalette.objects.exclude(pk=self.pk).update(is_active=False)
-        super().save(*args, **kwargs)
+        self.compile_stylesheet()
+        if kwargs.get('update_fields') is not None:
+            kwargs['update_fields'] = {
+                *kwargs['update_fields'], 'stylesheet', 'stylesheet_hash'
+            }
+        with transaction.atomic():
+            if self.is_active:
+                self._deactivate_others()
+            super().save(*args, **kwargs)
+    
+    def _deactivate_others(self):
+        # Tocca solo l'eventuale palette attiva, trovata dall'indice parziale
+        ColorPalette.objects.filter(is_active=True).exclude(pk=self.pk).update(is_active=False)
+    
+    @classmethod
+    def active(cls):
+        """Queryset della sola palette attiva, letta dall'indice parziale."""
+        return cls.objects.filter(is_active=True).order_by()[:1]
+    
+    @classmethod
+    def get_active(cls):
+        """La palette attiva, o None. Legge una sola riga dall'indice parziale."""
+        return next(iter(cls.active()), None)
+    
+    def activate(self):
+        """
+        Rende attiva questa palette in una transazione: due aggiornamenti di
+        una riga ciascuno, trovata dall'indice parziale. Non passando da
+        ``save()``, pubblica qui la nuova versione del tema per le cache.
+        """
+        with transaction.atomic():
+            # Prima la vecchia: l'indice univoco non ammette due palette attive
+            self._deactivate_others()
+            ColorPalette.objects.filter(pk=self.pk, is_active=False).update(is_active=True)
+            transaction.on_commit(lambda: bump_version(version_name(ColorPalette)))
+        self.is_active = True
+    
+    def compile_stylesheet(self):
+        """Rigenera il CSS della palette e il relativo hash."""
+        self.stylesheet = compile_palette_css(self)
+        self.stylesheet_hash = stylesheet_hash(self.stylesheet)
+
+
+class Technology(models.Model):
+    """
+    Tecnologia usata nei progetti, ricavata dal campo testuale
+    ``Project.technologies``.
+    """
+    name = models.CharField(max_length=100, verbose_name="Nome")
+    slug = models.SlugField(max_length=100, unique=True)
+    
+    class Meta:
+        verbose_name = "Tecnologia"
+        verbose_name_plural = "Tecnologie"
+        ordering = ['name']
+    
+    def __str__(self):
+        return self.name
+
+
+class ProjectQuerySet(models.QuerySet):
+    def with_technologies(self):
+        """Carica le tecnologie di tutti i progetti con una query."""
+        return self.prefetch_related(models.Prefetch(
+            'technology_links',
+            queryset=ProjectTechnology.objects.select_related('technology'),
+        ))
+
 
 
 class Project(models.Model):
@@ -81,11 +173,24 @@ class Project(models.Model):
         blank=True,
         null=True
     )
+    image_variants = models.JSONField(
+        default=dict,
+        blank=True,
+        editable=False,
+        verbose_name="Varianti Immagine"
+    )
     technologies = models.CharField(
         max_length=500, 
         verbose_name="Tecnologie",
         help_text="Separare con virgola (es. Python, Django, React)"
     )
+    tech_tags = models.ManyToManyField(
+        Technology,
+        through='ProjectTechnology',
+        related_name='projects',
+        blank=True,
+        verbose_name="Tecnologie (indice)"
+    )
     project_url = models.URLField(
         blank=True, 
         null=True, 
@@ -113,10 +218,18 @@ class Project(models.Model):
     created_at = models.DateTimeField(auto_now_add=True)
     updated_at = models.DateTimeField(auto_now=True)
     
+    objects = ProjectQuerySet.as_manager()
+    
     class Meta:
         verbose_name = "Progetto"
         verbose_name_plural = "Progetti"
         ordering = ['order', '-created_at']
+        # Seguono l'ordinamento, con -id per la paginazione a cursore
+        indexes = [
+            models.Index(fields=['order', '-created_at', '-id'], name='project_order_idx'),
+            models.Index(fields=['featured', 'order', '-created_at'], name='project_featured_idx'),
+            models.Index(fields=['category', 'order', '-created_at', '-id'], name='project_category_idx'),
+        ]
     
     def __str__(self):
         return self.title
@@ -124,11 +237,112 @@ class Project(models.Model):
     def save(self, *args, **kwargs):
         if not self.slug:
             self.slug = slugify(self.title)
-        super().save(*args, **kwargs)
+        # Progetto e indice delle tecnologie vengono salvati insieme, così
+        # le cache invalidate al commit vedono entrambi aggiornati
+        update_fields = kwargs.get('update_fields')
+        with transaction.atomic():
+            # save() sovrascrive le varianti con quelle in memoria
+            previous = stored_variants(self, 'image')
+            super().save(*args, **kwargs)
+            if update_fields is None or 'technologies' in update_fields:
+                self.sync_technologies()
+            if update_fields is None or 'image' in update_fields:
+                refresh_variants(self, 'image', previous=previous)
+    
+    def get_absolute_url(self):
+        return reverse('project_detail', args=[self.slug])
     
     def get_technologies_list(self):
-        """Restituisce le tecnologie come lista."""
-        return [tech.strip() for tech in self.technologies.split(',')]
+        """
+        Restituisce le tecnologie come lista.
+        Usa i collegamenti già caricati con ``with_technologies()`` se presenti.
+        """
+        links = getattr(self, '_prefetched_objects_cache', {}).get('technology_links')
+        if links is not None:
+            return [link.technology.name for link in links]
+        return parse_technologies(self.technologies)
+    
+    def sync_technologies(self):
+        """Allinea l'indice delle tecnologie al campo testuale."""
+        names = parse_technologies(self.technologies)
+        slugs = [technology_slug(name) for name in names]
+        existing = Technology.objects.in_bulk(slugs, field_name='slug')
+        missing = [
+            Technology(name=name, slug=slug)
+            for name, slug in zip(names, slugs)
+            if slug not in existing
+        ]
+        if missing:
+            Technology.objects.bulk_create(missing, ignore_conflicts=True)
+            existing = Technology.objects.in_bulk(slugs, field_name='slug')
+        
+        self.technology_links.all().delete()
+        ProjectTechnology.objects.bulk_create([
+            ProjectTechnology(project=self, technology=existing[slug], position=position)
+            for position, slug in enumerate(slugs)
+        ])
+        self._prefetched_objects_cache = {}
+
+
+class ProjectTechnology(models.Model):
+    """
+    Collegamento ordinato tra un progetto e una tecnologia.
+    """
+    project = models.ForeignKey(
+        Project,
+        on_delete=models.CASCADE,
+        related_name='technology_links'
+    )
+    technology = models.ForeignKey(
+        Technology,
+        on_delete=models.CASCADE,
+        related_name='project_links'
+    )
+    position = models.PositiveSmallIntegerField(default=0)
+    
+    class Meta:
+        verbose_name = "Tecnologia Progetto"
+        verbose_name_plural = "Tecnologie Progetto"
+        ordering = ['position']
+        constraints = [
+            models.UniqueConstraint(
+                fields=['technology', 'project'],
+                name='unique_project_technology'
+            ),
+        ]
+
+
+
+class RelatedProject(models.Model):
+    """
+    Progetto correlato precalcolato, con il relativo punteggio.
+    Le righe vengono generate da ``portfolio.related``.
+    """
+    project = models.ForeignKey(
+        Project,
+        on_delete=models.CASCADE,
+        related_name='related_links'
+    )
+    related = models.ForeignKey(
+        Project,
+        on_delete=models.CASCADE,
+        related_name='+'
+    )
+    score = models.FloatField(default=0)
+    
+    class Meta:
+        verbose_name = "Progetto Correlato"
+        verbose_name_plural = "Progetti Correlati"
+        ordering = ['-score']
+        constraints = [
+            models.UniqueConstraint(
+                fields=['project', 'related'],
+                name='unique_related_project'
+            ),
+        ]
+        indexes = [
+            models.Index(fields=['project', '-score'], name='related_project_score_idx'),
+        ]
 
 
 class Skill(models.Model):
@@ -169,6 +383,9 @@ class Skill(models.Model):
         verbose_name = "Skill"
         verbose_name_plural = "Skills"
         ordering = ['category', 'order', 'name']
+        indexes = [
+            models.Index(fields=['category', 'order', 'name'], name='skill_order_idx'),
+        ]
     
     def __str__(self):
         return f"{self.name} ({self.get_category_display()})"
@@ -203,6 +420,9 @@ class Experience(models.Model):
         verbose_name = "Esperienza"
         verbose_name_plural = "Esperienze"
         ordering = ['order', '-start_date']
+        indexes = [
+            models.Index(fields=['order', '-start_date'], name='experience_order_idx'),
+        ]
     
     def __str__(self):
         return f"{self.title} @ {self.company}"
@@ -223,11 +443,69 @@ class ContactMessage(models.Model):
         verbose_name = "Messaggio"
         verbose_name_plural = "Messaggi"
         ordering = ['-created_at']
+        indexes = [
+            # Con -id seguono la paginazione a cursore dell'admin
+            models.Index(fields=['-created_at', '-id'], name='message_created_idx'),
+            models.Index(fields=['is_read', '-created_at', '-id'], name='message_unread_idx'),
+        ]
     
     def __str__(self):
         return f"{self.subject} - {self.name}"
 
 
+class EmailNotification(models.Model):
+    """
+    Email in uscita (outbox). Viene creata nella stessa transazione del
+    messaggio di contatto e inviata dal comando ``send_notifications``.
+    """
+    STATUS_PENDING = 'pending'
+    STATUS_SENT = 'sent'
+    STATUS_FAILED = 'failed'
+    STATUS_CHOICES = [
+        (STATUS_PENDING, 'In coda'),
+        (STATUS_SENT, 'Inviata'),
+        (STATUS_FAILED, 'Fallita'),
+    ]
+    
+    contact_message = models.ForeignKey(
+        ContactMessage,
+        on_delete=models.SET_NULL,
+        null=True,
+        blank=True,
+        related_name='notifications',
+        verbose_name="Messaggio"
+    )
+    recipient = models.EmailField(verbose_name="Destinatario")
+    reply_to = models.EmailField(blank=True, verbose_name="Rispondi a")
+    subject = models.CharField(max_length=255, verbose_name="Oggetto")
+    body = models.TextField(verbose_name="Testo")
+    status = models.CharField(
+        max_length=10,
+        choices=STATUS_CHOICES,
+        default=STATUS_PENDING,
+        verbose_name="Stato"
+    )
+    attempts = models.PositiveSmallIntegerField(default=0, verbose_name="Tentativi")
+    next_attempt_at = models.DateTimeField(default=timezone.now, verbose_name="Prossimo Tentativo")
+    last_error = models.TextField(blank=True, verbose_name="Ultimo Errore")
+    created_at = models.DateTimeField(auto_now_add=True, verbose_name="Creata il")
+    sent_at = models.DateTimeField(null=True, blank=True, verbose_name="Inviata il")
+    
+    class Meta:
+        verbose_name = "Notifica Email"
+        verbose_name_plural = "Notifiche Email"
+        ordering = ['-created_at']
+        indexes = [
+            models.Index(
+                fields=['status', 'next_attempt_at'],
+                name='notification_queue_idx'
+            ),
+        ]
+    
+    def __str__(self):
+        return f"{self.subject} -> {self.recipient} ({self.get_status_display()})"
+
+
 class SiteSettings(models.Model):
     """
     Impostazioni globali del sito. Dovrebbe esistere una sola istanza.
@@ -256,6 +534,12 @@ class SiteSettings(models.Model):
         null=True,
         verbose_name="Foto Profilo"
     )
+    author_image_variants = models.JSONField(
+        default=dict,
+        blank=True,
+        editable=False,
+        verbose_name="Varianti Foto Profilo"
+    )
     email = models.EmailField(
         blank=True,
         verbose_name="Email"
@@ -276,14 +560,7 @@ class SiteSettings(models.Model):
         verbose_name="Link Social",
         help_text='Es. {"github": "https://github.com/...", "linkedin": "..."}'
     )
-    current_palette = models.ForeignKey(
-        ColorPalette, 
-        on_delete=models.SET_NULL, 
-        null=True, 
-        blank=True,
-        verbose_name="Palette Attiva"
-    )
-    
+
     class Meta:
         verbose_name = "Impostazioni Sito"
         verbose_name_plural = "Impostazioni Sito"
@@ -294,7 +571,13 @@ class SiteSettings(models.Model):
     def save(self, *args, **kwargs):
         # Assicura che esista una sola istanza
         self.pk = 1
-        super().save(*args, **kwargs)
+        update_fields = kwargs.get('update_fields')
+        with transaction.atomic():
+            # save() sovrascrive le varianti con quelle in memoria
+            previous = stored_variants(self, 'author_image')
+            super().save(*args, **kwargs)
+            if update_fields is None or 'author_image' in update_fields:
+                refresh_variants(self, 'author_image', previous=previous)
     
     @classmethod
     def get_settings(cls):
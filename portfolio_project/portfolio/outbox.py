@@ -0,0 +1,200 @@
+"""
+Coda delle email di notifica (outbox).
+
+La view di contatto salva il messaggio e la relativa ``EmailNotification``
+nella stessa transazione e risponde subito; l'invio avviene fuori dalla
+richiesta con ``python manage.py send_notifications`` o, su Vercel, dal cron
+che chiama ``/cron/send-notifications/``. Ogni lotto usa una sola
+connessione al server di posta e gli errori vengono ritentati con attese
+crescenti.
+"""
+import time
+from datetime import timedelta
+
+from django.conf import settings
+from django.core.mail import EmailMessage, get_connection
+from django.db import transaction
+from django.db.models import F
+from django.utils import timezone
+
+from .models import EmailNotification
+
+
+DEFAULT_BATCH_SIZE = 50
+DEFAULT_MAX_ATTEMPTS = 5
+# Attesa prima del secondo tentativo, raddoppiata ad ogni errore
+DEFAULT_RETRY_DELAY = 60
+MAX_RETRY_DELAY = 6 * 60 * 60
+# Per quanto un lotto preso in carico resta riservato al worker che lo invia
+CLAIM_TIMEOUT = 10 * 60
+
+
+def _setting(name, default):
+    return getattr(settings, name, default)
+
+
+def queue_contact_notification(contact_message, recipient):
+    """Mette in coda la notifica per un nuovo messaggio di contatto."""
+    return EmailNotification.objects.create(
+        contact_message=contact_message,
+        recipient=recipient,
+        reply_to=contact_message.email,
+        subject=f"Nuovo messaggio: {contact_message.subject}",
+        body=(
+            f"Da: {contact_message.name} ({contact_message.email})\n\n"
+            f"{contact_message.message}"
+        ),
+    )
+
+
+def retry_delay(attempts):
+    """Secondi di attesa dopo il tentativo numero ``attempts`` fallito."""
+    base = _setting('OUTBOX_RETRY_DELAY', DEFAULT_RETRY_DELAY)
+    return min(base * 2 ** max(attempts - 1, 0), MAX_RETRY_DELAY)
+
+
+def due_notifications(now):
+    """Notifiche in coda da inviare entro ``now``, dalla più vecchia."""
+    return (
+        EmailNotification.objects
+        .filter(status=EmailNotification.STATUS_PENDING, next_attempt_at__lte=now)
+        .order_by('next_attempt_at', 'pk')
+    )
+
+
+def claim_batch(batch_size=None, now=None):
+    """
+    Prende in carico le notifiche da inviare: le sposta avanti di
+    ``CLAIM_TIMEOUT`` e ne incrementa i tentativi, così un altro worker non
+    le invia di nuovo e, se questo si interrompe, tornano in coda da sole.
+    """
+    now = now or timezone.now()
+    batch_size = batch_size or _setting('OUTBOX_BATCH_SIZE', DEFAULT_BATCH_SIZE)
+    with transaction.atomic():
+        batch = list(
+            due_notifications(now).select_for_update(skip_locked=True)[:batch_size]
+        )
+        if batch:
+            EmailNotification.objects.filter(pk__in=[n.pk for n in batch]).update(
+                attempts=F('attempts') + 1,
+                next_attempt_at=now + timedelta(seconds=CLAIM_TIMEOUT),
+            )
+    for notification in batch:
+        notification.attempts += 1
+    return batch
+
+
+def _mark_sent(notifications, now):
+    EmailNotification.objects.filter(pk__in=[n.pk for n in notifications]).update(
+        status=EmailNotification.STATUS_SENT,
+        sent_at=now,
+        last_error='',
+    )
+
+
+def _mark_failed(notification, error, now):
+    """Ripianifica la notifica, o la segna come fallita dopo troppi tentativi."""
+    max_attempts = _setting('OUTBOX_MAX_ATTEMPTS', DEFAULT_MAX_ATTEMPTS)
+    if notification.attempts >= max_attempts:
+        notification.status = EmailNotification.STATUS_FAILED
+    notification.next_attempt_at = now + timedelta(seconds=retry_delay(notification.attempts))
+    notification.last_error = f'{type(error).__name__}: {error}'[:2000]
+    notification.save(update_fields=['status', 'next_attempt_at', 'last_error'])
+
+
+def _message(notification, connection):
+    return EmailMessage(
+        subject=notification.subject,
+        body=notification.body,
+        from_email=_setting('DEFAULT_FROM_EMAIL', None),
+        to=[notification.recipient],
+        reply_to=[notification.reply_to] if notification.reply_to else None,
+        connection=connection,
+    )
+
+
+def _digest_message(recipient, notifications, connection):
+    """
+    Una sola email che raccoglie più notifiche per lo stesso destinatario.
+    Mantiene il Reply-To solo se tutte vengono dallo stesso mittente: una
+    risposta non deve mai arrivare a persone diverse.
+    """
+    separator = '\n\n' + '-' * 40 + '\n\n'
+    senders = {notification.reply_to for notification in notifications}
+    return EmailMessage(
+        subject=f"{len(notifications)} nuovi messaggi dal portfolio",
+        body=separator.join(
+            f"{notification.subject}\n{notification.body}"
+            for notification in notifications
+        ),
+        from_email=_setting('DEFAULT_FROM_EMAIL', None),
+        to=[recipient],
+        reply_to=list(senders) if len(senders) == 1 and all(senders) else None,
+        connection=connection,
+    )
+
+
+def send_pending(batch_size=None, digest=False, connection=None):
+    """
+    Invia un lotto di notifiche. Con ``digest`` le notifiche dello stesso
+    destinatario vengono unite in un'unica email.
+    Restituisce la coppia ``(inviate, fallite)``.
+    """
+    batch = claim_batch(batch_size)
+    if not batch:
+        return 0, 0
+
+    if digest:
+        groups = {}
+        for notification in batch:
+            groups.setdefault(notification.recipient, []).append(notification)
+    else:
+        groups = {notification.pk: [notification] for notification in batch}
+
+    connection = connection or get_connection(fail_silently=False)
+    sent = failed = 0
+    now = timezone.now()
+    try:
+        connection.open()
+    except Exception as error:
+        # Server non raggiungibile: tutto il lotto va ritentato
+        for notification in batch:
+            _mark_failed(notification, error, now)
+        return 0, len(batch)
+
+    try:
+        for key, notifications in groups.items():
+            if len(notifications) > 1:
+                message = _digest_message(key, notifications, connection)
+            else:
+                message = _message(notifications[0], connection)
+            try:
+                message.send()
+            except Exception as error:
+                for notification in notifications:
+                    _mark_failed(notification, error, now)
+                failed += len(notifications)
+            else:
+                _mark_sent(notifications, timezone.now())
+                sent += len(notifications)
+    finally:
+        connection.close()
+    return sent, failed
+
+
+
+def drain(batch_size=None, digest=False, time_budget=None):
+    """
+    Invia lotti finché la coda è vuota o, con ``time_budget``, finché non
+    sono passati quei secondi: ciò che resta viene inviato al giro successivo.
+    Restituisce la coppia ``(inviate, fallite)``.
+    """
+    deadline = time.monotonic() + time_budget if time_budget is not None else None
+    total_sent = total_failed = 0
+    while deadline is None or time.monotonic() < deadline:
+        sent, failed = send_pending(batch_size=batch_size, digest=digest)
+        total_sent += sent
+        total_failed += failed
+        if not sent:
+            break
+    return total_sent, total_failed
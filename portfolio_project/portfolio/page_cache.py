@@ -0,0 +1,183 @@
+"""
+Cache delle pagine pubbliche.
+
+Ogni risposta viene salvata insieme alle versioni dei modelli da cui
+dipende: quando uno di questi modelli cambia, solo le pagine che lo usano
+smettono di essere valide.
+
+Cache delle pagine e conteggio di hit e miss richiedono un backend di
+cache condiviso tra i processi (il database o Redis, vedi ``CACHES``): con
+la cache locale ogni worker continuerebbe a servire le proprie pagine
+dopo una modifica salvata da un altro, e avrebbe contatori propri.
+"""
+import hashlib
+from functools import wraps
+
+from asgiref.sync import iscoroutinefunction, sync_to_async
+
+from django.conf import settings
+from django.core.cache import cache
+from django.http import HttpResponse
+
+from .cache import get_versions, is_shared_cache, version_name
+from .models import ColorPalette, SiteSettings, Skill
+
+
+PAGE_KEY_PREFIX = 'portfolio:page:'
+STATS_KEY_PREFIX = 'portfolio:page-stats:'
+
+# Ogni pagina usa base.html, che dipende da impostazioni, palette e (per il
+# Font Awesome completo quando mancano icone) skill
+BASE_DEPENDENCIES = (SiteSettings, ColorPalette, Skill)
+
+# Nomi delle view decorate, usati per leggere le statistiche
+registered_views = set()
+
+
+def page_cache_key(request):
+    """Chiave della pagina: host, percorso e parametri GET ordinati."""
+    query = sorted(
+        (key, value)
+        for key in request.GET
+        for value in request.GET.getlist(key)
+    )
+    raw = f'{request.get_host()}|{request.path}|{query!r}'
+    digest = hashlib.md5(raw.encode('utf-8')).hexdigest()
+    return f'{PAGE_KEY_PREFIX}{digest}'
+
+
+def page_cache_enabled():
+    """``PAGE_CACHE_ENABLED`` ha effetto solo con una cache condivisa."""
+    return getattr(settings, 'PAGE_CACHE_ENABLED', True) and is_shared_cache()
+
+
+def _is_cacheable_request(request):
+    if not page_cache_enabled():
+        return False
+    if request.method not in ('GET', 'HEAD'):
+        return False
+    # Messaggi flash e sessioni autenticate rendono la pagina personale
+    if 'messages' in request.COOKIES:
+        return False
+    if settings.SESSION_COOKIE_NAME in request.COOKIES:
+        return False
+    return True
+
+
+def _is_cacheable_response(response):
+    if response.status_code != 200 or response.streaming:
+        return False
+    if response.cookies:
+        return False
+    cache_control = response.get('Cache-Control', '')
+    return 'private' not in cache_control and 'no-store' not in cache_control
+
+
+def stats_enabled():
+    """I contatori seguono la cache delle pagine."""
+    return page_cache_enabled()
+
+
+def _record(view_name, outcome):
+    if not stats_enabled():
+        return
+    key = f'{STATS_KEY_PREFIX}{view_name}:{outcome}'
+    try:
+        cache.incr(key)
+    except ValueError:
+        cache.add(key, 0, None)
+        cache.incr(key)
+
+
+def get_stats():
+    """Restituisce hit e miss per ogni view in cache."""
+    keys = {
+        f'{STATS_KEY_PREFIX}{name}:{outcome}': (name, outcome)
+        for name in registered_views
+        for outcome in ('hit', 'miss')
+    }
+    found = cache.get_many(list(keys))
+    stats = {name: {'hit': 0, 'miss': 0} for name in registered_views}
+    for key, (name, outcome) in keys.items():
+        stats[name][outcome] = found.get(key, 0)
+    return stats
+
+
+def reset_stats():
+    cache.delete_many([
+        f'{STATS_KEY_PREFIX}{name}:{outcome}'
+        for name in registered_views
+        for outcome in ('hit', 'miss')
+    ])
+
+
+def _lookup(request, view_name, dependencies):
+    """
+    Cerca la pagina in cache. Restituisce chiave, versioni correnti e la
+    risposta salvata (``None`` se assente o non più valida).
+    """
+    key = page_cache_key(request)
+    versions = get_versions(*dependencies)
+    entry = cache.get(key)
+    if entry is None or entry['versions'] != versions:
+        _record(view_name, 'miss')
+        return key, versions, None
+
+    _record(view_name, 'hit')
+    response = HttpResponse(entry['content'], status=entry['status'])
+    for header, value in entry['headers']:
+        response[header] = value
+    response['X-Page-Cache'] = 'HIT'
+    return key, versions, response
+
+
+def _store(key, versions, response):
+    if _is_cacheable_response(response):
+        cache.set(key, {
+            'versions': versions,
+            'status': response.status_code,
+            'headers': list(response.items()),
+            'content': response.content,
+        }, getattr(settings, 'PAGE_CACHE_TIMEOUT', 60 * 60 * 24))
+    response['X-Page-Cache'] = 'MISS'
+
+
+def cache_public_page(*models):
+    """
+    Decoratore per le view pubbliche: salva la risposta e la riusa finché
+    i modelli indicati (più impostazioni e palette) non vengono modificati.
+    Funziona sia con view sincrone sia con view asincrone.
+    """
+    dependencies = tuple(
+        version_name(model) for model in models + BASE_DEPENDENCIES
+    )
+
+    def decorator(view_func):
+        view_name = view_func.__name__
+        registered_views.add(view_name)
+
+        if iscoroutinefunction(view_func):
+            @wraps(view_func)
+            async def wrapper(request, *args, **kwargs):
+                if not _is_cacheable_request(request):
+                    return await view_func(request, *args, **kwargs)
+                # La cache su database non può essere letta dal ciclo di eventi
+                key, versions, response = await sync_to_async(_lookup)(request, view_name, dependencies)
+                if response is None:
+                    response = await view_func(request, *args, **kwargs)
+                    await sync_to_async(_store)(key, versions, response)
+                return response
+        else:
+            @wraps(view_func)
+            def wrapper(request, *args, **kwargs):
+                if not _is_cacheable_request(request):
+                    return view_func(request, *args, **kwargs)
+                key, versions, response = _lookup(request, view_name, dependencies)
+                if response is None:
+                    response = view_func(request, *args, **kwargs)
+                    _store(key, versions, response)
+                return response
+
+        return wrapper
+
+    return decorator
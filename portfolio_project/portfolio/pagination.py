@@ -0,0 +1,161 @@
+"""
+Paginazione a cursore (keyset) per i progetti.
+
+Invece di ``COUNT(*)`` + ``OFFSET`` ogni pagina parte dalla chiave
+dell'ultimo elemento visto, seguendo l'ordinamento ``(order, -created_at)``
+dei progetti (più ``-id`` per rendere la chiave univoca). Il costo non
+cresce con il numero di pagina e le pagine restano coerenti anche se nel
+frattempo vengono aggiunti progetti.
+"""
+import base64
+import binascii
+import hashlib
+import json
+
+from django.core.cache import cache
+from django.db.models import Q
+from django.utils.dateparse import parse_datetime
+
+from .cache import get_versions
+
+
+FORWARD_ORDERING = ('order', '-created_at', '-id')
+BACKWARD_ORDERING = ('-order', 'created_at', 'id')
+
+
+class InvalidCursor(ValueError):
+    pass
+
+
+def encode_cursor(project, direction):
+    """Cursore opaco che punta subito dopo (o prima di) ``project``."""
+    data = {
+        'd': direction,
+        'o': project.order,
+        'c': project.created_at.isoformat(),
+        'i': project.pk,
+    }
+    raw = json.dumps(data, separators=(',', ':')).encode('utf-8')
+    return base64.urlsafe_b64encode(raw).decode('ascii').rstrip('=')
+
+
+def decode_cursor(cursor):
+    try:
+        padded = cursor + '=' * (-len(cursor) % 4)
+        data = json.loads(base64.urlsafe_b64decode(padded.encode('ascii')))
+        created_at = parse_datetime(data['c'])
+        if data['d'] not in ('n', 'p') or created_at is None:
+            raise InvalidCursor(cursor)
+        return data['d'], int(data['o']), created_at, int(data['i'])
+    except (binascii.Error, KeyError, TypeError, ValueError, UnicodeError):
+        raise InvalidCursor(cursor)
+
+
+def cached_count(queryset, dependencies, timeout=None):
+    """
+    ``COUNT(*)`` del queryset salvato in cache finché le versioni indicate
+    non cambiano.
+    """
+    sql, params = queryset.query.sql_with_params()
+    raw = f'{sql}|{params!r}|{get_versions(*dependencies)!r}'
+    key = 'portfolio:count:' + hashlib.md5(raw.encode('utf-8')).hexdigest()
+    count = cache.get(key)
+    if count is None:
+        count = queryset.count()
+        cache.set(key, count, timeout)
+    return count
+
+
+class CursorPage:
+    """Pagina di risultati, con i cursori verso le pagine vicine."""
+
+    def __init__(self, object_list, next_cursor, previous_cursor, count=None):
+        self.object_list = object_list
+        self.next_cursor = next_cursor
+        self.previous_cursor = previous_cursor
+        self.count = count
+
+    def __iter__(self):
+        return iter(self.object_list)
+
+    def __len__(self):
+        return len(self.object_list)
+
+    def has_next(self):
+        return self.next_cursor is not None
+
+    def has_previous(self):
+        return self.previous_cursor is not None
+
+    def has_other_pages(self):
+        return self.has_next() or self.has_previous()
+
+
+class CursorPaginator:
+    """
+    Paginatore keyset per querysets di ``Project``.
+    ``count`` è opzionale: se serve, passare una funzione che lo calcoli
+    (ad esempio con ``cached_count``).
+    """
+
+    def __init__(self, queryset, per_page, count=None):
+        self.queryset = queryset
+        self.per_page = per_page
+        self.count = count
+
+    def get_page(self, cursor=None):
+        """Restituisce la pagina indicata; un cursore non valido porta alla prima."""
+        direction = key = None
+        if cursor:
+            try:
+                direction, order, created_at, pk = decode_cursor(cursor)
+                key = (order, created_at, pk)
+            except InvalidCursor:
+                direction = None
+
+        count = self.count() if callable(self.count) else self.count
+
+        if direction == 'p':
+            rows = list(
+                self.queryset.filter(self._before(*key))
+                .order_by(*BACKWARD_ORDERING)[:self.per_page + 1]
+            )
+            has_more = len(rows) > self.per_page
+            rows = rows[:self.per_page][::-1]
+            return CursorPage(
+                rows,
+                next_cursor=encode_cursor(rows[-1], 'n') if rows else None,
+                previous_cursor=encode_cursor(rows[0], 'p') if has_more else None,
+                count=count,
+            )
+
+        queryset = self.queryset.order_by(*FORWARD_ORDERING)
+        if direction == 'n':
+            queryset = queryset.filter(self._after(*key))
+        rows = list(queryset[:self.per_page + 1])
+        has_more = len(rows) > self.per_page
+        rows = rows[:self.per_page]
+        return CursorPage(
+            rows,
+            next_cursor=encode_cursor(rows[-1], 'n') if has_more else None,
+            previous_cursor=encode_cursor(rows[0], 'p') if direction and rows else None,
+            count=count,
+        )
+
+    @staticmethod
+    def _after(order, created_at, pk):
+        """Elementi che seguono la chiave nell'ordinamento."""
+        return (
+            Q(order__gt=order)
+            | Q(order=order, created_at__lt=created_at)
+            | Q(order=order, created_at=created_at, pk__lt=pk)
+        )
+
+    @staticmethod
+    def _before(order, created_at, pk):
+        """Elementi che precedono la chiave nell'ordinamento."""
+        return (
+            Q(order__lt=order)
+            | Q(order=order, created_at__gt=created_at)
+            | Q(order=order, created_at=created_at, pk__gt=pk)
+        )
@@ -0,0 +1,130 @@
+"""
+Verifica dei piani di esecuzione delle query più frequenti.
+
+Ogni query delle view viene eseguita con ``EXPLAIN`` e il piano viene
+controllato per due problemi: la lettura completa di una tabella (full
+scan) e l'ordinamento in una struttura temporanea (temp sort). Su SQLite
+sono le righe ``SCAN <tabella>`` senza indice e ``USE TEMP B-TREE``; su
+PostgreSQL i nodi ``Seq Scan`` e ``Sort``, con ``enable_seqscan`` ed
+``enable_sort`` disattivati per vedere se un indice è utilizzabile anche
+quando la tabella è così piccola che il planner preferirebbe non usarlo.
+"""
+import re
+from dataclasses import dataclass
+
+from django.db import connection, transaction
+from django.utils import timezone
+
+from . import archive, outbox
+from .catalog import technology_counts
+from .inbox import KEYSET_ORDERING, _older_than
+from .models import ColorPalette, ContactMessage, Experience, Project, Skill
+from .pagination import FORWARD_ORDERING
+from .views import (
+    PROJECTS_PER_PAGE, featured_projects, filtered_projects, related_links,
+)
+
+
+FULL_SCAN = 'full scan'
+TEMP_SORT = 'temp sort'
+
+
+@dataclass(frozen=True)
+class AuditedQuery:
+    name: str
+    build: object
+    # Problemi attesi e accettati (es. una lettura completa voluta)
+    allowed: tuple = ()
+
+
+# Le query vengono dagli stessi helper usati dalle view, così l'audit
+# controlla ciò che le pagine eseguono davvero
+AUDITED_QUERIES = (
+    AuditedQuery('home: progetti in evidenza', featured_projects),
+    AuditedQuery('progetti: lista', lambda: filtered_projects()[:PROJECTS_PER_PAGE]),
+    AuditedQuery('progetti: categoria', lambda: (
+        filtered_projects(category='web')[:PROJECTS_PER_PAGE]
+    )),
+    AuditedQuery('progetti: cursore', lambda: (
+        filtered_projects().order_by(*FORWARD_ORDERING)[:PROJECTS_PER_PAGE + 1]
+    )),
+    AuditedQuery('progetti: cursore per categoria', lambda: (
+        filtered_projects(category='web').order_by(*FORWARD_ORDERING)[:PROJECTS_PER_PAGE + 1]
+    )),
+    # I progetti di una tecnologia sono pochi e arrivano dall'indice delle
+    # tecnologie: ordinarli costa meno che scorrere tutti i progetti in ordine
+    AuditedQuery('progetti: tecnologia', lambda: (
+        filtered_projects(technology_id=1)[:PROJECTS_PER_PAGE]
+    ), allowed=(TEMP_SORT,)),
+    AuditedQuery('dettaglio progetto', lambda: Project.objects.filter(slug='progetto')),
+    AuditedQuery('progetti correlati', lambda: related_links(1)),
+    AuditedQuery('palette attiva', ColorPalette.active),
+    # Le pagine mostrano tutte le skill e le esperienze: la lettura completa
+    # è voluta, ma l'ordinamento deve venire dall'indice
+    AuditedQuery('skill', lambda: Skill.objects.all(), allowed=(FULL_SCAN,)),
+    AuditedQuery('esperienze', lambda: Experience.objects.all(), allowed=(FULL_SCAN,)),
+    # Aggregato su tutte le tecnologie, ordinato per conteggio: entrambi
+    # inevitabili, ed è comunque in cache finché i progetti non cambiano
+    AuditedQuery('nuvola tecnologie', technology_counts, allowed=(FULL_SCAN, TEMP_SORT)),
+    AuditedQuery('admin: messaggi', lambda: (
+        ContactMessage.objects.order_by(*KEYSET_ORDERING)[:50]
+    )),
+    AuditedQuery('admin: messaggi, pagina successiva', lambda: (
+        ContactMessage.objects.filter(_older_than(timezone.now(), 1)).order_by(*KEYSET_ORDERING)[:50]
+    )),
+    AuditedQuery('admin: messaggi non letti', lambda: (
+        ContactMessage.objects.filter(is_read=False).order_by(*KEYSET_ORDERING)[:50]
+    )),
+    AuditedQuery('archivio: messaggi letti da archiviare', lambda: (
+        archive.archivable_messages(timezone.now())[:archive.DEFAULT_BATCH_SIZE]
+    )),
+    AuditedQuery('outbox: notifiche da inviare', lambda: (
+        outbox.due_notifications(timezone.now())[:outbox.DEFAULT_BATCH_SIZE]
+    )),
+)
+
+SQLITE_FULL_SCAN = re.compile(r'\bSCAN (?!.*\bUSING (?:COVERING )?INDEX\b)')
+SQLITE_TEMP_SORT = re.compile(r'\bUSE TEMP B-TREE\b')
+POSTGRES_FULL_SCAN = re.compile(r'\bSeq Scan\b')
+POSTGRES_TEMP_SORT = re.compile(r'(?:^|->)\s*(?:Incremental )?Sort\b')
+
+
+def explain(queryset):
+    """Piano di esecuzione del queryset, una riga per nodo."""
+    if connection.vendor == 'postgresql':
+        with transaction.atomic(), connection.cursor() as cursor:
+            cursor.execute('SET LOCAL enable_seqscan = off')
+            cursor.execute('SET LOCAL enable_sort = off')
+            return queryset.explain().splitlines()
+    return queryset.explain().splitlines()
+
+
+def plan_problems(plan, vendor=None):
+    """Problemi trovati nelle righe del piano, come ``(problema, riga)``."""
+    vendor = vendor or connection.vendor
+    if vendor == 'postgresql':
+        patterns = ((FULL_SCAN, POSTGRES_FULL_SCAN), (TEMP_SORT, POSTGRES_TEMP_SORT))
+    else:
+        patterns = ((FULL_SCAN, SQLITE_FULL_SCAN), (TEMP_SORT, SQLITE_TEMP_SORT))
+    return [
+        (problem, line.strip())
+        for line in plan
+        for problem, pattern in patterns
+        if pattern.search(line)
+    ]
+
+
+def audit(queries=AUDITED_QUERIES):
+    """
+    Esegue ``EXPLAIN`` su ogni query. Restituisce una lista di
+    ``(query, piano, problemi non accettati)``.
+    """
+    results = []
+    for query in queries:
+        plan = explain(query.build())
+        problems = [
+            (problem, line) for problem, line in plan_problems(plan)
+            if problem not in query.allowed
+        ]
+        results.append((query, plan, problems))
+    return results
@@ -0,0 +1,202 @@
+"""
+Progetti correlati precalcolati.
+
+Ogni coppia di progetti riceve un punteggio basato su tecnologie in comune,
+categoria e data del progetto correlato; per ogni progetto vengono salvati
+i migliori ``RELATED_PROJECTS_LIMIT`` nella tabella ``RelatedProject``.
+Quando un progetto cambia si ricalcolano solo le liste che possono esserne
+influenzate.
+"""
+import math
+from collections import defaultdict
+from datetime import timedelta
+
+from django.db import transaction
+from django.db.models import Q
+from django.utils import timezone
+
+from .cache import bump_version, version_name
+
+
+RELATED_PROJECTS_LIMIT = 6
+
+TECHNOLOGY_WEIGHT = 0.6
+CATEGORY_WEIGHT = 0.25
+RECENCY_WEIGHT = 0.15
+# Dopo quanti giorni il bonus per i progetti recenti si dimezza
+RECENCY_HALF_LIFE_DAYS = 365
+
+
+def load_features(project_model, link_model, pks=None, now=None):
+    """
+    Legge categoria, data e tecnologie dei progetti con due query: tutti,
+    o solo quelli in ``pks`` (lista o queryset di pk). Il bonus per la data
+    è calcolato rispetto a ``now``, così punteggi letti in momenti diversi
+    restano confrontabili.
+    """
+    projects = project_model.objects.order_by()
+    links = link_model.objects.order_by()
+    if pks is not None:
+        projects = projects.filter(pk__in=pks)
+        links = links.filter(project_id__in=pks)
+
+    technologies = defaultdict(set)
+    for project_id, technology_id in links.values_list('project_id', 'technology_id'):
+        technologies[project_id].add(technology_id)
+
+    now = now or timezone.now()
+    features = {}
+    for pk, category, created_at in projects.values_list('pk', 'category', 'created_at'):
+        age_days = max((now - created_at).days, 0) if created_at else 0
+        features[pk] = (
+            category,
+            frozenset(technologies[pk]),
+            math.pow(0.5, age_days / RECENCY_HALF_LIFE_DAYS),
+        )
+    return features
+
+
+def _recent(project_model, now, limit=RELATED_PROJECTS_LIMIT):
+    """
+    Condizione sui progetti più recenti: almeno ``limit + 1``, più quelli
+    con la stessa età in giorni dell'ultimo. Un progetto escluso, senza
+    categoria o tecnologie in comune, vale meno di almeno ``limit`` di
+    questi e non entra in nessuna lista. ``None`` se valgono tutti.
+    """
+    boundary = project_model.objects.order_by('-created_at').values_list('created_at', flat=True)
+    boundary = next(iter(boundary[limit:limit + 1]), None)
+    if boundary is None:
+        return None
+    age_days = max((now - boundary).days, 0)
+    return Q(created_at__gt=now - timedelta(days=age_days + 1)) | Q(created_at__isnull=True)
+
+
+def _sharing(project_model, link_model, features):
+    """Condizione sui progetti con una categoria o tecnologia tra ``features``."""
+    categories = {category for category, _, _ in features}
+    technologies = set().union(*(technologies for _, technologies, _ in features))
+    return Q(category__in=categories) | Q(
+        pk__in=link_model.objects.filter(technology_id__in=technologies).values('project_id')
+    )
+
+
+def candidates_for(project_model, link_model, features, now):
+    """
+    Pk dei progetti che possono comparire nelle liste dei progetti in
+    ``features``, come queryset, o ``None`` se possono comparire tutti.
+    """
+    recent = _recent(project_model, now)
+    if recent is None:
+        return None
+    condition = _sharing(project_model, link_model, features) | recent
+    return project_model.objects.order_by().filter(condition).values('pk')
+
+
+def score(source, candidate):
+    """Punteggio tra 0 e 1 del progetto ``candidate`` come correlato di ``source``."""
+    category, technologies, _ = source
+    other_category, other_technologies, other_recency = candidate
+    union = technologies | other_technologies
+    overlap = len(technologies & other_technologies) / len(union) if union else 0.0
+    return (
+        TECHNOLOGY_WEIGHT * overlap
+        + CATEGORY_WEIGHT * (category == other_category)
+        + RECENCY_WEIGHT * other_recency
+    )
+
+
+def rank_for(pk, features, limit=RELATED_PROJECTS_LIMIT):
+    """Restituisce i migliori ``(id, punteggio)`` per il progetto indicato."""
+    source = features[pk]
+    scored = [
+        (other_pk, score(source, other))
+        for other_pk, other in features.items()
+        if other_pk != pk
+    ]
+    scored.sort(key=lambda item: (-item[1], -item[0]))
+    return scored[:limit]
+
+
+def _write(related_model, rankings):
+    """Sostituisce le liste dei progetti in ``rankings``."""
+    with transaction.atomic():
+        related_model.objects.filter(project_id__in=list(rankings)).delete()
+        related_model.objects.bulk_create([
+            related_model(project_id=pk, related_id=related_pk, score=value)
+            for pk, ranking in rankings.items()
+            for related_pk, value in ranking
+        ], batch_size=500)
+
+
+def rebuild_all(project_model, link_model, related_model):
+    """Ricalcola da zero tutte le liste. Restituisce il numero di progetti."""
+    features = load_features(project_model, link_model)
+    with transaction.atomic():
+        related_model.objects.all().delete()
+        _write(related_model, {pk: rank_for(pk, features) for pk in features})
+    return len(features)
+
+
+def update_for_project(pk, affected=()):
+    """
+    Aggiorna le liste dopo il salvataggio o l'eliminazione di un progetto.
+
+    Oltre alla lista del progetto stesso, ricalcola quelle che lo contengono
+    (``affected`` permette di passarle quando il progetto è già eliminato)
+    e quelle in cui il nuovo punteggio raggiunge l'ultimo elemento presente
+    (a parità di punteggio vince il progetto più recente). Vengono lette
+    solo le liste che il progetto può raggiungere: chi non ne condivide
+    categoria o tecnologie gli dà soltanto il bonus per la data, che conta
+    solo se il progetto è tra i più recenti. Tutti i punteggi, anche quelli
+    delle liste già salvate, sono ricalcolati con lo stesso ``now``.
+    """
+    from .models import Project, ProjectTechnology, RelatedProject
+
+    now = timezone.now()
+    projects = Project.objects.order_by()
+    to_update = set(projects.filter(pk__in=list(affected)).values_list('pk', flat=True))
+    to_update.update(RelatedProject.objects.filter(related_id=pk).values_list('project_id', flat=True))
+
+    changed = load_features(Project, ProjectTechnology, [pk], now).get(pk)
+    if changed is not None:
+        to_update.add(pk)
+        recent = _recent(Project, now)
+        if recent is None or projects.filter(recent, pk=pk).exists():
+            # Col bonus per la data può entrare in qualsiasi lista
+            reachable = None
+        else:
+            reachable = projects.filter(_sharing(Project, ProjectTechnology, [changed])).values('pk')
+
+        current = defaultdict(list)
+        rows = RelatedProject.objects.exclude(project_id__in=to_update)
+        if reachable is not None:
+            rows = rows.filter(project_id__in=reachable)
+        for project_id, related_id in rows.values_list('project_id', 'related_id'):
+            current[project_id].append(related_id)
+
+        if reachable is None:
+            features = load_features(Project, ProjectTechnology, now=now)
+            peers = set(features)
+        else:
+            peers = set(reachable.values_list('pk', flat=True))
+            members = {related_id for ranking in current.values() for related_id in ranking}
+            features = load_features(Project, ProjectTechnology, peers | members, now)
+
+        for other_pk in peers - to_update:
+            source = features[other_pk]
+            ranking = current.get(other_pk, [])
+            if (
+                len(ranking) < RELATED_PROJECTS_LIMIT
+                or score(source, changed) >= min(score(source, features[r]) for r in ranking)
+            ):
+                to_update.add(other_pk)
+
+    if to_update:
+        sources = load_features(Project, ProjectTechnology, to_update, now)
+        pool = candidates_for(Project, ProjectTechnology, sources.values(), now)
+        features = load_features(Project, ProjectTechnology, pool, now)
+        _write(RelatedProject, {
+            project_pk: rank_for(project_pk, features) for project_pk in sources
+        })
+    bump_version(version_name(RelatedProject))
+    return to_update
@@ -0,0 +1,158 @@
+"""
+Ricerca full-text sui progetti.
+
+Su SQLite usa una tabella virtuale FTS5 aggiornata ad ogni salvataggio di
+``Project``; su PostgreSQL un indice GIN su un'espressione ``tsvector``,
+che il database mantiene da solo. Con altri backend ricade su ``icontains``.
+"""
+import re
+
+from django.core.exceptions import EmptyResultSet
+from django.db import connection
+from django.db.models import Case, IntegerField, Q, When
+
+from .models import Project
+
+
+FTS_TABLE = 'portfolio_project_fts'
+FTS_COLUMNS = ('title', 'short_description', 'description', 'technologies')
+# Pesi BM25 nello stesso ordine di FTS_COLUMNS
+FTS_WEIGHTS = (10.0, 4.0, 1.0, 6.0)
+
+# Deve coincidere con l'espressione dell'indice GIN creato dalla migrazione 0003
+PG_VECTOR = (
+    "setweight(to_tsvector('simple', coalesce(title, '')), 'A') || "
+    "setweight(to_tsvector('simple', coalesce(technologies, '')), 'B') || "
+    "setweight(to_tsvector('simple', coalesce(short_description, '')), 'C') || "
+    "setweight(to_tsvector('simple', coalesce(description, '')), 'D')"
+)
+
+MAX_RESULTS = 200
+
+_TOKEN_RE = re.compile(r'\w+', re.UNICODE)
+
+
+def search_backend(conn=None):
+    """Restituisce 'sqlite', 'postgresql' o None se non c'è un indice."""
+    vendor = (conn or connection).vendor
+    return vendor if vendor in ('sqlite', 'postgresql') else None
+
+
+def tokenize(query):
+    """Parole della ricerca, senza operatori né punteggiatura."""
+    return _TOKEN_RE.findall(query or '')[:10]
+
+
+# --------------------------------------------------------------------------
+# Creazione e aggiornamento dell'indice
+# --------------------------------------------------------------------------
+
+def index_project(project):
+    """Aggiorna la riga del progetto nell'indice FTS5."""
+    if search_backend() != 'sqlite':
+        return
+    with connection.cursor() as cursor:
+        cursor.execute(f"DELETE FROM {FTS_TABLE} WHERE rowid = %s", [project.pk])
+        cursor.execute(
+            f"INSERT INTO {FTS_TABLE}(rowid, {', '.join(FTS_COLUMNS)}) "
+            f"VALUES (%s, {', '.join(['%s'] * len(FTS_COLUMNS))})",
+            [project.pk] + [getattr(project, column) or '' for column in FTS_COLUMNS],
+        )
+
+
+def unindex_project(pk):
+    """Rimuove un progetto dall'indice FTS5."""
+    if search_backend() != 'sqlite':
+        return
+    with connection.cursor() as cursor:
+        cursor.execute(f"DELETE FROM {FTS_TABLE} WHERE rowid = %s", [pk])
+
+
+def rebuild_index():
+    """Ricostruisce da zero l'indice FTS5 a partire dalla tabella progetti."""
+    if search_backend() != 'sqlite':
+        return
+    with connection.cursor() as cursor:
+        cursor.execute(f"DELETE FROM {FTS_TABLE}")
+        cursor.execute(
+            f"INSERT INTO {FTS_TABLE}(rowid, {', '.join(FTS_COLUMNS)}) "
+            f"SELECT id, {', '.join(FTS_COLUMNS)} FROM portfolio_project"
+        )
+
+
+# --------------------------------------------------------------------------
+# Ricerca
+# --------------------------------------------------------------------------
+
+def ranked_project_ids(query, limit=MAX_RESULTS, queryset=None):
+    """
+    Restituisce una lista di coppie ``(id, punteggio)`` dalla più rilevante.
+    Ogni parola cercata vale anche come prefisso ("djan" trova "Django").
+    Con ``queryset`` (es. i filtri per categoria e tecnologia) vengono
+    cercati solo quei progetti, prima di applicare ``limit``; con
+    ``limit=None`` vengono restituiti tutti i risultati.
+    """
+    tokens = tokenize(query)
+    if not tokens:
+        return []
+    limit_sql, limit_params = ('LIMIT %s', [limit]) if limit is not None else ('', [])
+
+    restriction, restriction_params = '', []
+    backend = search_backend()
+    if queryset is not None and backend:
+        try:
+            subquery, restriction_params = queryset.order_by().values('pk').query.sql_with_params()
+        except EmptyResultSet:
+            return []
+        column = 'rowid' if backend == 'sqlite' else 'id'
+        restriction = f"AND {column} IN ({subquery}) "
+
+    if backend == 'sqlite':
+        match = ' '.join(f'"{token}"*' for token in tokens)
+        weights = ', '.join(str(weight) for weight in FTS_WEIGHTS)
+        sql = (
+            f"SELECT rowid, -bm25({FTS_TABLE}, {weights}) AS rank "
+            f"FROM {FTS_TABLE} WHERE {FTS_TABLE} MATCH %s {restriction}"
+            f"ORDER BY rank DESC {limit_sql}"
+        )
+        params = [match, *restriction_params, *limit_params]
+    elif backend == 'postgresql':
+        tsquery = ' & '.join(f'{token}:*' for token in tokens)
+        sql = (
+            f"SELECT id, ts_rank({PG_VECTOR}, to_tsquery('simple', %s)) AS rank "
+            f"FROM portfolio_project "
+            f"WHERE {PG_VECTOR} @@ to_tsquery('simple', %s) {restriction}"
+            f"ORDER BY rank DESC, id {limit_sql}"
+        )
+        params = [tsquery, tsquery, *restriction_params, *limit_params]
+    else:
+        condition = Q()
+        for token in tokens:
+            condition &= (
+                Q(title__icontains=token)
+                | Q(short_description__icontains=token)
+                | Q(description__icontains=token)
+                | Q(technologies__icontains=token)
+            )
+        projects = Project.objects.all() if queryset is None else queryset
+        ids = projects.filter(condition).values_list('pk', flat=True)[:limit]
+        return [(pk, 0.0) for pk in ids]
+
+    with connection.cursor() as cursor:
+        cursor.execute(sql, params)
+        return [(pk, float(rank)) for pk, rank in cursor.fetchall()]
+
+
+def search_projects(queryset, query):
+    """
+    Filtra ``queryset`` ai progetti che corrispondono alla ricerca,
+    ordinati per rilevanza.
+    """
+    ranked = ranked_project_ids(query, queryset=queryset)
+    if not ranked:
+        return queryset.none()
+    ordering = Case(
+        *[When(pk=pk, then=position) for position, (pk, rank) in enumerate(ranked)],
+        output_field=IntegerField(),
+    )
+    return queryset.filter(pk__in=[pk for pk, rank in ranked]).order_by(ordering)
@@ -0,0 +1,90 @@
+from django.db import transaction
+from django.db.models.signals import post_delete, post_save, pre_delete
+from django.dispatch import receiver
+
+from . import inbox, related, search
+from .images import delete_variants, variants_field
+from .cache import bump_version, version_name
+from .models import (
+    ColorPalette, ContactMessage, Experience, Project, RelatedProject, SiteSettings, Skill,
+)
+
+
+@receiver([post_save, post_delete], sender=SiteSettings)
+@receiver([post_save, post_delete], sender=Project)
+@receiver([post_save, post_delete], sender=Skill)
+@receiver([post_save, post_delete], sender=Experience)
+@receiver([post_save, post_delete], sender=ColorPalette)
+def bump_model_version(sender, **kwargs):
+    """
+    Pubblica una nuova versione del modello modificato.
+    Il cambio avviene dopo il commit, così nessun worker può ricostruire
+    uno snapshot con i dati vecchi e la versione nuova.
+    """
+    name = version_name(sender)
+    transaction.on_commit(lambda: bump_version(name))
+
+
+@receiver(post_save, sender=Project)
+def index_project(sender, instance, **kwargs):
+    """Mantiene allineato l'indice di ricerca full-text."""
+    search.index_project(instance)
+
+
+@receiver(post_delete, sender=Project)
+def unindex_project(sender, instance, **kwargs):
+    search.unindex_project(instance.pk)
+
+
+@receiver(post_save, sender=ContactMessage)
+def index_message(sender, instance, created, raw=False, **kwargs):
+    """Aggiunge i nuovi messaggi all'indice di ricerca dell'admin."""
+    if created:
+        inbox.index_message(instance)
+
+
+@receiver(post_delete, sender=ContactMessage)
+def unindex_message(sender, instance, **kwargs):
+    inbox.unindex_message(instance)
+
+
+@receiver(post_save, sender=Project)
+def update_related_projects(sender, instance, raw=False, **kwargs):
+    """
+    Ricalcola i progetti correlati dopo il commit, quando anche l'indice
+    delle tecnologie è stato salvato.
+    """
+    if raw:
+        return
+    pk = instance.pk
+    transaction.on_commit(lambda: related.update_for_project(pk))
+
+
+@receiver(pre_delete, sender=Project)
+def remember_related_projects(sender, instance, **kwargs):
+    # Dopo l'eliminazione le righe collegate sono già sparite
+    instance._related_affected = list(
+        RelatedProject.objects.filter(related=instance).values_list('project_id', flat=True)
+    )
+
+
+@receiver(post_delete, sender=Project)
+def remove_related_projects(sender, instance, **kwargs):
+    pk, affected = instance.pk, getattr(instance, '_related_affected', [])
+    transaction.on_commit(lambda: related.update_for_project(pk, affected))
+
+
+# Campo immagine (con le relative varianti) di ogni modello
+IMAGE_FIELDS = {Project: 'image', SiteSettings: 'author_image'}
+
+
+@receiver(post_delete, sender=SiteSettings)
+@receiver(post_delete, sender=Project)
+def remove_image_variants(sender, instance, **kwargs):
+    """Elimina dopo il commit i file delle varianti dell'oggetto eliminato."""
+    field_name = IMAGE_FIELDS[sender]
+    data = getattr(instance, variants_field(field_name))
+    if data:
+        storage = getattr(instance, field_name).storage
+        transaction.on_commit(lambda: delete_variants(data, storage))
+
@@ -0,0 +1,132 @@
+"""
+Snapshot immutabili delle impostazioni del sito e della palette attiva.
+
+Vengono usati dal context processor al posto dei modelli, così il rendering
+di una pagina non esegue query per tema e impostazioni.
+"""
+from dataclasses import dataclass
+from types import MappingProxyType
+from typing import Optional
+
+from django.urls import reverse
+
+from . import vendor
+from .cache import aget_snapshot, get_snapshot, version_name
+from .images import ResponsiveImage, describe
+from .models import ColorPalette, SiteSettings, Skill
+
+
+@dataclass(frozen=True)
+class PaletteSnapshot:
+    """Copia in sola lettura di una ``ColorPalette``."""
+    pk: int
+    name: str
+    primary_color: str
+    secondary_color: str
+    accent_color: str
+    text_color: str
+    background_color: str
+    stylesheet: str
+    stylesheet_hash: str
+    stylesheet_url: str
+
+    @classmethod
+    def from_model(cls, palette):
+        if not palette.stylesheet_hash:
+            palette.compile_stylesheet()
+        return cls(
+            pk=palette.pk,
+            name=palette.name,
+            primary_color=palette.primary_color,
+            secondary_color=palette.secondary_color,
+            accent_color=palette.accent_color,
+            text_color=palette.text_color,
+            background_color=palette.background_color,
+            stylesheet=palette.stylesheet,
+            stylesheet_hash=palette.stylesheet_hash,
+            stylesheet_url=reverse(
+                'palette_stylesheet', args=[palette.stylesheet_hash]
+            ),
+        )
+
+
+@dataclass(frozen=True)
+class SiteSettingsSnapshot:
+    """Copia in sola lettura di ``SiteSettings``."""
+    site_title: str
+    site_description: str
+    author_name: str
+    author_bio: str
+    author_image: Optional[ResponsiveImage]
+    email: str
+    phone: str
+    location: str
+    social_links: MappingProxyType
+
+    def __str__(self):
+        return self.site_title
+
+    @classmethod
+    def from_model(cls, settings):
+        return cls(
+            site_title=settings.site_title,
+            site_description=settings.site_description,
+            author_name=settings.author_name,
+            author_bio=settings.author_bio,
+            author_image=describe(
+                settings.author_image, settings.author_image_variants
+            ),
+            email=settings.email,
+            phone=settings.phone,
+            location=settings.location,
+            social_links=MappingProxyType(dict(settings.social_links or {})),
+        )
+
+
+@dataclass(frozen=True)
+class SiteSnapshot:
+    settings: SiteSettingsSnapshot
+    palette: Optional[PaletteSnapshot]
+    # Icone delle skill non incluse negli asset generati: base.html carica
+    # anche Font Awesome completo
+    icon_fallback: bool = False
+
+
+SITE_SNAPSHOT_DEPENDENCIES = (
+    version_name(SiteSettings),
+    version_name(ColorPalette),
+    version_name(Skill),
+)
+
+
+def build_site_snapshot():
+    """Legge impostazioni, palette e icone dal database e ne crea lo snapshot."""
+    settings = SiteSettings.objects.filter(pk=1).first()
+    if settings is None:
+        # Nessuna impostazione salvata: usa i default senza scrivere
+        settings = SiteSettings(pk=1)
+
+    palette = ColorPalette.get_active()
+
+    return SiteSnapshot(
+        settings=SiteSettingsSnapshot.from_model(settings),
+        palette=PaletteSnapshot.from_model(palette) if palette else None,
+        icon_fallback=vendor.skill_icons_missing(),
+    )
+
+
+def get_site_snapshot():
+    """Restituisce lo snapshot corrente senza toccare il database."""
+    return get_snapshot('site', SITE_SNAPSHOT_DEPENDENCIES, build_site_snapshot)
+
+
+async def aget_site_snapshot(request=None):
+    """
+    Versione asincrona di ``get_site_snapshot``. Se viene passata la
+    richiesta, lo snapshot viene salvato su di essa e il context processor
+    lo riusa senza toccare cache o database durante il rendering.
+    """
+    snapshot = await aget_snapshot('site', SITE_SNAPSHOT_DEPENDENCIES, build_site_snapshot)
+    if request is not None:
+        request.site_snapshot = snapshot
+    return snapshot
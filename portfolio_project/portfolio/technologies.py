@@ -0,0 +1,31 @@
+"""
+Normalizzazione dei nomi delle tecnologie dei progetti.
+"""
+from django.utils.text import slugify
+
+
+# Simboli che slugify eliminerebbe rendendo uguali nomi diversi (C, C#, C++)
+_SLUG_REPLACEMENTS = (
+    ('#', ' sharp'),
+    ('+', ' plus'),
+)
+
+
+def parse_technologies(value):
+    """Divide la stringa separata da virgole, senza voci vuote o duplicate."""
+    names = []
+    seen = set()
+    for name in (value or '').split(','):
+        name = name.strip()
+        slug = technology_slug(name)
+        if name and slug and slug not in seen:
+            seen.add(slug)
+            names.append(name)
+    return names
+
+
+def technology_slug(name):
+    """Slug univoco di una tecnologia (es. 'C#' -> 'c-sharp')."""
+    for symbol, replacement in _SLUG_REPLACEMENTS:
+        name = name.replace(symbol, replacement)
+    return slugify(name)[:100]
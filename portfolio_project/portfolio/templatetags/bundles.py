@@ -0,0 +1,34 @@
+"""
+Tag per i bundle di CSS e JS generati da ``collectstatic``.
+
+    {% load bundles %}
+    {% bundle 'css/site.css' %}
+    {% vendor_built as self_hosted %}
+
+Senza DEBUG e dopo ``collectstatic`` produce un solo ``<link>`` o
+``<script>`` verso il bundle minificato con l'hash nel nome; altrimenti
+uno per ogni sorgente di ``STATIC_BUNDLES``. ``vendor_built`` dice se
+Bootstrap, icone e font generati da ``build_vendor_assets`` sono disponibili.
+"""
+from django import template
+from django.templatetags.static import static
+from django.utils.html import format_html_join
+
+from .. import vendor
+from ..assets import bundles_enabled, get_bundles
+
+
+register = template.Library()
+
+
+@register.simple_tag
+def bundle(name):
+    paths = [name] if bundles_enabled() else get_bundles()[name]
+    if name.endswith('.css'):
+        return format_html_join('\n', '<link rel="stylesheet" href="{}">', ((static(path),) for path in paths))
+    return format_html_join('\n', '<script src="{}"></script>', ((static(path),) for path in paths))
+
+
+@register.simple_tag
+def vendor_built():
+    return vendor.is_built()
@@ -0,0 +1,49 @@
+"""
+Tag per le immagini responsive.
+
+    {% load responsive_images %}
+    {% responsive_image project.image sizes="(min-width: 992px) 33vw, 100vw" alt=project.title class="card-img-top" %}
+
+Accetta un campo immagine (le varianti vengono lette da ``<campo>_variants``)
+oppure una ``ResponsiveImage`` già pronta, come quella degli snapshot.
+"""
+from django import template
+from django.db.models.fields.files import FieldFile
+from django.utils.html import format_html, format_html_join
+
+from ..images import describe, variants_field
+
+
+register = template.Library()
+
+
+@register.simple_tag
+def responsive_image(image, sizes='100vw', alt='', loading='lazy', **attrs):
+    if isinstance(image, FieldFile):
+        image = describe(image, getattr(image.instance, variants_field(image.field.name), None))
+    if not image:
+        return ''
+
+    img_attrs = [('src', image.src)]
+    if image.srcset:
+        img_attrs += [('srcset', image.srcset), ('sizes', sizes)]
+    if image.width and image.height:
+        img_attrs += [('width', image.width), ('height', image.height)]
+    img_attrs += [('alt', alt), ('loading', loading), ('decoding', 'async')]
+    img_attrs += [(name, value) for name, value in attrs.items() if value not in (None, '')]
+
+    img = format_html(
+        '<img{}>',
+        format_html_join('', ' {}="{}"', img_attrs),
+    )
+    if not image.sources:
+        return img
+    return format_html(
+        '<picture class="responsive-picture">{}{}</picture>',
+        format_html_join(
+            '',
+            '<source type="{}" srcset="{}" sizes="{}">',
+            ((mime, srcset, sizes) for mime, srcset in image.sources),
+        ),
+        img,
+    )
@@ -0,0 +1,50 @@
+"""
+Cache in memoria dei frammenti di ``base.html`` (head, navbar, footer).
+
+    {% load site_fragments %}
+    {% sitefragment active_nav %}...{% endsitefragment %}
+
+Il contenuto viene renderizzato una volta per ogni combinazione dei valori
+passati al tag e riusato finché lo snapshot del sito (impostazioni,
+palette e skill) resta lo stesso: salvare ``SiteSettings`` o cambiare palette
+crea un nuovo snapshot e i frammenti vengono rigenerati.
+
+La cache è legata al nodo del template, quindi si svuota anche quando il
+template viene ricaricato. Il frammento non deve usare dati della singola
+richiesta (utente, token CSRF, messaggi) se non passati come valori del tag.
+"""
+from django import template
+
+
+register = template.Library()
+
+
+class SiteFragmentNode(template.Node):
+    def __init__(self, nodelist, vary_on):
+        self.nodelist = nodelist
+        self.vary_on = vary_on
+        self.rendered = {}
+
+    def render(self, context):
+        snapshot = context.get('site_snapshot')
+        if snapshot is None:
+            # Template renderizzato senza il context processor
+            return self.nodelist.render(context)
+
+        key = tuple(value.resolve(context) for value in self.vary_on)
+        entry = self.rendered.get(key)
+        # L'entry tiene un riferimento allo snapshot: il confronto per
+        # identità non può confondere uno snapshot nuovo con uno liberato
+        if entry is not None and entry[0] is snapshot:
+            return entry[1]
+        html = self.nodelist.render(context)
+        self.rendered[key] = (snapshot, html)
+        return html
+
+
+@register.tag
+def sitefragment(parser, token):
+    vary_on = [parser.compile_filter(bit) for bit in token.split_contents()[1:]]
+    nodelist = parser.parse(('endsitefragment',))
+    parser.delete_first_token()
+    return SiteFragmentNode(nodelist, vary_on)
@@ -0,0 +1,1098 @@
+import importlib
+import io
+import json
+import os
+import shutil
+import tempfile
+from datetime import datetime, timedelta, timezone as dt_timezone
+from smtplib import SMTPException
+from unittest import mock
+
+from django.contrib.auth.models import User
+from django.conf import settings
+from django.core import mail
+from django.core.cache import cache
+from django.core.files.base import ContentFile
+from django.core.mail.backends.locmem import EmailBackend
+from django.core.management import call_command
+from django.db import IntegrityError, connection, transaction
+from django.template import Context, Template
+from django.test import AsyncClient, RequestFactory, SimpleTestCase, TestCase, override_settings
+from django.test.utils import CaptureQueriesContext
+from django.urls import clear_url_caches, reverse
+from django.utils import timezone
+from PIL import Image
+
+from . import (
+    archive, assets, async_views, backup, catalog, export, related, search, timing, urls, vendor, warmup,
+)
+from .cache import bump_version, clear_snapshots, get_snapshot, is_shared_cache
+from .benchmark.inbox import seed_messages
+from .benchmark.seed import seed
+from .models import (
+    ColorPalette, ContactMessage, EmailNotification, Project, ProjectTechnology, RelatedProject,
+    SiteSettings, Skill, Technology,
+)
+from .outbox import drain, queue_contact_notification, send_pending
+from .page_cache import get_stats
+from .query_audit import FULL_SCAN, TEMP_SORT, audit, plan_problems
+from .snapshots import get_site_snapshot
+from .throttling import check_contact_rate, client_ip
+
+
+class QueryPlanAuditTests(TestCase):
+    @classmethod
+    def setUpTestData(cls):
+        seed(projects=60)
+        # Con una sola palette le statistiche di ANALYZE portano SQLite a
+        # leggere la tabella di una riga invece dell'indice parziale
+        for index in range(5):
+            ColorPalette.objects.create(name=f'Palette {index + 1}')
+        seed_messages(2000)
+
+    def test_audited_queries_have_no_problems(self):
+        for query, plan, problems in audit():
+            with self.subTest(query=query.name):
+                self.assertEqual(problems, [], '\n'.join(plan))
+
+    def test_sqlite_full_scan_and_temp_sort(self):
+        plan = [
+            'SCAN portfolio_project',
+            'USE TEMP B-TREE FOR ORDER BY',
+        ]
+        self.assertEqual(
+            [problem for problem, line in plan_problems(plan, 'sqlite')],
+            [FULL_SCAN, TEMP_SORT],
+        )
+
+    def test_sqlite_index_plan(self):
+        plan = [
+            'SCAN portfolio_project USING INDEX project_featured_idx',
+            'SEARCH portfolio_relatedproject USING INDEX related_rank_idx (project_id=?)',
+        ]
+        self.assertEqual(plan_problems(plan, 'sqlite'), [])
+
+    def test_postgresql_seq_scan_and_sort(self):
+        plan = [
+            'Limit  (cost=10.00..10.02 rows=6 width=100)',
+            '  ->  Sort  (cost=10.00..10.50 rows=200 width=100)',
+            '        ->  Seq Scan on portfolio_project  (cost=0.00..8.00 rows=200 width=100)',
+        ]
+        self.assertEqual(
+            [problem for problem, line in plan_problems(plan, 'postgresql')],
+            [TEMP_SORT, FULL_SCAN],
+        )
+
+    def test_postgresql_index_plan(self):
+        plan = [
+            'Limit  (cost=0.15..1.20 rows=6 width=100)',
+            '  ->  Index Scan using project_featured_idx on portfolio_project  (cost=0.15..8.00 rows=40 width=100)',
+            '        Index Cond: (featured = true)',
+        ]
+        self.assertEqual(plan_problems(plan, 'postgresql'), [])
+
+
+class ImageVariantTests(TestCase):
+    def setUp(self):
+        self.media_root = tempfile.mkdtemp()
+        self.addCleanup(shutil.rmtree, self.media_root)
+        storages = override_settings(MEDIA_ROOT=self.media_root, STORAGES={
+            'default': {'BACKEND': 'django.core.files.storage.FileSystemStorage'},
+            'staticfiles': {'BACKEND': 'django.contrib.staticfiles.storage.StaticFilesStorage'},
+        })
+        storages.enable()
+        self.addCleanup(storages.disable)
+
+    def variant_files(self):
+        directory = os.path.join(self.media_root, 'projects', 'variants')
+        return sorted(os.listdir(directory)) if os.path.isdir(directory) else []
+
+    def save_image(self, project, name):
+        buffer = io.BytesIO()
+        Image.new('RGB', (700, 400), 'teal').save(buffer, 'PNG')
+        project.image.save(name, ContentFile(buffer.getvalue()), save=False)
+        with self.captureOnCommitCallbacks(execute=True):
+            project.save()
+
+    def test_replaced_image_removes_stored_variants(self):
+        project = Project(title='Variants', description='Test', technologies='Python')
+        self.save_image(project, 'first.png')
+        # Istanza con varianti in memoria non aggiornate, come da un form
+        project = Project.objects.get(pk=project.pk)
+        project.image_variants = {}
+        self.save_image(project, 'second.png')
+        self.assertTrue(self.variant_files())
+        self.assertTrue(all(name.startswith('second-') for name in self.variant_files()))
+
+    def test_cleared_image_and_deleted_project_remove_variants(self):
+        project = Project(title='Variants', description='Test', technologies='Python')
+        self.save_image(project, 'first.png')
+        project.image = None
+        with self.captureOnCommitCallbacks(execute=True):
+            project.save()
+        self.assertEqual(self.variant_files(), [])
+        self.assertEqual(Project.objects.get(pk=project.pk).image_variants, {})
+
+        self.save_image(project, 'second.png')
+        with self.captureOnCommitCallbacks(execute=True):
+            project.delete()
+        self.assertEqual(self.variant_files(), [])
+
+
+class FailingEmailBackend(EmailBackend):
+    def send_messages(self, messages):
+        raise SMTPException('server non disponibile')
+
+
+@override_settings(EMAIL_BACKEND='django.core.mail.backends.locmem.EmailBackend')
+class OutboxTests(TestCase):
+    @classmethod
+    def setUpTestData(cls):
+        SiteSettings.objects.create(email='owner@example.com')
+
+    def setUp(self):
+        # Limiti di frequenza, messaggi duplicati e snapshot del sito
+        cache.clear()
+
+    def post_contact(self, **data):
+        return self.client.post(reverse('contact'), {
+            'name': 'Ada',
+            'email': 'ada@example.com',
+            'subject': 'Collaborazione',
+            'message': 'Vorrei parlare di un progetto.',
+            **data,
+        })
+
+    def test_duplicate_contact_message_is_ignored(self):
+        for _ in range(2):
+            with self.captureOnCommitCallbacks(execute=True):
+                response = self.post_contact()
+            self.assertRedirects(response, reverse('contact_success'))
+        self.assertEqual(ContactMessage.objects.count(), 1)
+        self.assertEqual(EmailNotification.objects.count(), 1)
+
+    def test_failed_contact_message_can_be_sent_again(self):
+        with mock.patch('portfolio.views.queue_contact_notification', side_effect=RuntimeError):
+            with self.assertRaises(RuntimeError), self.captureOnCommitCallbacks(execute=True):
+                self.post_contact()
+        with self.captureOnCommitCallbacks(execute=True):
+            self.post_contact()
+        self.assertEqual(ContactMessage.objects.count(), 1)
+
+    def queue(self, count=1, recipient='owner@example.com', email='ada@example.com'):
+        return [
+            queue_contact_notification(
+                ContactMessage.objects.create(
+                    name='Ada', email=email, subject=f'Oggetto {index}',
+                    message='Vorrei parlare di un progetto.',
+                ),
+                recipient,
+            )
+            for index in range(count)
+        ]
+
+    def test_contact_queues_notification_without_sending(self):
+        response = self.post_contact()
+        self.assertRedirects(response, reverse('contact_success'))
+        notification = EmailNotification.objects.get()
+        self.assertEqual(notification.contact_message, ContactMessage.objects.get())
+        self.assertEqual(notification.recipient, 'owner@example.com')
+        self.assertEqual(notification.reply_to, 'ada@example.com')
+        self.assertEqual(notification.status, EmailNotification.STATUS_PENDING)
+        self.assertEqual(mail.outbox, [])
+
+    def test_contact_message_rolled_back_with_notification(self):
+        with mock.patch('portfolio.views.queue_contact_notification', side_effect=RuntimeError):
+            with self.assertRaises(RuntimeError):
+                self.post_contact()
+        self.assertFalse(ContactMessage.objects.exists())
+        self.assertFalse(EmailNotification.objects.exists())
+
+    def test_send_notifications_claims_and_sends(self):
+        self.queue(2)
+        call_command('send_notifications', stdout=io.StringIO())
+        self.assertEqual(len(mail.outbox), 2)
+        self.assertEqual(mail.outbox[0].to, ['owner@example.com'])
+        self.assertEqual(mail.outbox[0].reply_to, ['ada@example.com'])
+        for notification in EmailNotification.objects.all():
+            self.assertEqual(notification.status, EmailNotification.STATUS_SENT)
+            self.assertEqual(notification.attempts, 1)
+            self.assertIsNotNone(notification.sent_at)
+        # Le notifiche inviate non vengono più prese in carico
+        self.assertEqual(send_pending(), (0, 0))
+
+    def test_digest_groups_notifications_by_recipient(self):
+        self.queue(3)
+        self.assertEqual(send_pending(digest=True), (3, 0))
+        self.assertEqual(len(mail.outbox), 1)
+        self.assertEqual(mail.outbox[0].subject, '3 nuovi messaggi dal portfolio')
+        self.assertEqual(mail.outbox[0].reply_to, ['ada@example.com'])
+
+    def test_digest_reply_to_only_for_single_sender(self):
+        self.queue(1, recipient='other@example.com')
+        self.queue(1)
+        self.queue(1, email='grace@example.com')
+        self.assertEqual(send_pending(digest=True), (3, 0))
+        reply_to = {tuple(message.to): message.reply_to for message in mail.outbox}
+        self.assertEqual(reply_to[('other@example.com',)], ['ada@example.com'])
+        self.assertEqual(reply_to[('owner@example.com',)], [])
+
+    @override_settings(CRON_SECRET='segreto', OUTBOX_BATCH_SIZE=2)
+    def test_cron_route_drains_outbox(self):
+        self.queue(3)
+        url = reverse('cron_send_notifications')
+        self.assertEqual(self.client.get(url).status_code, 401)
+        self.assertEqual(self.client.get(url, HTTP_AUTHORIZATION='Bearer altro').status_code, 401)
+        response = self.client.get(url, HTTP_AUTHORIZATION='Bearer segreto')
+        self.assertEqual(response.json(), {'sent': 3, 'failed': 0})
+        self.assertIn('no-cache', response['Cache-Control'])
+        self.assertEqual(len(mail.outbox), 3)
+
+    def test_cron_route_needs_secret(self):
+        self.queue()
+        response = self.client.get(reverse('cron_send_notifications'), HTTP_AUTHORIZATION='Bearer ')
+        self.assertEqual(response.status_code, 404)
+        self.assertEqual(mail.outbox, [])
+
+    @override_settings(OUTBOX_BATCH_SIZE=1)
+    def test_drain_stops_at_time_budget(self):
+        self.queue(3)
+        self.assertEqual(drain(time_budget=0), (0, 0))
+        self.assertEqual(drain(), (3, 0))
+
+    @override_settings(OUTBOX_RETRY_DELAY=60, OUTBOX_MAX_ATTEMPTS=3)
+    def test_failed_sends_back_off_then_fail(self):
+        notification, = self.queue()
+        for attempts, delay in ((1, 60), (2, 120)):
+            started = timezone.now()
+            self.assertEqual(send_pending(connection=FailingEmailBackend()), (0, 1))
+            notification.refresh_from_db()
+            self.assertEqual(notification.status, EmailNotification.STATUS_PENDING)
+            self.assertEqual(notification.attempts, attempts)
+            self.assertIn('SMTPException', notification.last_error)
+            self.assertGreaterEqual(notification.next_attempt_at, started + timedelta(seconds=delay))
+            self.assertLess(notification.next_attempt_at, started + timedelta(seconds=delay + 5))
+            # Prima dell'attesa la notifica non viene ritentata
+            self.assertEqual(send_pending(connection=FailingEmailBackend()), (0, 0))
+            EmailNotification.objects.update(next_attempt_at=timezone.now())
+
+        self.assertEqual(send_pending(connection=FailingEmailBackend()), (0, 1))
+        notification.refresh_from_db()
+        self.assertEqual(notification.status, EmailNotification.STATUS_FAILED)
+        self.assertEqual(mail.outbox, [])
+
+
+class ContactThrottleTests(TestCase):
+    def setUp(self):
+        cache.clear()
+
+    def request(self, **headers):
+        return RequestFactory().post(reverse('contact'), REMOTE_ADDR='10.0.0.1', **headers)
+
+    def test_client_ip_sources(self):
+        request = self.request(
+            HTTP_X_FORWARDED_FOR='6.6.6.6, 1.2.3.4',
+            HTTP_X_VERCEL_FORWARDED_FOR='5.6.7.8',
+        )
+        self.assertEqual(client_ip(request), '10.0.0.1')
+        self.assertEqual(client_ip(request, proxy_count=1), '1.2.3.4')
+        self.assertEqual(client_ip(request, header='HTTP_X_VERCEL_FORWARDED_FOR'), '5.6.7.8')
+        # Senza l'header si usano le altre fonti
+        self.assertEqual(client_ip(self.request(), 1, 'HTTP_X_VERCEL_FORWARDED_FOR'), '10.0.0.1')
+
+    @override_settings(CONTACT_THROTTLE={
+        'ip_capacity': 1, 'ip_refill': 600, 'ip_header': 'HTTP_X_VERCEL_FORWARDED_FOR',
+    })
+    def test_ip_header_gives_each_client_a_bucket(self):
+        first = self.request(HTTP_X_VERCEL_FORWARDED_FOR='1.1.1.1')
+        self.assertEqual(check_contact_rate(first), 0)
+        self.assertGreater(check_contact_rate(first), 0)
+        self.assertEqual(check_contact_rate(self.request(HTTP_X_VERCEL_FORWARDED_FOR='2.2.2.2')), 0)
+
+
+class RelatedProjectTests(TestCase):
+    def rows(self):
+        return sorted(RelatedProject.objects.values_list('project_id', 'related_id', 'score'))
+
+    def assertMatchesRebuild(self):
+        updated = self.rows()
+        related.rebuild_all(Project, ProjectTechnology, RelatedProject)
+        self.assertEqual(updated, self.rows())
+
+    def test_updates_match_full_rebuild(self):
+        seed(projects=40)
+        projects = list(Project.objects.order_by('pk')[:3])
+        with self.captureOnCommitCallbacks(execute=True):
+            projects[0].technologies = 'Cobol, Fortran'
+            projects[0].save()
+        self.assertMatchesRebuild()
+
+        with self.captureOnCommitCallbacks(execute=True):
+            projects[1].category = projects[2].category
+            projects[1].technologies = projects[2].technologies
+            projects[1].save()
+        self.assertMatchesRebuild()
+
+        with self.captureOnCommitCallbacks(execute=True):
+            Project.objects.create(title='Nuovo', description='Test', technologies='Cobol')
+        self.assertMatchesRebuild()
+
+        with self.captureOnCommitCallbacks(execute=True):
+            projects[2].delete()
+        self.assertMatchesRebuild()
+
+    def test_unrelated_project_enters_lists_by_recency(self):
+        for index in range(8):
+            Project.objects.create(title=f'Web {index}', description='Test', category='web', technologies='Python')
+        isolated = Project.objects.create(title='Mobile', description='Test', category='mobile', technologies='Kotlin')
+        Project.objects.update(created_at=timezone.now() - timedelta(days=1000))
+        related.rebuild_all(Project, ProjectTechnology, RelatedProject)
+
+        # Nessuna categoria o tecnologia in comune: conta solo la data
+        with self.captureOnCommitCallbacks(execute=True):
+            recent = Project.objects.create(
+                title='Full stack', description='Test', category='fullstack', technologies='Rust',
+            )
+        self.assertIn(recent.pk, RelatedProject.objects.filter(project=isolated).values_list('related_id', flat=True))
+        self.assertMatchesRebuild()
+
+    def test_old_project_reads_only_reachable_features(self):
+        for index in range(8):
+            Project.objects.create(title=f'Web {index}', description='Test', category='web', technologies='Python')
+            Project.objects.create(title=f'App {index}', description='Test', category='mobile', technologies='Kotlin')
+        Project.objects.filter(category='web').update(created_at=timezone.now() - timedelta(days=1000))
+        for days, app in enumerate(Project.objects.filter(category='mobile')):
+            Project.objects.filter(pk=app.pk).update(created_at=timezone.now() - timedelta(days=days))
+        related.rebuild_all(Project, ProjectTechnology, RelatedProject)
+        web = Project.objects.filter(category='web').first()
+        mobile = set(Project.objects.filter(category='mobile').values_list('pk', flat=True))
+
+        loaded = set()
+        load_features = related.load_features
+
+        def record(*args, **kwargs):
+            features = load_features(*args, **kwargs)
+            loaded.update(features)
+            return features
+
+        with mock.patch.object(related, 'load_features', side_effect=record):
+            with self.captureOnCommitCallbacks(execute=True):
+                web.technologies = 'Python, Django'
+                web.save()
+        # Solo i progetti più recenti, per il bonus della data
+        self.assertEqual(len(loaded & mobile), related.RELATED_PROJECTS_LIMIT + 1)
+        self.assertMatchesRebuild()
+
+
+class ProjectSearchTests(TestCase):
+    @classmethod
+    def setUpTestData(cls):
+        # Oltre MAX_RESULTS progetti più rilevanti in un'altra categoria
+        Project.objects.bulk_create([
+            Project(
+                title=f'Python {index}', slug=f'python-{index}', category='web',
+                description='Python', short_description='Python', technologies='Python',
+            )
+            for index in range(search.MAX_RESULTS + 10)
+        ] + [
+            Project(
+                title=f'App {index}', slug=f'app-{index}', category='mobile',
+                description='Scritta in python', short_description='App', technologies='Kotlin',
+            )
+            for index in range(3)
+        ])
+        search.rebuild_index()
+
+    def test_filters_apply_before_result_limit(self):
+        found = search.search_projects(Project.objects.filter(category='mobile'), 'python')
+        self.assertEqual(sorted(project.slug for project in found), ['app-0', 'app-1', 'app-2'])
+
+    def test_empty_queryset_finds_nothing(self):
+        self.assertEqual(list(search.search_projects(Project.objects.none(), 'python')), [])
+
+    def test_admin_search_is_not_limited_and_keeps_filters(self):
+        admin_user = User.objects.create_superuser('admin', 'admin@example.com', 'password')
+        self.client.force_login(admin_user)
+        url = reverse('admin:portfolio_project_changelist')
+        response = self.client.get(url, {'q': 'python'})
+        self.assertEqual(response.context['cl'].result_count, search.MAX_RESULTS + 13)
+        response = self.client.get(url, {'q': 'python', 'category__exact': 'mobile'})
+        self.assertEqual(response.context['cl'].result_count, 3)
+
+
+class CacheVersionTests(TestCase):
+    def setUp(self):
+        cache.clear()
+        clear_snapshots()
+        self.builds = 0
+
+    def build(self):
+        self.builds += 1
+        return ('snapshot', self.builds)
+
+    def test_default_cache_is_shared(self):
+        self.assertTrue(is_shared_cache())
+
+    def test_snapshot_rebuilt_only_after_bump(self):
+        self.assertEqual(get_snapshot('test', ('test.a', 'test.b'), self.build), ('snapshot', 1))
+        self.assertEqual(get_snapshot('test', ('test.a', 'test.b'), self.build), ('snapshot', 1))
+        bump_version('test.b')
+        self.assertEqual(get_snapshot('test', ('test.a', 'test.b'), self.build), ('snapshot', 2))
+
+    def test_shared_snapshot_reused_by_other_workers(self):
+        get_snapshot('test', ('test.a',), self.build, shared=True)
+        # Un altro worker ha la memoria di processo vuota
+        clear_snapshots()
+        self.assertEqual(get_snapshot('test', ('test.a',), self.build, shared=True), ('snapshot', 1))
+        self.assertEqual(self.builds, 1)
+
+    @override_settings(SNAPSHOT_MAX_AGE=0)
+    def test_snapshot_expires_without_bump(self):
+        get_snapshot('test', ('test.a',), self.build)
+        self.assertEqual(get_snapshot('test', ('test.a',), self.build), ('snapshot', 2))
+
+    def test_site_settings_save_invalidates_site_snapshot(self):
+        self.assertEqual(get_site_snapshot().settings.site_title, SiteSettings().site_title)
+        with self.captureOnCommitCallbacks(execute=True):
+            SiteSettings.objects.create(site_title='Nuovo titolo')
+        self.assertEqual(get_site_snapshot().settings.site_title, 'Nuovo titolo')
+
+
+LOCMEM_CACHES = {'default': {'BACKEND': 'django.core.cache.backends.locmem.LocMemCache', 'LOCATION': 'tests'}}
+
+
+class PageCacheTests(TestCase):
+    def setUp(self):
+        cache.clear()
+        clear_snapshots()
+
+    def test_pages_cached_and_counted(self):
+        self.assertEqual(self.client.get(reverse('about'))['X-Page-Cache'], 'MISS')
+        self.assertEqual(self.client.get(reverse('about'))['X-Page-Cache'], 'HIT')
+        self.assertEqual(get_stats()['about'], {'hit': 1, 'miss': 1})
+
+    def test_model_change_invalidates_page(self):
+        self.client.get(reverse('about'))
+        with self.captureOnCommitCallbacks(execute=True):
+            SiteSettings.objects.create(site_title='Nuovo titolo')
+        response = self.client.get(reverse('about'))
+        self.assertEqual(response['X-Page-Cache'], 'MISS')
+        self.assertContains(response, 'Nuovo titolo')
+
+    @override_settings(CACHES=LOCMEM_CACHES)
+    def test_local_cache_disables_page_cache_and_stats(self):
+        for _ in range(2):
+            self.assertNotIn('X-Page-Cache', self.client.get(reverse('about')))
+        self.assertEqual(get_stats()['about'], {'hit': 0, 'miss': 0})
+
+
+class VendorIconFallbackTests(TestCase):
+    FONT_AWESOME_CDN = 'font-awesome/6.5.1/css/all.min.css'
+
+    def setUp(self):
+        cache.clear()
+        clear_snapshots()
+        root = tempfile.mkdtemp()
+        self.addCleanup(shutil.rmtree, root)
+        with open(os.path.join(root, 'vendor.css'), 'w') as handle:
+            handle.write('.fas{font-weight:900}.fa-code:before{content:"\\f121"}')
+        with open(os.path.join(root, vendor.MANIFEST_NAME), 'w') as handle:
+            json.dump({'classes': ['fa-code', 'fas'], 'icons': ['code']}, handle)
+        patcher = mock.patch.object(vendor, 'vendor_root', return_value=vendor.Path(root))
+        patcher.start()
+        self.addCleanup(patcher.stop)
+
+    def test_included_icons_use_subset_only(self):
+        Skill.objects.create(name='Python', icon='fas fa-code')
+        self.assertFalse(vendor.skill_icons_missing())
+        self.assertNotContains(self.client.get(reverse('about')), self.FONT_AWESOME_CDN)
+
+    def test_new_icon_adds_full_font_awesome(self):
+        self.client.get(reverse('about'))
+        with self.captureOnCommitCallbacks(execute=True):
+            Skill.objects.create(name='Rust', icon='fab fa-rust')
+        self.assertEqual(vendor.missing_classes('fab fa-rust'), ['fab', 'fa-rust'])
+        self.assertContains(self.client.get(reverse('about')), self.FONT_AWESOME_CDN)
+
+
+class VendorSubsetTests(SimpleTestCase):
+    ICONS_CSS = (
+        '@charset "UTF-8";'
+        '.fa-code:before{content:"\\f121"}'
+        '.fa-rust:before{content:"\\e07a"}'
+        '.fa-star,.fa-star:before{--fa:"\\f005"}'
+        '.fa-spin{animation:fa-spin 2s infinite linear}'
+        '@font-face{font-family:"Font Awesome 6 Free";font-weight:900;'
+        'src:url(../webfonts/fa-solid-900.woff2) format("woff2"),url(../webfonts/fa-solid-900.ttf) format("truetype")}'
+        '@font-face{font-family:"FontAwesome";src:url(../webfonts/fa-v4compatibility.woff2) format("woff2")}'
+    )
+
+    def test_purge_keeps_only_used_selectors(self):
+        css = (
+            '.btn{padding:1px}.btn-primary,.btn-danger{color:red}'
+            '.card:not(.show){opacity:0}.nav .active{color:blue}'
+            '@font-face{font-family:x}'
+            '@media (min-width:768px){.col-md-6{width:50%}.col-md-3{width:25%}}'
+            '@media print{.d-print-none{display:none}}'
+            'a[href^=".pdf"]{color:green}'
+        )
+        purged = vendor.purge_css(css, {'btn', 'btn-primary', 'card', 'col-md-6'})
+        self.assertEqual(purged, (
+            '.btn{padding:1px}.btn-primary{color:red}.card:not(.show){opacity:0}'
+            '@font-face{font-family:x}@media (min-width:768px){.col-md-6{width:50%}}'
+            'a[href^=".pdf"]{color:green}'
+        ))
+
+    def test_split_rules_ignores_braces_in_strings(self):
+        css = '@charset "UTF-8";.a:after{content:"}"}.b{}'
+        self.assertEqual(
+            vendor.split_rules(css),
+            [('@charset "UTF-8"', None), ('.a:after', 'content:"}"'), ('.b', '')],
+        )
+
+    def test_subset_keeps_selected_icons_and_codepoints(self):
+        css, codepoints, included = vendor.subset_icon_css(self.ICONS_CSS, {'code', 'star'})
+        self.assertEqual(included, {'code', 'star'})
+        self.assertEqual(codepoints, {0xf121, 0xf005})
+        self.assertIn('.fa-code:before{', css)
+        self.assertIn('.fa-star,.fa-star:before{', css)
+        self.assertNotIn('fa-rust', css)
+        # Le regole che non sono solo icone restano, come @charset
+        self.assertIn('.fa-spin{', css)
+        self.assertTrue(css.startswith('@charset "UTF-8";'))
+
+    def test_subset_rewrites_font_face_to_generated_woff2(self):
+        css, _, _ = vendor.subset_icon_css(self.ICONS_CSS, set())
+        self.assertIn('src:url("fonts/fa-solid-900.woff2") format("woff2")}', css)
+        self.assertNotIn('truetype', css)
+        self.assertNotIn('fa-v4compatibility', css)
+
+    def test_icon_names_strip_prefix(self):
+        self.assertEqual(vendor.icon_names({'fas', 'fa-code', 'fa-brands', 'btn'}), {'code', 'brands'})
+
+
+class PaletteStylesheetTests(TestCase):
+    def setUp(self):
+        cache.clear()
+        clear_snapshots()
+
+    def test_hash_follows_colors(self):
+        palette = ColorPalette.objects.create(name='Blu', primary_color='#0000ff')
+        self.assertIn('--primary-color:#0000ff;', palette.stylesheet)
+        digest = palette.stylesheet_hash
+        self.assertEqual(len(digest), 16)
+        palette.save()
+        self.assertEqual(palette.stylesheet_hash, digest)
+        palette.primary_color = '#ff0000'
+        palette.save(update_fields=['primary_color'])
+        palette.refresh_from_db()
+        self.assertNotEqual(palette.stylesheet_hash, digest)
+        self.assertIn('--primary-color:#ff0000;', palette.stylesheet)
+
+    def test_stylesheet_is_immutable_and_addressed_by_hash(self):
+        palette = ColorPalette.objects.create(name='Blu', is_active=True)
+        other = ColorPalette.objects.create(name='Rosso', primary_color='#ff0000')
+        for item in (palette, other):
+            response = self.client.get(reverse('palette_stylesheet', args=[item.stylesheet_hash]))
+            self.assertEqual(response.status_code, 200)
+            self.assertEqual(response.content.decode(), item.stylesheet)
+            self.assertIn('immutable', response['Cache-Control'])
+        self.assertEqual(
+            self.client.get(reverse('palette_stylesheet', args=['0' * 16])).status_code, 404
+        )
+        self.assertContains(
+            self.client.get(reverse('about')),
+            reverse('palette_stylesheet', args=[palette.stylesheet_hash]),
+        )
+
+
+class ApiCachingTests(TestCase):
+    def setUp(self):
+        cache.clear()
+        clear_snapshots()
+
+    def test_etag_and_not_modified(self):
+        url = reverse('api_skills')
+        response = self.client.get(url)
+        self.assertEqual(response.status_code, 200)
+        self.assertIn('max-age=300', response['Cache-Control'])
+        etag = response['ETag']
+
+        not_modified = self.client.get(url, HTTP_IF_NONE_MATCH=etag)
+        self.assertEqual(not_modified.status_code, 304)
+        self.assertIn('max-age=300', not_modified['Cache-Control'])
+
+        with self.captureOnCommitCallbacks(execute=True):
+            Skill.objects.create(name='Go', icon='fab fa-golang')
+        response = self.client.get(url, HTTP_IF_NONE_MATCH=etag)
+        self.assertEqual(response.status_code, 200)
+        self.assertNotEqual(response['ETag'], etag)
+        self.assertEqual([skill['name'] for skill in response.json()['skills']], ['Go'])
+
+    def test_not_modified_skips_the_view(self):
+        url = reverse('api_palette')
+        etag = self.client.get(url)['ETag']
+        clear_snapshots()
+        # Solo la lettura della versione dalla cache, nessuna query ai modelli
+        with CaptureQueriesContext(connection) as queries:
+            self.assertEqual(self.client.get(url, HTTP_IF_NONE_MATCH=etag).status_code, 304)
+        self.assertEqual(
+            [query['sql'] for query in queries if 'portfolio_cache' not in query['sql']], []
+        )
+
+
+class SkillCatalogTests(TestCase):
+    def setUp(self):
+        cache.clear()
+        clear_snapshots()
+        Skill.objects.create(name='Django', category='backend', proficiency=90, order=2)
+        Skill.objects.create(name='Python', category='backend', proficiency=95, order=1)
+        Skill.objects.create(name='Docker', category='devops', proficiency=70)
+
+    def test_groups_in_display_order(self):
+        skill_catalog = catalog.get_skill_catalog()
+        self.assertEqual([group.category for group in skill_catalog], ['backend', 'devops'])
+        self.assertEqual([skill.name for skill in skill_catalog['backend'].skills], ['Python', 'Django'])
+        self.assertEqual(skill_catalog['devops'].icon, catalog.CATEGORY_ICONS['devops'])
+        self.assertEqual(len(skill_catalog), 3)
+        self.assertEqual(
+            [skill['name'] for skill in json.loads(skill_catalog.api_json)['skills']],
+            ['Python', 'Django', 'Docker'],
+        )
+
+    def test_pages_share_one_build_until_skills_change(self):
+        with mock.patch.object(catalog, 'build_skill_catalog', wraps=catalog.build_skill_catalog) as build:
+            for name in ('home', 'about', 'api_skills'):
+                self.assertEqual(self.client.get(reverse(name)).status_code, 200)
+            self.assertEqual(build.call_count, 1)
+
+            with self.captureOnCommitCallbacks(execute=True):
+                Skill.objects.create(name='Rust', category='backend', proficiency=50)
+            response = self.client.get(reverse('api_skills'))
+            self.assertEqual(build.call_count, 2)
+        self.assertIn('Rust', [skill['name'] for skill in response.json()['skills']])
+
+
+class StaticExportTests(TestCase):
+    def setUp(self):
+        cache.clear()
+        clear_snapshots()
+        self.output = tempfile.mkdtemp()
+        self.addCleanup(shutil.rmtree, self.output)
+        with self.captureOnCommitCallbacks(execute=True):
+            for index in range(2):
+                Project.objects.create(
+                    title=f'Progetto {index}', slug=f'progetto-{index}', description='Test',
+                    category='web', technologies='Python',
+                )
+
+    def test_output_filename(self):
+        self.assertEqual(export.output_filename('/about/'), 'about/index.html')
+        self.assertEqual(
+            export.output_filename('/projects/', (('page', '2'), ('category', 'web'))),
+            'projects/_query/category-web.page-2/index.html',
+        )
+        self.assertEqual(export.output_filename('/api/skills/', index='index.json'), 'api/skills/index.json')
+
+    def test_reexport_writes_only_changes_and_removes_stale_pages(self):
+        first = export.export_pages(self.output, export.public_pages())
+        self.assertEqual(first['unchanged'], [])
+        self.assertIn('projects/progetto-1/index.html', first['written'])
+        self.assertIn('404.html', first['written'])
+
+        second = export.export_pages(self.output, export.public_pages())
+        self.assertEqual(second['written'], [])
+        self.assertEqual(sorted(second['unchanged']), sorted(first['written']))
+
+        with self.captureOnCommitCallbacks(execute=True):
+            Project.objects.get(slug='progetto-1').delete()
+        third = export.export_pages(self.output, export.public_pages())
+        self.assertEqual(third['removed'], ['projects/progetto-1/index.html'])
+        self.assertIn('api/projects/index.json', third['written'])
+        self.assertFalse(os.path.exists(os.path.join(self.output, 'projects', 'progetto-1', 'index.html')))
+        self.assertNotIn('projects/progetto-1/index.html', export.load_manifest(self.output))
+
+    def test_unexpected_status_stops_export(self):
+        page = export.ExportedPage('/projects/assente/', (), 'assente/index.html')
+        with self.assertRaises(RuntimeError):
+            export.export_pages(self.output, [page])
+
+
+class AsyncViewTests(TestCase):
+    @classmethod
+    def setUpTestData(cls):
+        SiteSettings.objects.create(email='owner@example.com')
+        seed(projects=12)
+        cls.project = Project.objects.order_by('pk').first()
+
+    def setUp(self):
+        cache.clear()
+        clear_snapshots()
+        # Gli URL scelgono le view all'import, come in asgi.py
+        with self.settings(ASYNC_VIEWS=True):
+            self.reload_urls()
+        self.addCleanup(self.reload_urls)
+
+    def reload_urls(self):
+        from portfolio_project import urls as project_urls
+
+        importlib.reload(urls)
+        importlib.reload(project_urls)
+        clear_url_caches()
+
+    async def test_public_pages(self):
+        self.assertIs(urls.public_views, async_views)
+        client = AsyncClient()
+        for url in (
+            reverse('home'),
+            reverse('projects'),
+            reverse('projects') + '?category=web&page=2',
+            reverse('project_detail', args=[self.project.slug]),
+            reverse('about'),
+            reverse('contact'),
+        ):
+            with self.subTest(url=url):
+                response = await client.get(url)
+                self.assertEqual(response.status_code, 200)
+                self.assertContains(response, 'palette-')
+        response = await client.get(reverse('project_detail', args=['assente']))
+        self.assertEqual(response.status_code, 404)
+
+    async def test_api_etag(self):
+        client = AsyncClient()
+        response = await client.get(reverse('api_projects'))
+        self.assertEqual(response.status_code, 200)
+        self.assertEqual(len(response.json()['results']), 9)
+        self.assertIsNotNone(response.json()['next'])
+        response = await client.get(reverse('api_projects'), headers={'If-None-Match': response['ETag']})
+        self.assertEqual(response.status_code, 304)
+        response = await client.get(reverse('api_project_search'), {'q': self.project.title.split()[0]})
+        self.assertEqual(response.status_code, 200)
+
+    async def test_contact_queues_notification(self):
+        response = await AsyncClient().post(reverse('contact'), {
+            'name': 'Ada',
+            'email': 'ada@example.com',
+            'subject': 'Collaborazione',
+            'message': 'Vorrei parlare di un progetto.',
+        })
+        self.assertRedirects(response, reverse('contact_success'), fetch_redirect_response=False)
+        self.assertEqual(await EmailNotification.objects.acount(), 1)
+
+
+@override_settings(SERVER_TIMING={'enabled': True, 'sample_rate': 1.0, 'header': True, 'log': True})
+class ServerTimingTests(TestCase):
+    def setUp(self):
+        cache.clear()
+        clear_snapshots()
+
+    def test_header_and_log(self):
+        with self.assertLogs('portfolio.timing', 'INFO') as logs:
+            response = self.client.get(reverse('about'))
+        header = response['Server-Timing']
+        self.assertEqual(
+            [entry.split(';')[0] for entry in header.split(', ')],
+            ['sql', 'ctx', 'tpl', 'view', 'total'],
+        )
+        self.assertRegex(header, r'sql;dur=[0-9.]+;desc="[1-9][0-9]* query"')
+        self.assertIn('about.html', header)
+        record, = logs.records
+        self.assertEqual(record.server_timing['path'], reverse('about'))
+        self.assertEqual(record.server_timing['status'], 200)
+
+    @override_settings(SERVER_TIMING={'enabled': True, 'sample_rate': 0.0})
+    def test_unsampled_requests_are_not_measured(self):
+        self.assertNotIn('Server-Timing', self.client.get(reverse('about')))
+
+    @override_settings(SERVER_TIMING={'enabled': False})
+    def test_disabled_middleware_is_not_loaded(self):
+        self.assertNotIn('Server-Timing', self.client.get(reverse('about')))
+
+    def test_header_format(self):
+        measure = timing.RequestTiming()
+        measure.queries, measure.sql, measure.total = 2, 0.0015, 0.01
+        measure.template_names = ['pagina "x".html']
+        self.assertEqual(
+            measure.header(),
+            'sql;dur=1.5;desc="2 query", ctx;dur=0.0;desc="site_settings", '
+            'tpl;dur=0.0;desc="pagina \'x\'.html", view;dur=0.0, total;dur=10.0',
+        )
+
+
+class MessageArchiveTests(TestCase):
+    def setUp(self):
+        self.root = tempfile.mkdtemp()
+        self.addCleanup(shutil.rmtree, self.root)
+        self.dates = [
+            datetime(2024, 1, 10, 12, tzinfo=dt_timezone.utc),
+            datetime(2024, 1, 31, 23, 30, tzinfo=dt_timezone.utc),
+            datetime(2024, 2, 5, 8, tzinfo=dt_timezone.utc),
+            datetime(2024, 3, 1, 9, tzinfo=dt_timezone.utc),
+        ]
+        for index, created_at in enumerate(self.dates):
+            message = ContactMessage.objects.create(
+                name=f'Mittente {index}', email=f'm{index}@example.com', subject='Preventivo',
+                message=f'Testo numero {index}', is_read=index != 3,
+            )
+            ContactMessage.objects.filter(pk=message.pk).update(created_at=created_at)
+
+    def archive(self, **kwargs):
+        return archive.archive_messages(
+            cutoff=datetime(2024, 4, 1, tzinfo=dt_timezone.utc), root=self.root, batch_size=2, **kwargs
+        )
+
+    def test_dry_run_keeps_messages(self):
+        self.assertEqual(self.archive(dry_run=True), 3)
+        self.assertEqual(ContactMessage.objects.count(), 4)
+        self.assertEqual(list(archive.read_archive(root=self.root)), [])
+
+    def test_archive_read_and_restore_round_trip(self):
+        self.assertEqual(self.archive(), 3)
+        # Il messaggio non letto resta nel database
+        self.assertEqual(list(ContactMessage.objects.values_list('is_read', flat=True)), [False])
+        self.assertTrue(os.path.exists(os.path.join(self.root, '2024', '2024-01.ndjson.gz')))
+        self.assertTrue(os.path.exists(os.path.join(self.root, '2024', '2024-02.ndjson.gz')))
+
+        rows = list(archive.read_archive(root=self.root))
+        self.assertEqual([row['created_at'] for row in rows], self.dates[:3])
+        february = list(archive.read_archive(
+            datetime(2024, 2, 1, tzinfo=dt_timezone.utc), datetime(2024, 3, 1, tzinfo=dt_timezone.utc),
+            root=self.root,
+        ))
+        self.assertEqual([row['name'] for row in february], ['Mittente 2'])
+        self.assertEqual(
+            [row['name'] for row in archive.search_archive('numero 1', root=self.root)], ['Mittente 1']
+        )
+
+        self.assertEqual(archive.restore_messages(rows), 3)
+        self.assertEqual(archive.restore_messages(rows), 0)
+        restored = ContactMessage.objects.filter(is_read=True).order_by('created_at')
+        self.assertEqual([message.created_at for message in restored], self.dates[:3])
+        self.assertEqual(restored[0].message, 'Testo numero 0')
+
+
+class BackupRestoreTests(TestCase):
+    def setUp(self):
+        cache.clear()
+        clear_snapshots()
+        directory = tempfile.mkdtemp()
+        self.addCleanup(shutil.rmtree, directory)
+        self.path = os.path.join(directory, 'backup.ndjson.gz')
+
+    def snapshot(self):
+        return {
+            'palettes': list(ColorPalette.objects.order_by('pk').values_list('pk', 'name', 'is_active', 'stylesheet_hash')),
+            'projects': list(Project.objects.order_by('pk').values_list('pk', 'slug', 'created_at')),
+            'technologies': sorted(ProjectTechnology.objects.values_list('project_id', 'technology__slug', 'position')),
+            'related': sorted(RelatedProject.objects.values_list('project_id', 'related_id')),
+            'skills': list(Skill.objects.order_by('pk').values_list('pk', 'name')),
+            'messages': list(ContactMessage.objects.order_by('pk').values_list('pk', 'subject', 'created_at')),
+            'notifications': list(EmailNotification.objects.order_by('pk').values_list('pk', 'contact_message_id')),
+            'settings': list(SiteSettings.objects.values_list('pk', 'email')),
+        }
+
+    def test_backup_and_restore_round_trip(self):
+        SiteSettings.objects.create(email='owner@example.com')
+        ColorPalette.objects.create(name='Blu')
+        ColorPalette.objects.create(name='Rosso', primary_color='#ff0000', is_active=True)
+        seed(projects=12)
+        Skill.objects.create(name='Python', category='backend', proficiency=90)
+        message = ContactMessage.objects.create(name='Ada', email='ada@example.com', subject='Ciao', message='Test')
+        ContactMessage.objects.filter(pk=message.pk).update(created_at=timezone.now() - timedelta(days=400))
+        queue_contact_notification(message, 'owner@example.com')
+        expected = self.snapshot()
+        active = ColorPalette.get_active().pk
+
+        saved = backup.backup(self.path, batch_size=5)
+        self.assertEqual(saved.counts['portfolio.Project'], 12)
+        for model in backup.BACKUP_MODELS:
+            model._base_manager.all().delete()
+        Technology.objects.all().delete()
+
+        with self.captureOnCommitCallbacks(execute=True):
+            report = backup.restore(self.path, batch_size=5)
+        self.assertEqual(report.counts, saved.counts)
+        self.assertEqual(self.snapshot(), expected)
+        self.assertEqual(ColorPalette.get_active().pk, active)
+        found = search.ranked_project_ids(Project.objects.order_by('pk').first().title)
+        self.assertIn(Project.objects.order_by('pk').first().pk, [pk for pk, rank in found])
+        # Le sequenze ripartono dopo gli id ripristinati
+        self.assertGreater(Skill.objects.create(name='Go', category='backend', proficiency=50).pk, expected['skills'][-1][0])
+
+    def test_restore_dumpdata_file(self):
+        path = os.path.join(settings.BASE_DIR, 'data_backup.json')
+        with self.captureOnCommitCallbacks(execute=True):
+            report = backup.restore(path)
+        with open(path, encoding='utf-8') as handle:
+            self.assertEqual(report.total, len(json.load(handle)))
+        self.assertEqual(ColorPalette.objects.filter(is_active=True).count(), 1)
+        self.assertTrue(ProjectTechnology.objects.exists())
+
+
+class ActivePaletteTests(TestCase):
+    def setUp(self):
+        cache.clear()
+        clear_snapshots()
+        self.blue = ColorPalette.objects.create(name='Blu', is_active=True)
+        self.red = ColorPalette.objects.create(name='Rosso', primary_color='#ff0000')
+
+    def active(self):
+        return list(ColorPalette.objects.filter(is_active=True).values_list('name', flat=True))
+
+    def test_database_allows_one_active_palette(self):
+        with self.assertRaises(IntegrityError), transaction.atomic():
+            ColorPalette.objects.filter(pk=self.red.pk).update(is_active=True)
+        self.assertEqual(self.active(), ['Blu'])
+
+    def test_save_deactivates_the_previous_palette(self):
+        self.red.is_active = True
+        self.red.save()
+        self.assertEqual(self.active(), ['Rosso'])
+
+    def test_activate_switches_and_publishes_the_theme(self):
+        self.assertEqual(get_site_snapshot().palette.name, 'Blu')
+        with self.captureOnCommitCallbacks(execute=True):
+            self.red.activate()
+        self.assertEqual(self.active(), ['Rosso'])
+        self.assertEqual(ColorPalette.get_active(), self.red)
+        self.assertEqual(get_site_snapshot().palette.name, 'Rosso')
+        # Attivare la palette già attiva non cambia nulla
+        with self.captureOnCommitCallbacks(execute=True):
+            self.red.activate()
+        self.assertEqual(self.active(), ['Rosso'])
+
+    def test_restore_uses_legacy_current_palette(self):
+        directory = tempfile.mkdtemp()
+        self.addCleanup(shutil.rmtree, directory)
+        path = os.path.join(directory, 'legacy.json')
+        with open(path, 'w', encoding='utf-8') as handle:
+            json.dump([
+                {'model': 'portfolio.colorpalette', 'pk': 1, 'fields': {'name': 'Verde', 'is_active': True, 'created_at': '2024-01-01T00:00:00Z'}},
+                {'model': 'portfolio.colorpalette', 'pk': 2, 'fields': {'name': 'Viola', 'is_active': False, 'created_at': '2024-01-01T00:00:00Z'}},
+                {'model': 'portfolio.sitesettings', 'pk': 1, 'fields': {'email': 'owner@example.com', 'current_palette': 2}},
+            ], handle)
+        ColorPalette.objects.all().delete()
+        with self.captureOnCommitCallbacks(execute=True):
+            backup.restore(path)
+        self.assertEqual(self.active(), ['Viola'])
+        self.assertEqual(get_site_snapshot().palette.name, 'Viola')
+
+
+class SiteFragmentTests(TestCase):
+    def setUp(self):
+        cache.clear()
+        clear_snapshots()
+
+    def test_fragment_reused_per_snapshot_and_value(self):
+        template = Template(
+            '{% load site_fragments %}{% sitefragment nav %}{{ nav }}-{{ counter.next }}{% endsitefragment %}'
+        )
+        calls = iter(range(100))
+        counter = {'next': lambda: next(calls)}
+        first, second = object(), object()
+
+        def render(snapshot, nav):
+            return template.render(Context({'site_snapshot': snapshot, 'nav': nav, 'counter': counter}))
+
+        self.assertEqual(render(first, 'home'), 'home-0')
+        self.assertEqual(render(first, 'home'), 'home-0')
+        self.assertEqual(render(first, 'about'), 'about-1')
+        self.assertEqual(render(second, 'home'), 'home-2')
+        # Senza snapshot il frammento viene sempre renderizzato
+        self.assertEqual(render(None, 'home'), 'home-3')
+
+    def test_settings_change_refreshes_fragments(self):
+        # Il nome dell'autore compare nei frammenti di head, navbar e footer
+        settings_row = SiteSettings.objects.create(author_name='Ada Lovelace')
+        self.assertContains(self.client.get(reverse('about')), 'Ada Lovelace')
+        with self.captureOnCommitCallbacks(execute=True):
+            settings_row.author_name = 'Grace Hopper'
+            settings_row.save()
+        response = self.client.get(reverse('about'))
+        self.assertContains(response, 'Grace Hopper')
+        self.assertNotContains(response, 'Ada Lovelace')
+
+
+class ColdStartTests(TestCase):
+    def test_warm_up_runs_every_step(self):
+        output = io.StringIO()
+        with self.assertLogs('portfolio.warmup', 'INFO'):
+            call_command('warmup', stdout=output)
+        for step in ('urls', 'templates', 'snapshot', 'Warm-up completato.'):
+            self.assertIn(step, output.getvalue())
+        self.assertIn('base.html', warmup.public_templates())
+        self.assertFalse(any(name.startswith('admin/') for name in warmup.public_templates()))
+
+    def test_failed_step_is_logged_and_skipped(self):
+        steps = (('rotto', mock.Mock(side_effect=RuntimeError)), ('urls', warmup.warm_urls))
+        with mock.patch.object(warmup, 'STEPS', steps):
+            with self.assertLogs('portfolio.warmup', 'ERROR'):
+                self.assertEqual(list(warmup.warm_up()), ['urls'])
+            with self.assertRaises(RuntimeError):
+                warmup.warm_up(raise_errors=True)
+
+    def test_lazy_admin_urls_load_on_first_use(self):
+        from portfolio_project.urls import LazyAdminURLconf
+
+        lazy = LazyAdminURLconf()
+        with mock.patch('django.contrib.admin.autodiscover') as autodiscover:
+            autodiscover.assert_not_called()
+            self.assertTrue(lazy.urlpatterns)
+            self.assertTrue(lazy.urlpatterns)
+        autodiscover.assert_called_once_with()
+
+    def test_cors_allows_all_origins_by_default(self):
+        response = self.client.get(reverse('api_palette'), HTTP_ORIGIN='https://example.org')
+        self.assertEqual(response['Access-Control-Allow-Origin'], '*')
+
+
+class StaticBundleTests(TestCase):
+    def test_minify_css_keeps_strings(self):
+        css = '/* tema */\na > b ,\n.x {\n  color: red;\n  content: " /* no */ ";\n}\n.y::before { font-family: "Inter" , sans-serif; }\n'
+        self.assertEqual(
+            assets.minify_css(css),
+            'a>b,.x{color:red;content:" /* no */ "}.y::before{font-family:"Inter",sans-serif}',
+        )
+        # Lo spazio tra un valore e una stringa vicina resta
+        self.assertEqual(assets.minify_css('a { font: 12px "Inter"; }'), 'a{font:12px "Inter"}')
+
+    def test_minify_js_keeps_strings_regex_and_line_breaks(self):
+        js = '// commento\nvar url = "http://x"; /* blocco */\nvar re = /\\/+/g;\n\n    return total / 2 // fine\n'
+        self.assertEqual(
+            assets.minify_js(js),
+            'var url = "http://x";\nvar re = /\\/+/g;\nreturn total / 2',
+        )
+        with self.assertRaises(ValueError):
+            assets.minify_js('var s = "aperta\n";')
+
+    def test_build_bundle_separates_sources(self):
+        sources = {'a.js': 'uno()\n', 'b.js': '(due)()\n', 'a.css': 'a { x: 1 }', 'b.css': 'b { y: 2 }'}
+        self.assertEqual(assets.build_bundle('js/site.js', ['a.js', 'b.js'], sources.get), 'uno();\n(due)()\n')
+        self.assertEqual(assets.build_bundle('css/site.css', ['a.css', 'b.css'], sources.get), 'a{x:1}\nb{y:2}\n')
+
+    @override_settings(STATIC_BUNDLES={'css/site.css': ['css/theme.css'], 'js/site.js': ['js/script.js']})
+    def test_bundle_tag(self):
+        template = Template("{% load bundles %}{% bundle 'css/site.css' %}{% bundle 'js/site.js' %}")
+        html = template.render(Context())
+        self.assertIn('href="/static/css/theme.css"', html)
+        self.assertIn('src="/static/js/script.js"', html)
+        with mock.patch('portfolio.templatetags.bundles.bundles_enabled', return_value=True):
+            html = template.render(Context())
+        self.assertIn('href="/static/css/site.css"', html)
+        self.assertNotIn('theme.css', html)
+
+    def test_collectstatic_writes_hashed_compressed_bundles(self):
+        root = tempfile.mkdtemp()
+        self.addCleanup(shutil.rmtree, root)
+        with override_settings(STATIC_ROOT=root):
+            with self.assertLogs('portfolio.assets', 'INFO'):
+                call_command('collectstatic', interactive=False, verbosity=0)
+            with open(os.path.join(root, 'staticfiles.json'), encoding='utf-8') as handle:
+                hashed = json.load(handle)['paths']
+        for name in ('css/site.css', 'js/site.js'):
+            with self.subTest(bundle=name):
+                path = os.path.join(root, hashed[name])
+                self.assertRegex(hashed[name], r'\.[0-9a-f]{12}\.(css|js)$')
+                self.assertTrue(os.path.exists(path + '.gz'))
+        with open(os.path.join(root, hashed['css/site.css']), encoding='utf-8') as handle:
+            self.assertNotIn('/*', handle.read())
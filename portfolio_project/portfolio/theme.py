@@ -0,0 +1,34 @@
+"""
+Compilazione delle palette colori in fogli di stile.
+
+Il CSS generato contiene tutte le variabili derivate (glow, gradienti) già
+calcolate, ed è identificato da un hash del contenuto: l'URL cambia solo
+quando cambiano i colori, quindi il browser può tenerlo in cache per sempre.
+"""
+import hashlib
+
+
+STYLESHEET_TEMPLATE = """:root{{\
+--primary-color:{primary};\
+--primary-glow:{primary}66;\
+--secondary-color:{secondary};\
+--accent-color:{accent};\
+--gradient-primary:linear-gradient(135deg, {primary} 0%, {secondary} 100%);\
+--glow-primary:0 0 20px {primary}66, 0 0 40px {primary}33;\
+--glow-text:0 0 10px {primary}80;\
+}}
+"""
+
+
+def compile_palette_css(palette):
+    """Restituisce il CSS con le variabili della palette."""
+    return STYLESHEET_TEMPLATE.format(
+        primary=palette.primary_color,
+        secondary=palette.secondary_color,
+        accent=palette.accent_color,
+    )
+
+
+def stylesheet_hash(css):
+    """Hash breve del contenuto, usato nel nome del file."""
+    return hashlib.sha256(css.encode('utf-8')).hexdigest()[:16]
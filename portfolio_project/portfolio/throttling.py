@@ -0,0 +1,123 @@
+"""
+Limiti di frequenza per il form di contatto.
+
+Ogni POST consuma un gettone da due token bucket, uno per indirizzo IP e
+uno globale, salvati nel backend di cache: un rifiuto costa una lettura e
+una scrittura in cache, senza query al database. I messaggi identici
+a uno già salvato entro ``duplicate_window`` secondi vengono scartati.
+
+Con la cache locale di processo i contatori valgono per singolo worker;
+con più worker conviene un backend condiviso (``REDIS_URL``). La lettura e
+la scrittura del bucket non sono atomiche: con richieste concorrenti il
+limite è approssimato per eccesso di qualche unità.
+"""
+import hashlib
+import time
+
+from django.conf import settings
+from django.core.cache import cache
+
+
+THROTTLE_KEY_PREFIX = 'portfolio:throttle:'
+
+DEFAULTS = {
+    'ip_capacity': 5,
+    'ip_refill': 600,
+    'global_capacity': 30,
+    'global_refill': 60,
+    'duplicate_window': 24 * 60 * 60,
+    'proxy_count': 0,
+    'ip_header': '',
+}
+
+
+def throttle_settings():
+    return {**DEFAULTS, **getattr(settings, 'CONTACT_THROTTLE', {})}
+
+
+def client_ip(request, proxy_count=0, header=''):
+    """
+    IP del client. Con ``header`` (chiave di ``request.META``) l'indirizzo
+    viene da un header che il proxy scrive sempre, come
+    ``X-Vercel-Forwarded-For`` su Vercel. Altrimenti, dietro ``proxy_count``
+    proxy fidati, viene letto da ``X-Forwarded-For`` contando da destra: i
+    valori più a sinistra li sceglie il client e non sono affidabili.
+    """
+    if header:
+        value = request.META.get(header, '').split(',')[0].strip()
+        if value:
+            return value
+    if proxy_count:
+        forwarded = [
+            part.strip()
+            for part in request.META.get('HTTP_X_FORWARDED_FOR', '').split(',')
+            if part.strip()
+        ]
+        if len(forwarded) >= proxy_count:
+            return forwarded[-proxy_count]
+    return request.META.get('REMOTE_ADDR', '')
+
+
+def take_token(name, capacity, refill_seconds, now=None):
+    """
+    Consuma un gettone dal bucket ``name``: ne contiene al massimo
+    ``capacity`` e ne riguadagna uno ogni ``refill_seconds``.
+    Restituisce 0 se la richiesta è ammessa, altrimenti i secondi da
+    attendere.
+    """
+    now = time.time() if now is None else now
+    key = THROTTLE_KEY_PREFIX + name
+    tokens, updated = cache.get(key) or (capacity, now)
+    tokens = min(capacity, tokens + (now - updated) / refill_seconds)
+    if tokens < 1:
+        return max(1, int((1 - tokens) * refill_seconds + 0.5))
+    # Il bucket scade quando sarebbe di nuovo pieno, che equivale a non averlo
+    cache.set(key, (tokens - 1, now), int((capacity - tokens + 1) * refill_seconds) + 1)
+    return 0
+
+
+def check_contact_rate(request):
+    """
+    Applica i bucket per IP e globale. Restituisce 0 se la richiesta può
+    proseguire, altrimenti i secondi da indicare in ``Retry-After``.
+    """
+    config = throttle_settings()
+    ip = client_ip(request, config['proxy_count'], config['ip_header'])
+    wait = take_token(f'contact:ip:{ip}', config['ip_capacity'], config['ip_refill'])
+    if wait:
+        return wait
+    return take_token('contact:global', config['global_capacity'], config['global_refill'])
+
+
+def _fingerprint(cleaned_data):
+    parts = (
+        cleaned_data.get('email', ''),
+        cleaned_data.get('subject', ''),
+        cleaned_data.get('message', ''),
+    )
+    normalized = '\x00'.join(' '.join(str(part).lower().split()) for part in parts)
+    return hashlib.sha256(normalized.encode('utf-8')).hexdigest()
+
+
+def _message_key(cleaned_data):
+    return THROTTLE_KEY_PREFIX + 'contact:message:' + _fingerprint(cleaned_data)
+
+
+def is_duplicate_message(cleaned_data):
+    """
+    ``True`` se lo stesso messaggio (email, oggetto e testo, ignorando
+    maiuscole e spazi) è già stato ricevuto entro la finestra configurata.
+    """
+    if not throttle_settings()['duplicate_window']:
+        return False
+    return cache.get(_message_key(cleaned_data)) is not None
+
+
+def remember_message(cleaned_data):
+    """
+    Registra un messaggio ricevuto per scartarne le copie. Va chiamata dopo
+    il commit: se il salvataggio fallisce, il messaggio si può reinviare.
+    """
+    window = throttle_settings()['duplicate_window']
+    if window:
+        cache.set(_message_key(cleaned_data), 1, window)
@@ -0,0 +1,215 @@
+"""
+Misura dei tempi di ogni richiesta, esposti nell'header ``Server-Timing``
+e in una riga di log.
+
+Per ogni richiesta campionata vengono registrati:
+
+- ``sql``: numero di query e tempo totale passato nel database;
+- ``ctx``: tempo del context processor ``site_settings``;
+- ``tpl``: rendering del template della pagina, compreso ``base.html``
+  (incluso tramite ``{% extends %}``) e quindi anche ``ctx``;
+- ``view``: esecuzione della view, dal dispatch alla risposta;
+- ``total``: l'intera richiesta, middleware compresi.
+
+Le misure vengono raccolte in un ``ContextVar``: funzionano allo stesso
+modo con le view sincrone e con quelle asincrone (``sync_to_async`` copia
+il contesto nel thread che esegue le query). Fuori da una richiesta
+campionata ogni punto di misura costa una sola lettura del ``ContextVar``.
+"""
+import logging
+import random
+import time
+from contextlib import contextmanager
+from contextvars import ContextVar
+
+from asgiref.sync import iscoroutinefunction, markcoroutinefunction
+
+from django.conf import settings
+from django.core.exceptions import MiddlewareNotUsed
+from django.template.backends.django import DjangoTemplates, Template
+
+
+logger = logging.getLogger('portfolio.timing')
+
+DEFAULTS = {
+    'enabled': False,
+    # Frazione delle richieste misurate (1.0 = tutte)
+    'sample_rate': 1.0,
+    # Aggiunge l'header Server-Timing alla risposta
+    'header': True,
+    # Scrive una riga di log per ogni richiesta misurata
+    'log': True,
+}
+
+_current = ContextVar('server_timing', default=None)
+
+
+def timing_settings():
+    return {**DEFAULTS, **getattr(settings, 'SERVER_TIMING', {})}
+
+
+class RequestTiming:
+    """Tempi accumulati durante una richiesta, in secondi."""
+
+    def __init__(self):
+        self.started = time.perf_counter()
+        self.queries = 0
+        self.sql = 0.0
+        self.context = 0.0
+        self.templates = 0.0
+        self.template_names = []
+        self.view_started = None
+        self.view = 0.0
+        self.total = 0.0
+
+    def metrics(self):
+        """Voci dell'header come ``(nome, durata ms, descrizione)``."""
+        return [
+            ('sql', self.sql * 1000, f'{self.queries} query'),
+            ('ctx', self.context * 1000, 'site_settings'),
+            ('tpl', self.templates * 1000, ', '.join(self.template_names)),
+            ('view', self.view * 1000, ''),
+            ('total', self.total * 1000, ''),
+        ]
+
+    def header(self):
+        entries = []
+        for name, duration, description in self.metrics():
+            entry = f'{name};dur={duration:.1f}'
+            if description:
+                entry += ';desc="{}"'.format(description.replace('"', "'"))
+            entries.append(entry)
+        return ', '.join(entries)
+
+
+@contextmanager
+def timed(attribute):
+    """Aggiunge la durata del blocco all'attributo della misura corrente."""
+    timing = _current.get()
+    if timing is None:
+        yield
+        return
+    start = time.perf_counter()
+    try:
+        yield
+    finally:
+        setattr(timing, attribute, getattr(timing, attribute) + time.perf_counter() - start)
+
+
+def record_query(execute, sql, params, many, context):
+    """Wrapper di esecuzione delle query, installato su ogni connessione."""
+    timing = _current.get()
+    if timing is None:
+        return execute(sql, params, many, context)
+    start = time.perf_counter()
+    try:
+        return execute(sql, params, many, context)
+    finally:
+        timing.sql += time.perf_counter() - start
+        timing.queries += 1
+
+
+def install_query_wrapper(sender, connection, **kwargs):
+    """Receiver di ``connection_created``: misura le query della connessione."""
+    if record_query not in connection.execute_wrappers:
+        connection.execute_wrappers.append(record_query)
+
+
+class TimedTemplate(Template):
+    def render(self, context=None, request=None):
+        timing = _current.get()
+        if timing is None:
+            return super().render(context, request)
+        timing.template_names.append(self.origin.template_name)
+        start = time.perf_counter()
+        try:
+            return super().render(context, request)
+        finally:
+            timing.templates += time.perf_counter() - start
+
+
+class TimedDjangoTemplates(DjangoTemplates):
+    """Backend dei template Django che misura il rendering delle pagine."""
+
+    def from_string(self, template_code):
+        return TimedTemplate(self.engine.from_string(template_code), self)
+
+    def get_template(self, template_name):
+        template = super().get_template(template_name)
+        return TimedTemplate(template.template, self)
+
+
+class ServerTimingMiddleware:
+    """
+    Misura le richieste campionate e aggiunge ``Server-Timing``.
+    Con ``SERVER_TIMING['enabled']`` falso non viene caricato affatto.
+    """
+    async_capable = True
+    sync_capable = True
+
+    def __init__(self, get_response):
+        options = timing_settings()
+        if not options['enabled']:
+            raise MiddlewareNotUsed
+        self.get_response = get_response
+        self.sample_rate = options['sample_rate']
+        self.header = options['header']
+        self.log = options['log']
+        self.is_async = iscoroutinefunction(get_response)
+        if self.is_async:
+            markcoroutinefunction(self)
+
+    def __call__(self, request):
+        if self.is_async:
+            return self.__acall__(request)
+        if not self._sampled():
+            return self.get_response(request)
+        timing = RequestTiming()
+        token = _current.set(timing)
+        try:
+            response = self.get_response(request)
+        finally:
+            _current.reset(token)
+        return self._finish(request, response, timing)
+
+    async def __acall__(self, request):
+        if not self._sampled():
+            return await self.get_response(request)
+        timing = RequestTiming()
+        token = _current.set(timing)
+        try:
+            response = await self.get_response(request)
+        finally:
+            _current.reset(token)
+        return self._finish(request, response, timing)
+
+    def process_view(self, request, view_func, view_args, view_kwargs):
+        timing = _current.get()
+        if timing is not None:
+            timing.view_started = time.perf_counter()
+
+    def _sampled(self):
+        return self.sample_rate >= 1 or random.random() < self.sample_rate
+
+    def _finish(self, request, response, timing):
+        finished = time.perf_counter()
+        timing.total = finished - timing.started
+        if timing.view_started is not None:
+            timing.view = finished - timing.view_started
+        if self.header:
+            response['Server-Timing'] = timing.header()
+        if self.log:
+            logger.info(
+                'method=%s path=%s status=%s total_ms=%.1f view_ms=%.1f '
+                'sql_ms=%.1f queries=%d tpl_ms=%.1f ctx_ms=%.1f',
+                request.method, request.path, response.status_code,
+                timing.total * 1000, timing.view * 1000, timing.sql * 1000,
+                timing.queries, timing.templates * 1000, timing.context * 1000,
+                extra={'server_timing': {
+                    'path': request.path,
+                    'status': response.status_code,
+                    'queries': timing.queries,
+                    **{name: round(duration, 2) for name, duration, _ in timing.metrics()},
+                }},
+            )
+        return response
@@ -1,16 +1,31 @@
+from django.conf import settings
 from django.urls import path
 from . import views
 
+# Via ASGI (ASYNC_VIEWS) le pagine pubbliche e le API usano le view asincrone
+if getattr(settings, 'ASYNC_VIEWS', False):
+    from . import async_views as public_views
+else:
+    public_views = views
+
 urlpatterns = [
     # Main pages
-    path('', views.index, name='home'),
-    path('projects/', views.projects_list, name='projects'),
-    path('projects/<slug:slug>/', views.project_detail, name='project_detail'),
-    path('about/', views.about, name='about'),
-    path('contact/', views.contact, name='contact'),
+    path('', public_views.index, name='home'),
+    path('projects/', public_views.projects_list, name='projects'),
+    path('projects/<slug:slug>/', public_views.project_detail, name='project_detail'),
+    path('about/', public_views.about, name='about'),
+    path('contact/', public_views.contact, name='contact'),
     path('contact/success/', views.contact_success, name='contact_success'),
     
+    # Foglio di stile della palette, identificato dall'hash del contenuto
+    path('theme/palette-<slug:digest>.css', views.palette_stylesheet, name='palette_stylesheet'),
+    
+    # Invio delle notifiche in coda, chiamato dal cron di Vercel
+    path('cron/send-notifications/', views.send_notifications_cron, name='cron_send_notifications'),
+    
     # API endpoints
-    path('api/palette/', views.get_active_palette, name='api_palette'),
-    path('api/skills/', views.get_skills_api, name='api_skills'),
+    path('api/palette/', public_views.get_active_palette, name='api_palette'),
+    path('api/skills/', public_views.get_skills_api, name='api_skills'),
+    path('api/projects/', public_views.get_projects_api, name='api_projects'),
+    path('api/projects/search/', public_views.search_projects_api, name='api_project_search'),
 ]
@@ -0,0 +1,407 @@
+"""
+Asset di terze parti ospitati dal sito (Bootstrap, Font Awesome, font).
+
+Invece di caricare dai CDN tutto Bootstrap, tutto Font Awesome e i font
+di Google Fonts, ``manage.py build_vendor_assets`` genera tra i
+file statici, in ``static/vendor/``:
+
+- ``vendor.css``: Bootstrap senza le regole delle classi mai usate, le
+  regole di Font Awesome delle sole icone usate e i ``@font-face``;
+- ``fonts/*.woff2``: i font delle icone ridotti ai glifi usati e quelli
+  del testo (Inter) ridotti all'alfabeto latino, senza hinting;
+- ``bootstrap.bundle.min.js`` e ``vendor.json`` (icone incluse e byte).
+
+Le classi usate vengono cercate come parole in template, JavaScript,
+codice Python del portfolio (es. le classi dei widget dei form) e nelle
+icone delle skill: una parola in più tiene una regola in più, mai una in
+meno. I file originali vengono scaricati una volta nella cartella
+``VENDOR_CACHE_ROOT``.
+
+I file vengono generati dal build (``build_files.sh``), mai durante le
+richieste. Se una skill salvata in seguito usa classi assenti da
+``vendor.css``, ``base.html`` carica anche Font Awesome completo dal CDN
+(``skill_icons_missing``) finché il build successivo non le include.
+"""
+import hashlib
+import io
+import json
+import logging
+import os
+import re
+from pathlib import Path
+
+from django.conf import settings
+from django.contrib.staticfiles.storage import staticfiles_storage
+
+from .assets import CSS_COMMENT_RE, bundles_enabled, minify_css
+
+
+logger = logging.getLogger(__name__)
+
+FONT_AWESOME_URL = 'https://cdn.jsdelivr.net/npm/@fortawesome/fontawesome-free@6.5.1/'
+BOOTSTRAP_URL = 'https://cdn.jsdelivr.net/npm/bootstrap@5.3.2/dist/'
+FONTSOURCE_URL = 'https://cdn.jsdelivr.net/npm/@fontsource/{package}@5/files/{package}-latin-{weight}-normal.woff2'
+
+ICON_FONTS = ('fa-solid-900', 'fa-regular-400', 'fa-brands-400')
+# Famiglia -> (pacchetto fontsource, pesi usati da theme.css e Bootstrap).
+# Fira Code, caricato dai CDN, non è usato da nessun foglio di stile
+TEXT_FONTS = {
+    'Inter': ('inter', (300, 400, 500, 600, 700, 800)),
+}
+# Intervallo "latin" di Google Fonts
+LATIN_RANGE = (
+    'U+0000-00FF, U+0131, U+0152-0153, U+02BB-02BC, U+02C6, U+02DA, U+02DC, '
+    'U+0304, U+0308, U+0329, U+2000-206F, U+2074, U+20AC, U+2122, U+2191, '
+    'U+2193, U+2212, U+2215, U+FEFF, U+FFFD'
+)
+
+# Nome nella cache -> URL del file originale
+SOURCES = {
+    'bootstrap.css': BOOTSTRAP_URL + 'css/bootstrap.css',
+    'bootstrap.bundle.min.js': BOOTSTRAP_URL + 'js/bootstrap.bundle.min.js',
+    'fontawesome.css': FONT_AWESOME_URL + 'css/all.css',
+    **{f'{name}.woff2': f'{FONT_AWESOME_URL}webfonts/{name}.woff2' for name in ICON_FONTS},
+    **{
+        f'{package}-{weight}.woff2': FONTSOURCE_URL.format(package=package, weight=weight)
+        for package, weights in TEXT_FONTS.values()
+        for weight in weights
+    },
+}
+
+STATIC_DIR = 'vendor'
+MANIFEST_NAME = 'vendor.json'
+TOKEN_RE = re.compile(r'[A-Za-z0-9_-]+')
+ICON_SELECTOR_RE = re.compile(r'^\.fa-([a-z0-9-]+)(?:::?before)?$')
+ICON_DECLARATION_RE = re.compile(r'^\s*(?:content|--fa)\s*:\s*"((?:\\.|[^"\\])*)"\s*;?\s*$', re.S)
+CSS_ESCAPE_RE = re.compile(r'\\([0-9a-fA-F]{1,6})\s?|\\(.)|(.)', re.S)
+CSS_CLASS_RE = re.compile(r'\.(-?[_a-zA-Z][\w-]*)')
+URL_RE = re.compile(r'url\(\s*["\']?[^"\')]*/([\w.-]+\.woff2)["\']?\s*\)\s*format\(\s*["\']woff2["\']\s*\)')
+
+
+def vendor_root():
+    return Path(settings.BASE_DIR) / 'portfolio' / 'static' / STATIC_DIR
+
+
+def is_built():
+    """
+    Vero se i file generati sono disponibili: nel manifest di
+    ``collectstatic`` oppure, senza manifest, tra i sorgenti. Altrimenti
+    ``base.html`` usa i CDN.
+    """
+    if bundles_enabled():
+        return f'{STATIC_DIR}/vendor.css' in staticfiles_storage.hashed_files
+    return (vendor_root() / 'vendor.css').exists()
+
+
+def cache_root():
+    return Path(getattr(settings, 'VENDOR_CACHE_ROOT', Path(settings.BASE_DIR) / '.vendor-cache'))
+
+
+def _write(path, content):
+    """Scrive il file in modo atomico."""
+    path.parent.mkdir(parents=True, exist_ok=True)
+    temporary = path.with_name(path.name + '.tmp')
+    temporary.write_bytes(content)
+    os.replace(temporary, path)
+
+
+def fetch(name, offline=False, refresh=False):
+    """
+    Percorso del file originale ``name`` nella cache, scaricato se manca.
+    Solleva ``RuntimeError`` se il file non c'è e non si può scaricare.
+    """
+    path = cache_root() / name
+    if path.exists() and not refresh:
+        return path
+    if offline:
+        raise RuntimeError(f'{name} non è nella cache ({path}): eseguire build_vendor_assets senza --offline')
+    import requests as http
+
+    try:
+        response = http.get(SOURCES[name], timeout=30)
+        response.raise_for_status()
+    except http.RequestException as error:
+        raise RuntimeError(f'Download di {SOURCES[name]} non riuscito: {error}')
+    _write(path, response.content)
+    return path
+
+
+# --------------------------------------------------------------------------
+# Parole usate dal sito
+# --------------------------------------------------------------------------
+
+def skill_icon_tokens():
+    from .models import Skill
+
+    icons = Skill.objects.order_by().values_list('icon', flat=True).distinct()
+    return {token for icon in icons for token in TOKEN_RE.findall(icon)}
+
+
+def used_tokens():
+    """Parole di template, JavaScript, codice Python e icone delle skill."""
+    root = Path(settings.BASE_DIR) / 'portfolio'
+    files = [
+        *(root / 'templates').rglob('*.html'),
+        *(root / 'static' / 'js').rglob('*.js'),
+        *(path for path in root.rglob('*.py') if 'migrations' not in path.parts),
+    ]
+    tokens = skill_icon_tokens()
+    for path in files:
+        tokens.update(TOKEN_RE.findall(path.read_text(encoding='utf-8')))
+    return tokens
+
+
+def icon_names(tokens):
+    """Nomi delle icone (senza ``fa-``) tra le parole indicate."""
+    return {token[3:] for token in tokens if token.startswith('fa-')}
+
+
+# --------------------------------------------------------------------------
+# CSS
+# --------------------------------------------------------------------------
+
+def split_rules(css):
+    """
+    Regole di primo livello come coppie ``(prelude, corpo)``; il corpo è
+    ``None`` per le istruzioni senza blocco (es. ``@charset``).
+    """
+    rules = []
+    start = depth = 0
+    brace = None
+    index = 0
+    while index < len(css):
+        char = css[index]
+        if char == '\\':
+            index += 2
+            continue
+        if char in '"\'':
+            end = css.find(char, index + 1)
+            while end != -1 and css[end - 1] == '\\':
+                end = css.find(char, end + 1)
+            index = len(css) if end == -1 else end + 1
+            continue
+        if char == '{':
+            if depth == 0:
+                brace = index
+            depth += 1
+        elif char == '}':
+            depth -= 1
+            if depth == 0:
+                rules.append((css[start:brace].strip(), css[brace + 1:index]))
+                start = index + 1
+        elif char == ';' and depth == 0:
+            rules.append((css[start:index].strip(), None))
+            start = index + 1
+        index += 1
+    return rules
+
+
+def split_selectors(prelude):
+    """Selettori di una lista separata da virgole (fuori dalle parentesi)."""
+    selectors = []
+    depth = start = 0
+    for index, char in enumerate(prelude):
+        if char in '([':
+            depth += 1
+        elif char in ')]':
+            depth -= 1
+        elif char == ',' and depth == 0:
+            selectors.append(prelude[start:index].strip())
+            start = index + 1
+    selectors.append(prelude[start:].strip())
+    return [selector for selector in selectors if selector]
+
+
+def selector_used(selector, tokens):
+    """
+    Vero se tutte le classi del selettore sono tra le parole usate. Le
+    classi dentro ``:not()``, ``:is()`` ecc. e negli attributi non contano.
+    """
+    simplified = re.sub(r'\[[^\]]*\]', '', selector)
+    previous = None
+    while previous != simplified:
+        previous = simplified
+        simplified = re.sub(r'\([^()]*\)', '', simplified)
+    return all(name in tokens for name in CSS_CLASS_RE.findall(simplified))
+
+
+def purge_css(css, tokens):
+    """Rimuove le regole dei selettori con classi mai usate."""
+    output = []
+    for prelude, body in split_rules(css):
+        if body is None:
+            output.append(f'{prelude};')
+        elif prelude.startswith(('@media', '@supports', '@container', '@layer')):
+            inner = purge_css(body, tokens)
+            if inner:
+                output.append(f'{prelude}{{{inner}}}')
+        elif prelude.startswith('@'):
+            output.append(f'{prelude}{{{body}}}')
+        else:
+            selectors = [selector for selector in split_selectors(prelude) if selector_used(selector, tokens)]
+            if selectors:
+                output.append(f"{','.join(selectors)}{{{body}}}")
+    return ''.join(output)
+
+
+def decode_css_string(value):
+    return ''.join(
+        chr(int(hex_value, 16)) if hex_value else (escaped or char)
+        for hex_value, escaped, char in CSS_ESCAPE_RE.findall(value)
+    )
+
+
+def subset_icon_css(css, names):
+    """
+    Tiene le regole di Font Awesome delle sole icone in ``names`` (nomi
+    senza ``fa-``) e i ``@font-face`` dei font generati, con il solo WOFF2.
+    Restituisce il CSS e i codepoint delle icone incluse.
+    """
+    output = []
+    codepoints = set()
+    included = set()
+    for prelude, body in split_rules(css):
+        if body is None:
+            output.append(f'{prelude};')
+            continue
+        if prelude.startswith('@font-face'):
+            match = URL_RE.search(body)
+            if not match or match.group(1).removesuffix('.woff2') not in ICON_FONTS:
+                continue
+            source = f'src:url("fonts/{match.group(1)}") format("woff2")'
+            body = re.sub(r'src\s*:[^;}]*', source, body)
+            output.append(f'{prelude}{{{body}}}')
+            continue
+        selectors = split_selectors(prelude)
+        matches = [ICON_SELECTOR_RE.match(selector) for selector in selectors]
+        declaration = ICON_DECLARATION_RE.match(body)
+        if declaration is None or not all(matches):
+            output.append(f'{prelude}{{{body}}}')
+            continue
+        kept = [selector for selector, match in zip(selectors, matches) if match.group(1) in names]
+        if kept:
+            output.append(f"{','.join(kept)}{{{body}}}")
+            codepoints.update(ord(char) for char in decode_css_string(declaration.group(1)))
+            included.update(match.group(1) for match in matches if match.group(1) in names)
+    return ''.join(output), codepoints, included
+
+
+def text_font_css():
+    return ''.join(
+        f"@font-face{{font-family:'{family}';font-style:normal;font-weight:{weight};"
+        f'font-display:swap;src:url("fonts/{package}-{weight}.woff2") format("woff2");'
+        f'unicode-range:{LATIN_RANGE}}}'
+        for family, (package, weights) in TEXT_FONTS.items()
+        for weight in weights
+    )
+
+
+# --------------------------------------------------------------------------
+# Font
+# --------------------------------------------------------------------------
+
+def parse_unicode_range(value):
+    codepoints = set()
+    for part in value.split(','):
+        first, _, last = part.strip().removeprefix('U+').partition('-')
+        codepoints.update(range(int(first, 16), int(last or first, 16) + 1))
+    return codepoints
+
+
+def subset_font(source, unicodes):
+    """Contenuto WOFF2 del font ridotto ai codepoint indicati, senza hinting."""
+    from fontTools import subset
+
+    options = subset.Options()
+    options.flavor = 'woff2'
+    options.hinting = False
+    options.desubroutinize = True
+    # Tabella di FontForge che fontTools non sa ridurre
+    options.drop_tables += ['FFTM']
+    font = subset.load_font(str(source), options)
+    subsetter = subset.Subsetter(options)
+    subsetter.populate(unicodes=unicodes)
+    subsetter.subset(font)
+    buffer = io.BytesIO()
+    subset.save_font(font, buffer, options)
+    return buffer.getvalue()
+
+
+# --------------------------------------------------------------------------
+# Build
+# --------------------------------------------------------------------------
+
+def load_manifest():
+    try:
+        with open(vendor_root() / MANIFEST_NAME, encoding='utf-8') as handle:
+            return json.load(handle)
+    except (OSError, ValueError):
+        return None
+
+
+def build(offline=False, refresh=False):
+    """
+    Genera i file in ``VENDOR_ROOT`` e restituisce il manifest, con i byte
+    di ogni file prima (``source``) e dopo (``output``).
+    """
+    sources = {name: fetch(name, offline, refresh) for name in SOURCES}
+    # Anche le classi aggiunte dal JavaScript di Bootstrap (show, collapsing...)
+    tokens = used_tokens() | set(TOKEN_RE.findall(sources['bootstrap.bundle.min.js'].read_text(encoding='utf-8')))
+    requested = icon_names(tokens)
+    root = vendor_root()
+    files = {}
+
+    def output(name, content, source_names):
+        _write(root / name, content)
+        files[name] = {
+            'source': sum(sources[source].stat().st_size for source in source_names),
+            'output': len(content),
+        }
+
+    def read(name):
+        return CSS_COMMENT_RE.sub(lambda match: match.group(1) or '', sources[name].read_text(encoding='utf-8'))
+
+    icon_css, codepoints, included = subset_icon_css(read('fontawesome.css'), requested)
+    stylesheet = minify_css(purge_css(read('bootstrap.css'), tokens) + icon_css + text_font_css())
+    output('vendor.css', stylesheet.encode('utf-8'), ['bootstrap.css', 'fontawesome.css'])
+    output('bootstrap.bundle.min.js', sources['bootstrap.bundle.min.js'].read_bytes(), ['bootstrap.bundle.min.js'])
+
+    for name in ICON_FONTS:
+        output(f'fonts/{name}.woff2', subset_font(sources[f'{name}.woff2'], codepoints), [f'{name}.woff2'])
+    latin = parse_unicode_range(LATIN_RANGE)
+    for package, weights in TEXT_FONTS.values():
+        for weight in weights:
+            name = f'{package}-{weight}.woff2'
+            output(f'fonts/{name}', subset_font(sources[name], latin), [name])
+
+    manifest = {
+        'classes': sorted(set(CSS_CLASS_RE.findall(stylesheet))),
+        'icons': sorted(included),
+        'requested': sorted(requested),
+        'sources': hashlib.sha256(
+            b''.join(sources[name].read_bytes() for name in sorted(sources))
+        ).hexdigest(),
+        'files': files,
+    }
+    _write(root / MANIFEST_NAME, json.dumps(manifest, indent=2, sort_keys=True).encode('utf-8'))
+    return manifest
+
+
+def missing_classes(value):
+    """
+    Classi di ``value`` (es. l'icona di una skill) assenti dal ``vendor.css``
+    generato. Senza file generati ``base.html`` usa i CDN e non manca nulla.
+    """
+    manifest = load_manifest()
+    if not manifest or 'classes' not in manifest or not is_built():
+        return []
+    classes = set(manifest['classes'])
+    return [token for token in TOKEN_RE.findall(value) if token not in classes]
+
+
+def skill_icons_missing():
+    """Vero se qualche skill usa classi assenti dal ``vendor.css`` generato."""
+    from .models import Skill
+
+    icons = Skill.objects.order_by().values_list('icon', flat=True).distinct()
+    return any(missing_classes(icon) for icon in icons)
@@ -1,74 +1,153 @@
 from django.shortcuts import render, get_object_or_404, redirect
-from django.http import JsonResponse
+from django.http import HttpResponse, JsonResponse, Http404
 from django.core.paginator import Paginator
 from django.contrib import messages
-from django.core.mail import send_mail
+from django.db import transaction
 from django.conf import settings as django_settings
-from .models import Project, Skill, Experience, ColorPalette, SiteSettings, ContactMessage
+from django.utils.cache import patch_cache_control
+from django.utils.crypto import constant_time_compare
+from django.views.decorators.cache import never_cache
+from .models import Project, Skill, Experience, ColorPalette, ContactMessage, RelatedProject
+from .catalog import get_skill_catalog, get_technology_cloud
 from .forms import ContactForm
+from .http import api_cache_control, versioned_etag
+from .outbox import drain, queue_contact_notification
+from .cache import version_name
+from .page_cache import cache_public_page
+from .pagination import CursorPaginator, cached_count
+from .search import ranked_project_ids, search_projects
+from .snapshots import get_site_snapshot
+from .throttling import check_contact_rate, is_duplicate_message, remember_message
 
 
+FEATURED_PROJECTS = 6
+RELATED_PROJECTS_SHOWN = 3
+PROJECTS_PER_PAGE = 9
+
+
+# Query delle pagine, condivise con le view asincrone e con l'audit dei
+# piani di esecuzione (query_audit.py)
+
+def featured_projects():
+    return Project.objects.filter(featured=True).with_technologies()[:FEATURED_PROJECTS]
+
+
+def filtered_projects(category=None, technology_id=None):
+    """Progetti di una categoria e/o di una tecnologia, nell'ordine della pagina."""
+    projects = Project.objects.with_technologies()
+    if category:
+        projects = projects.filter(category=category)
+    if technology_id is not None:
+        projects = projects.filter(technology_links__technology_id=technology_id)
+    return projects
+
+
+def related_links(project_pk):
+    """Righe dei progetti correlati mostrati nella pagina di un progetto."""
+    return (
+        RelatedProject.objects.filter(project_id=project_pk)
+        .select_related('related')[:RELATED_PROJECTS_SHOWN]
+    )
+
+
+@cache_public_page(Project, Skill)
 def index(request):
     """
     Home page del portfolio.
     Mostra progetti in evidenza e skill principali.
     """
-    featured_projects = Project.objects.filter(featured=True)[:6]
-    skills = Skill.objects.all()[:12]
-    
-    # Raggruppa le skill per categoria
-    skills_by_category = {}
-    for skill in Skill.objects.all():
-        category = skill.get_category_display()
-        if category not in skills_by_category:
-            skills_by_category[category] = []
-        skills_by_category[category].append(skill)
-    
     context = {
-        'featured_projects': featured_projects,
-        'skills': skills,
-        'skills_by_category': skills_by_category,
+        'featured_projects': featured_projects(),
+        'skill_catalog': get_skill_catalog(),
     }
     return render(request, 'home.html', context)
 
 
+def _filter_projects(request, technology_cloud=None):
+    """
+    Applica i filtri GET comuni a pagina progetti e API:
+    categoria e tecnologia. Le view asincrone passano la nuvola delle
+    tecnologie già caricata.
+    """
+    category = request.GET.get('category')
+    
+    # Filtro per tecnologia, risolto tramite l'indice delle tecnologie
+    if technology_cloud is None:
+        technology_cloud = get_technology_cloud()
+    tech = request.GET.get('tech')
+    current_technology = technology_cloud.get(tech) if tech else None
+    projects = filtered_projects(
+        category if category != 'all' else None,
+        current_technology.pk if current_technology else None,
+    )
+    if tech and not current_technology:
+        projects = projects.none()
+    
+    return projects, category, technology_cloud, current_technology
+
+
+def _project_data(project):
+    """Rappresentazione JSON di un progetto per le API."""
+    return {
+        'title': project.title,
+        'slug': project.slug,
+        'url': project.get_absolute_url(),
+        'short_description': project.short_description,
+        'category': project.category,
+        'category_display': project.get_category_display(),
+        'technologies': project.get_technologies_list(),
+        'created_at': project.created_at,
+    }
+
+
+@cache_public_page(Project)
 def projects_list(request):
     """
-    Lista di tutti i progetti con filtri per categoria.
+    Lista di tutti i progetti con filtri per categoria e tecnologia.
     """
-    projects = Project.objects.all()
+    projects, category, technology_cloud, current_technology = _filter_projects(request)
     
-    # Filtro per categoria
-    category = request.GET.get('category')
-    if category and category != 'all':
-        projects = projects.filter(category=category)
+    # Ricerca full-text, con risultati ordinati per rilevanza
+    search_query = request.GET.get('q', '').strip()
+    if search_query:
+        projects = search_projects(projects, search_query)
     
-    # Paginazione
-    paginator = Paginator(projects, 9)  # 9 progetti per pagina
-    page = request.GET.get('page')
-    projects = paginator.get_page(page)
+    # Paginazione: a cursore se abilitata (non applicabile all'ordinamento
+    # per rilevanza della ricerca), altrimenti per numero di pagina
+    pagination_mode = getattr(django_settings, 'PROJECTS_PAGINATION', 'offset')
+    if pagination_mode == 'cursor' and not search_query:
+        paginator = CursorPaginator(projects, PROJECTS_PER_PAGE)
+        projects = paginator.get_page(request.GET.get('cursor'))
+    else:
+        pagination_mode = 'offset'
+        paginator = Paginator(projects, PROJECTS_PER_PAGE)
+        page = request.GET.get('page')
+        projects = paginator.get_page(page)
     
     # Categorie disponibili per il filtro
     categories = Project.CATEGORY_CHOICES
     
     context = {
         'projects': projects,
+        'pagination_mode': pagination_mode,
         'categories': categories,
         'current_category': category or 'all',
+        'search_query': search_query,
+        'technology_cloud': technology_cloud,
+        'current_technology': current_technology,
     }
     return render(request, 'projects.html', context)
 
 
+@cache_public_page(Project, RelatedProject)
 def project_detail(request, slug):
     """
     Dettagli di un singolo progetto.
     """
     project = get_object_or_404(Project, slug=slug)
     
-    # Progetti correlati (stessa categoria, escluso quello corrente)
-    related_projects = Project.objects.filter(
-        category=project.category
-    ).exclude(pk=project.pk)[:3]
+    # Progetti correlati, precalcolati in base a tecnologie, categoria e data
+    related_projects = [link.related for link in related_links(project.pk)]
     
     context = {
         'project': project,
@@ -77,51 +156,55 @@ def project_detail(request, slug):
     return render(request, 'project_detail.html', context)
 
 
+@cache_public_page(Skill, Experience)
 def about(request):
     """
     Pagina Chi Sono con bio, esperienze e skill.
     """
     experiences = Experience.objects.all()
-    skills = Skill.objects.all()
-    
-    # Raggruppa le skill per categoria
-    skills_by_category = {}
-    for skill in skills:
-        category = skill.get_category_display()
-        if category not in skills_by_category:
-            skills_by_category[category] = []
-        skills_by_category[category].append(skill)
     
     context = {
         'experiences': experiences,
-        'skills_by_category': skills_by_category,
+        'skill_catalog': get_skill_catalog(),
     }
     return render(request, 'about.html', context)
 
 
+def _save_contact_message(form, recipient):
+    """Salva messaggio e notifica nella stessa transazione."""
+    with transaction.atomic():
+        contact_message = form.save()
+        if recipient:
+            queue_contact_notification(contact_message, recipient)
+        # Le copie vengono scartate solo dopo che il messaggio è salvato
+        transaction.on_commit(lambda: remember_message(form.cleaned_data))
+    return contact_message
+
+
 def contact(request):
     """
     Form di contatto.
     """
     if request.method == 'POST':
         form = ContactForm(request.POST)
+        
+        # Limiti per IP e globali, controllati in cache prima di ogni query
+        retry_after = check_contact_rate(request)
+        if retry_after:
+            messages.error(request, 'Troppi messaggi inviati. Riprova tra qualche minuto.')
+            response = render(request, 'contact.html', {'form': form}, status=429)
+            response['Retry-After'] = str(retry_after)
+            return response
+        
         if form.is_valid():
-            # Salva il messaggio
-            contact_message = form.save()
+            # Un messaggio identico già ricevuto viene ignorato senza segnalarlo
+            if is_duplicate_message(form.cleaned_data):
+                messages.success(request, 'Messaggio inviato con successo!')
+                return redirect('contact_success')
             
-            # Invia email di notifica (in produzione)
-            try:
-                site_settings = SiteSettings.get_settings()
-                if site_settings.email:
-                    send_mail(
-                        subject=f"Nuovo messaggio: {contact_message.subject}",
-                        message=f"Da: {contact_message.name} ({contact_message.email})\n\n{contact_message.message}",
-                        from_email=django_settings.DEFAULT_FROM_EMAIL if hasattr(django_settings, 'DEFAULT_FROM_EMAIL') else None,
-                        recipient_list=[site_settings.email],
-                        fail_silently=True,
-                    )
-            except Exception:
-                pass  # Silently fail if email sending fails
+            # Salva il messaggio e mette in coda la notifica email, che viene
+            # inviata fuori dalla richiesta dal comando send_notifications
+            _save_contact_message(form, get_site_snapshot().settings.email)
             
             messages.success(request, 'Messaggio inviato con successo!')
             return redirect('contact_success')
@@ -141,52 +224,155 @@ def contact_success(request):
     return render(request, 'success.html')
 
 
-def get_active_palette(request):
+def palette_stylesheet(request, digest):
     """
-    API endpoint per ottenere la palette colori attiva.
+    Foglio di stile compilato di una palette.
+    L'URL contiene l'hash del contenuto, quindi la risposta non cambia mai
+    e può essere tenuta in cache dal browser senza scadenza.
     """
-    palette = ColorPalette.objects.filter(is_active=True).first()
-    
-    if palette:
-        data = {
-            'name': palette.name,
-            'primary_color': palette.primary_color,
-            'secondary_color': palette.secondary_color,
-            'accent_color': palette.accent_color,
-            'text_color': palette.text_color,
-            'background_color': palette.background_color,
-        }
+    palette = get_site_snapshot().palette
+    if palette and palette.stylesheet_hash == digest:
+        css = palette.stylesheet
     else:
-        # Palette di default
-        data = {
-            'name': 'Default',
-            'primary_color': '#007bff',
-            'secondary_color': '#6c757d',
-            'accent_color': '#28a745',
-            'text_color': '#212529',
-            'background_color': '#ffffff',
-        }
+        css = ColorPalette.objects.filter(
+            stylesheet_hash=digest
+        ).values_list('stylesheet', flat=True).first()
+        if css is None:
+            raise Http404("Foglio di stile non trovato")
     
-    return JsonResponse(data)
+    response = HttpResponse(css, content_type='text/css; charset=utf-8')
+    patch_cache_control(response, public=True, max_age=60 * 60 * 24 * 365, immutable=True)
+    return response
 
 
+# Palette restituita dall'API quando nessuna è attiva
+DEFAULT_PALETTE_DATA = {
+    'name': 'Default',
+    'primary_color': '#007bff',
+    'secondary_color': '#6c757d',
+    'accent_color': '#28a745',
+    'text_color': '#212529',
+    'background_color': '#ffffff',
+}
+
+
+def _palette_data(palette):
+    if palette is None:
+        return DEFAULT_PALETTE_DATA
+    return {
+        'name': palette.name,
+        'primary_color': palette.primary_color,
+        'secondary_color': palette.secondary_color,
+        'accent_color': palette.accent_color,
+        'text_color': palette.text_color,
+        'background_color': palette.background_color,
+    }
+
+
+@api_cache_control('api_palette')
+@versioned_etag(ColorPalette)
+def get_active_palette(request):
+    """
+    API endpoint per ottenere la palette colori attiva.
+    La palette viene dallo snapshot del sito, senza query.
+    """
+    return JsonResponse(_palette_data(get_site_snapshot().palette))
+
+
+@api_cache_control('api_skills')
+@versioned_etag(Skill)
 def get_skills_api(request):
     """
     API endpoint per ottenere tutte le skill in formato JSON.
+    Il JSON è già serializzato nel catalogo delle skill.
+    """
+    return HttpResponse(get_skill_catalog().api_json, content_type='application/json')
+
+
+@api_cache_control('api_projects')
+@versioned_etag(Project)
+def get_projects_api(request):
     """
-    skills = Skill.objects.all()
-    data = []
+    API endpoint per l'elenco dei progetti, paginato a cursore.
+    Accetta gli stessi filtri della pagina progetti (category, tech) e
+    ``count=1`` per includere il totale (calcolato una volta per versione).
+    """
+    projects, category, technology_cloud, current_technology = _filter_projects(request)
+    try:
+        limit = min(max(int(request.GET.get('limit', PROJECTS_PER_PAGE)), 1), 50)
+    except ValueError:
+        limit = PROJECTS_PER_PAGE
+    
+    count = None
+    if request.GET.get('count') in ('1', 'true'):
+        count = lambda: cached_count(projects, [version_name(Project)])
     
-    for skill in skills:
-        data.append({
-            'name': skill.name,
-            'category': skill.category,
-            'category_display': skill.get_category_display(),
-            'proficiency': skill.proficiency,
-            'icon': skill.icon,
-        })
+    page = CursorPaginator(projects, limit, count=count).get_page(request.GET.get('cursor'))
     
-    return JsonResponse({'skills': data})
+    def page_url(cursor):
+        if cursor is None:
+            return None
+        query = request.GET.copy()
+        query['cursor'] = cursor
+        return f'{request.path}?{query.urlencode()}'
+    
+    data = {
+        'results': [_project_data(project) for project in page],
+        'next': page_url(page.next_cursor),
+        'previous': page_url(page.previous_cursor),
+    }
+    if page.count is not None:
+        data['count'] = page.count
+    return JsonResponse(data)
+
+
+@api_cache_control('api_project_search')
+@versioned_etag(Project)
+def search_projects_api(request):
+    """
+    API endpoint per la ricerca full-text dei progetti.
+    Restituisce i risultati ordinati per rilevanza.
+    """
+    query = request.GET.get('q', '').strip()
+    try:
+        limit = min(max(int(request.GET.get('limit', 20)), 1), 50)
+    except ValueError:
+        limit = 20
+    
+    ranked = ranked_project_ids(query, limit=limit)
+    projects = Project.objects.with_technologies().in_bulk([pk for pk, rank in ranked])
+    
+    results = []
+    for pk, rank in ranked:
+        project = projects.get(pk)
+        if project is None:
+            continue
+        results.append({**_project_data(project), 'rank': rank})
+    
+    return JsonResponse({'query': query, 'results': results})
+
+
+@never_cache
+def send_notifications_cron(request):
+    """
+    Svuota la coda delle notifiche email, chiamata dal cron di Vercel
+    (vedi ``vercel.json``). Vercel invia ``CRON_SECRET`` come token Bearer;
+    senza il segreto configurato l'URL non esiste.
+    L'invio si ferma dopo ``OUTBOX_CRON_TIME_BUDGET`` secondi, prima del
+    timeout della funzione: il resto parte al giro successivo.
+    """
+    secret = getattr(django_settings, 'CRON_SECRET', '')
+    if not secret:
+        raise Http404("Pagina non trovata")
+    authorization = request.headers.get('Authorization', '')
+    if not constant_time_compare(authorization, f'Bearer {secret}'):
+        return JsonResponse({'error': 'Non autorizzato'}, status=401)
+
+    sent, failed = drain(
+        digest=getattr(django_settings, 'OUTBOX_CRON_DIGEST', False),
+        time_budget=getattr(django_settings, 'OUTBOX_CRON_TIME_BUDGET', None),
+    )
+    return JsonResponse({'sent': sent, 'failed': failed})
 
 
 def custom_404(request, exception):
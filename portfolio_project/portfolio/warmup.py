@@ -0,0 +1,77 @@
+"""
+Warm-up del processo dopo un avvio a freddo.
+
+Esegue prima della prima richiesta il lavoro che altrimenti ricadrebbe su
+di essa: costruzione del resolver degli URL, compilazione dei template
+pubblici nel loader con cache e lettura dello snapshot del sito (con la
+prima connessione al database). Viene chiamato da ``wsgi.py``/``asgi.py``
+con ``WARMUP_ON_START`` e dal comando ``manage.py warmup``.
+"""
+import logging
+import time
+from pathlib import Path
+
+from django.conf import settings
+from django.template.loader import get_template
+from django.urls import get_resolver, resolve, reverse
+
+
+logger = logging.getLogger(__name__)
+
+# Pagine e API risolte per popolare il resolver (l'admin resta escluso)
+WARMUP_URL_NAMES = ('home', 'about', 'projects', 'contact', 'api_palette', 'api_skills', 'api_projects')
+
+
+def public_templates():
+    """Nomi dei template del sito, esclusi quelli dell'admin."""
+    root = Path(settings.BASE_DIR) / 'portfolio' / 'templates'
+    return sorted(
+        path.relative_to(root).as_posix()
+        for path in root.rglob('*.html')
+        if path.relative_to(root).parts[0] != 'admin'
+    )
+
+
+def warm_urls():
+    get_resolver().url_patterns
+    for name in WARMUP_URL_NAMES:
+        resolve(reverse(name))
+
+
+def warm_templates():
+    for name in public_templates():
+        get_template(name)
+
+
+def warm_snapshot():
+    from .snapshots import get_site_snapshot
+
+    get_site_snapshot()
+
+
+STEPS = (
+    ('urls', warm_urls),
+    ('templates', warm_templates),
+    ('snapshot', warm_snapshot),
+)
+
+
+def warm_up(raise_errors=False):
+    """
+    Esegue i passi del warm-up e restituisce i millisecondi di ciascuno.
+    Un passo che fallisce (es. database non raggiungibile) viene registrato
+    nel log e saltato: l'avvio non deve fallire per il warm-up.
+    """
+    timings = {}
+    for name, step in STEPS:
+        started = time.perf_counter()
+        try:
+            step()
+        except Exception:
+            if raise_errors:
+                raise
+            logger.exception('Warm-up: passo %s non riuscito', name)
+            continue
+        timings[name] = (time.perf_counter() - started) * 1000
+    logger.info('Warm-up: %s', ', '.join(f'{name} {ms:.1f}ms' for name, ms in timings.items()))
+    return timings
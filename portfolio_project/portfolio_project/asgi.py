@@ -12,5 +12,16 @@ import os
 from django.core.asgi import get_asgi_application
 
 os.environ.setdefault('DJANGO_SETTINGS_MODULE', 'portfolio_project.settings')
+# Sotto ASGI le pagine pubbliche usano le view asincrone (portfolio/async_views.py)
+os.environ.setdefault('ASYNC_VIEWS', 'True')
 
 application = get_asgi_application()
+
+# Avvio a freddo (serverless): prepara URL, template e snapshot prima
+# della prima richiesta
+from django.conf import settings  # noqa: E402
+
+if settings.WARMUP_ON_START:
+    from portfolio.warmup import warm_up
+
+    warm_up()
@@ -11,7 +11,6 @@ https://docs.djangoproject.com/en/4.2/ref/settings/
 """
 
 import os
-import dj_database_url
 from pathlib import Path
 
 # Build paths inside the project like this: BASE_DIR / 'subdir'.
@@ -30,29 +29,47 @@ DEBUG = os.environ.get('DEBUG', 'True') == 'True'
 
 ALLOWED_HOSTS = ['*']
 
+# Modalità serverless (attiva su Vercel): admin caricato alla prima
+# richiesta /admin/ e warm-up all'avvio (vedi portfolio/warmup.py)
+SERVERLESS = os.environ.get('SERVERLESS', str('VERCEL' in os.environ)) == 'True'
+WARMUP_ON_START = os.environ.get('WARMUP_ON_START', str(SERVERLESS)) == 'True'
+
+# CORS: tutte le origini sono ammesse come prima; con
+# CORS_ALLOW_ALL_ORIGINS=False e senza CORS_ALLOWED_ORIGINS l'app
+# corsheaders non viene caricata
+CORS_ALLOWED_ORIGINS = [
+    origin for origin in os.environ.get('CORS_ALLOWED_ORIGINS', '').split(',') if origin
+]
+CORS_ALLOW_ALL_ORIGINS = os.environ.get('CORS_ALLOW_ALL_ORIGINS', 'True') == 'True'
+CORS_ENABLED = CORS_ALLOW_ALL_ORIGINS or bool(CORS_ALLOWED_ORIGINS)
+CLOUDINARY_ENABLED = 'CLOUDINARY_CLOUD_NAME' in os.environ
+
 
 # Application definition
 
 INSTALLED_APPS = [
-    'django.contrib.admin',
+    # In serverless i moduli admin.py vengono importati alla prima
+    # richiesta all'admin (vedi portfolio_project/urls.py)
+    'django.contrib.admin.apps.SimpleAdminConfig' if SERVERLESS else 'django.contrib.admin',
     'django.contrib.auth',
     'django.contrib.contenttypes',
     'django.contrib.sessions',
     'django.contrib.messages',
     'django.contrib.staticfiles',
-    # Third party apps
-    'cloudinary_storage',
-    'cloudinary',
-    'corsheaders',
-    'django_filters',
     # Local apps
     'portfolio',
 ]
 
+# Third party apps, solo se la relativa funzione è configurata
+if CLOUDINARY_ENABLED:
+    INSTALLED_APPS += ['cloudinary_storage', 'cloudinary']
+if CORS_ENABLED:
+    INSTALLED_APPS += ['corsheaders']
+
 MIDDLEWARE = [
+    'portfolio.timing.ServerTimingMiddleware',  # Server-Timing (vedi SERVER_TIMING)
     'django.middleware.security.SecurityMiddleware',
     'whitenoise.middleware.WhiteNoiseMiddleware',  # WhiteNoise for static files
-    'corsheaders.middleware.CorsMiddleware',
     'django.contrib.sessions.middleware.SessionMiddleware',
     'django.middleware.common.CommonMiddleware',
     'django.middleware.csrf.CsrfViewMiddleware',
@@ -61,11 +78,16 @@ MIDDLEWARE = [
     'django.middleware.clickjacking.XFrameOptionsMiddleware',
 ]
 
+if CORS_ENABLED:
+    MIDDLEWARE.insert(MIDDLEWARE.index('django.contrib.sessions.middleware.SessionMiddleware'),
+                      'corsheaders.middleware.CorsMiddleware')
+
 ROOT_URLCONF = 'portfolio_project.urls'
 
 TEMPLATES = [
     {
-        'BACKEND': 'django.template.backends.django.DjangoTemplates',
+        # DjangoTemplates con la misura del rendering per Server-Timing
+        'BACKEND': 'portfolio.timing.TimedDjangoTemplates',
         'DIRS': [BASE_DIR / 'portfolio' / 'templates'],
         'APP_DIRS': True,
         'OPTIONS': {
@@ -96,6 +118,8 @@ DATABASES = {
 
 # Use PostgreSQL in production if DATABASE_URL is set
 if 'DATABASE_URL' in os.environ:
+    import dj_database_url
+
     DATABASES['default'] = dj_database_url.parse(
         os.environ.get('DATABASE_URL'),
         conn_max_age=600,
@@ -103,6 +127,101 @@ if 'DATABASE_URL' in os.environ:
     )
 
 
+# Cache
+# Versioni dei contenuti, cache delle pagine, limiti del form di contatto e
+# statistiche devono essere condivisi da tutti i worker e dalle istanze
+# serverless: di default la cache è una tabella del database (creata da
+# ``manage.py createcachetable``, eseguito da build_files.sh), oppure Redis
+# se è impostato REDIS_URL. CACHE_BACKEND=locmem usa la memoria del processo
+# e va bene solo con un unico processo (es. runserver): le modifiche
+# salvate da un worker non invalidano gli altri, quindi la cache delle
+# pagine e le sue statistiche vengono disattivate.
+CACHES = {
+    'default': {
+        'BACKEND': 'django.core.cache.backends.db.DatabaseCache',
+        'LOCATION': 'portfolio_cache',
+    }
+}
+
+if os.environ.get('CACHE_BACKEND') == 'locmem':
+    CACHES['default'] = {
+        'BACKEND': 'django.core.cache.backends.locmem.LocMemCache',
+        'LOCATION': 'portfolio',
+    }
+
+if 'REDIS_URL' in os.environ:
+    CACHES['default'] = {
+        'BACKEND': 'django.core.cache.backends.redis.RedisCache',
+        'LOCATION': os.environ.get('REDIS_URL'),
+    }
+
+
+# Secondi dopo cui gli snapshot in memoria di processo vengono ricostruiti
+# anche se le versioni non sono cambiate
+SNAPSHOT_MAX_AGE = 5 * 60
+
+# Cache delle pagine pubbliche (invalidata automaticamente dalle modifiche).
+# Pagine e statistiche (page_cache_stats) richiedono la cache condivisa:
+# con CACHE_BACKEND=locmem la cache delle pagine resta spenta
+PAGE_CACHE_ENABLED = os.environ.get('PAGE_CACHE_ENABLED', 'True') == 'True'
+PAGE_CACHE_TIMEOUT = 60 * 60 * 24
+
+# Paginazione della lista progetti: 'offset' (numeri di pagina) oppure
+# 'cursor' (keyset, senza COUNT né OFFSET)
+PROJECTS_PAGINATION = os.environ.get('PROJECTS_PAGINATION', 'offset')
+
+# View asincrone per pagine pubbliche e API (attivo di default in asgi.py)
+ASYNC_VIEWS = os.environ.get('ASYNC_VIEWS', 'False') == 'True'
+
+# Header Server-Timing e log dei tempi per richiesta (vedi portfolio/timing.py)
+SERVER_TIMING = {
+    'enabled': os.environ.get('SERVER_TIMING', 'False') == 'True',
+    # Frazione delle richieste misurate: in produzione basta un campione
+    'sample_rate': float(os.environ.get('SERVER_TIMING_SAMPLE_RATE', 1.0)),
+    'header': True,
+    'log': True,
+}
+
+LOGGING = {
+    'version': 1,
+    'disable_existing_loggers': False,
+    'handlers': {
+        'console': {'class': 'logging.StreamHandler'},
+    },
+    'loggers': {
+        'portfolio.timing': {'handlers': ['console'], 'level': 'INFO', 'propagate': False},
+        'portfolio.warmup': {'handlers': ['console'], 'level': 'INFO', 'propagate': False},
+        'portfolio.assets': {'handlers': ['console'], 'level': 'INFO', 'propagate': False},
+        'portfolio.vendor': {'handlers': ['console'], 'level': 'INFO', 'propagate': False},
+    },
+}
+
+
+# Cache-Control delle API JSON (le risposte hanno anche un ETag)
+API_CACHE_CONTROL = {
+    'api_palette': {
+        'public': True,
+        'max_age': 60,
+        'stale_while_revalidate': 60 * 60,
+    },
+    'api_skills': {
+        'public': True,
+        'max_age': 60 * 5,
+        'stale_while_revalidate': 60 * 60 * 24,
+    },
+    'api_projects': {
+        'public': True,
+        'max_age': 60,
+        'stale_while_revalidate': 60 * 10,
+    },
+    'api_project_search': {
+        'public': True,
+        'max_age': 60,
+        'stale_while_revalidate': 60 * 10,
+    },
+}
+
+
 # Password validation
 # https://docs.djangoproject.com/en/4.2/ref/settings/#auth-password-validators
 
@@ -142,23 +261,38 @@ STATICFILES_DIRS = [
     BASE_DIR / 'portfolio' / 'static',
 ]
 STATIC_ROOT = BASE_DIR / 'staticfiles'
+# Cartella generata da `manage.py export_static`
+STATIC_EXPORT_ROOT = BASE_DIR / 'static_export'
 
-# WhiteNoise configuration for serving static files
+# WhiteNoise configuration for serving static files: collectstatic genera i
+# bundle minificati, i nomi con l'hash e le copie .gz/.br (portfolio/assets.py);
+# WhiteNoise serve i file con l'hash con Cache-Control immutable
 STORAGES = {
     "default": {
         "BACKEND": "django.core.files.storage.FileSystemStorage",
     },
     "staticfiles": {
-        "BACKEND": "django.contrib.staticfiles.storage.StaticFilesStorage",
+        "BACKEND": "portfolio.assets.PipelineStaticFilesStorage",
     },
 }
 
+# Bootstrap, Font Awesome e font ridotti a classi, icone e caratteri usati,
+# generati in static/vendor/ da `manage.py build_vendor_assets` (portfolio/vendor.py);
+# qui i file originali scaricati
+VENDOR_CACHE_ROOT = BASE_DIR / '.vendor-cache'
+
+# Bundle inclusi con {% bundle %}: nome generato -> sorgenti, in ordine
+STATIC_BUNDLES = {
+    'css/site.css': ['css/theme.css'],
+    'js/site.js': ['js/script.js'],
+}
+
 # Media files (uploads)
 MEDIA_URL = '/media/'
 MEDIA_ROOT = BASE_DIR / 'media'
 
 # Cloudinary Configuration for media files in production
-if 'CLOUDINARY_CLOUD_NAME' in os.environ:
+if CLOUDINARY_ENABLED:
     CLOUDINARY_STORAGE = {
         'CLOUD_NAME': os.environ.get('CLOUDINARY_CLOUD_NAME'),
         'API_KEY': os.environ.get('CLOUDINARY_API_KEY'),
@@ -169,6 +303,10 @@ if 'CLOUDINARY_CLOUD_NAME' in os.environ:
     }
     MEDIA_URL = '/media/'  # Cloudinary gestisce automaticamente l'URL
 
+# Varianti responsive delle immagini caricate (larghezze in pixel, qualità 1-95)
+IMAGE_VARIANT_WIDTHS = (320, 640, 960, 1280)
+IMAGE_VARIANT_QUALITY = 80
+
 # Default primary key field type
 # https://docs.djangoproject.com/en/4.2/ref/settings/#default-auto-field
 
@@ -176,6 +314,40 @@ DEFAULT_AUTO_FIELD = 'django.db.models.BigAutoField'
 
 # Email settings (configure for production)
 EMAIL_BACKEND = 'django.core.mail.backends.console.EmailBackend'
+
+# Coda delle notifiche email (inviata con `manage.py send_notifications`)
+OUTBOX_BATCH_SIZE = 50
+OUTBOX_MAX_ATTEMPTS = 5
+OUTBOX_RETRY_DELAY = 60  # secondi, raddoppiati ad ogni tentativo fallito
+
+# Su Vercel la coda viene svuotata dal cron di vercel.json, che chiama
+# /cron/send-notifications/ con CRON_SECRET; senza segreto l'URL risponde 404
+CRON_SECRET = os.environ.get('CRON_SECRET', '')
+OUTBOX_CRON_TIME_BUDGET = 8  # secondi, sotto il timeout della funzione
+OUTBOX_CRON_DIGEST = os.environ.get('OUTBOX_CRON_DIGEST', 'False') == 'True'
+
+# Archiviazione dei messaggi letti (`manage.py archive_messages`, vedi portfolio/archive.py)
+MESSAGE_ARCHIVE_ROOT = BASE_DIR / 'archive'
+MESSAGE_RETENTION_DAYS = 365
+
+# Limiti del form di contatto (token bucket in cache, vedi portfolio/throttling.py)
+CONTACT_THROTTLE = {
+    # Per IP: fino a 5 messaggi di fila, poi uno ogni 10 minuti
+    'ip_capacity': 5,
+    'ip_refill': 600,
+    # Per tutto il sito: fino a 30 di fila, poi uno al minuto
+    'global_capacity': 30,
+    'global_refill': 60,
+    # Secondi in cui un messaggio identico viene scartato
+    'duplicate_window': 60 * 60 * 24,
+    # Numero di proxy fidati davanti all'app (per leggere X-Forwarded-For)
+    'proxy_count': int(os.environ.get('THROTTLE_PROXY_COUNT', 0)),
+    # Header con l'IP del client scritto dal proxy: su Vercel REMOTE_ADDR è
+    # quello della piattaforma e tutti finirebbero nello stesso bucket
+    'ip_header': os.environ.get(
+        'THROTTLE_IP_HEADER', 'HTTP_X_VERCEL_FORWARDED_FOR' if SERVERLESS else ''
+    ),
+}
 # For production, use SMTP:
 # EMAIL_BACKEND = 'django.core.mail.backends.smtp.EmailBackend'
 # EMAIL_HOST = 'smtp.gmail.com'
@@ -184,9 +356,6 @@ EMAIL_BACKEND = 'django.core.mail.backends.console.EmailBackend'
 # EMAIL_HOST_USER = os.environ.get('EMAIL_HOST_USER')
 # EMAIL_HOST_PASSWORD = os.environ.get('EMAIL_HOST_PASSWORD')
 
-# CORS settings
-CORS_ALLOW_ALL_ORIGINS = True  # For development only
-
 # Security settings (enable in production)
 # SECURE_SSL_REDIRECT = True
 # SESSION_COOKIE_SECURE = True
@@ -16,11 +16,35 @@ Including another URLconf
 """
 from django.contrib import admin
 from django.urls import path, include
+from django.urls.resolvers import RoutePattern, URLResolver
 from django.conf import settings
 from django.conf.urls.static import static
+from django.utils.functional import cached_property
+
+
+class LazyAdminURLconf:
+    """
+    URL dell'admin costruiti alla prima richiesta che li raggiunge: in
+    serverless i moduli admin.py non vengono importati all'avvio.
+    """
+
+    @cached_property
+    def urlpatterns(self):
+        admin.autodiscover()
+        return admin.site.get_urls()
+
+
+if settings.SERVERLESS:
+    # include() leggerebbe subito gli URL: il resolver li legge solo quando
+    # un percorso inizia con admin/ o si usa reverse('admin:...')
+    admin_urls = URLResolver(
+        RoutePattern('admin/'), LazyAdminURLconf(), app_name='admin', namespace=admin.site.name
+    )
+else:
+    admin_urls = path('admin/', admin.site.urls)
 
 urlpatterns = [
-    path('admin/', admin.site.urls),
+    admin_urls,
     path('', include('portfolio.urls')),
 ]
 
@@ -15,4 +15,13 @@ os.environ.setdefault('DJANGO_SETTINGS_MODULE', 'portfolio_project.settings')
 
 application = get_wsgi_application()
 
+# Avvio a freddo (serverless): prepara URL, template e snapshot prima
+# della prima richiesta
+from django.conf import settings  # noqa: E402
+
+if settings.WARMUP_ON_START:
+    from portfolio.warmup import warm_up
+
+    warm_up()
+
 app = application